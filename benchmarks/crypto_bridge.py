@@ -0,0 +1,337 @@
+"""加解密桥接微基准：冷启动、单次延迟与并发吞吐。
+
+每个后端分别测量：
+
+* 冷启动：新建独立进程的启动耗时与首次调用耗时（取多次的中位数）；
+* 稳态：在预热后的同一进程上，按负载大小与并发线程数组合测量
+  encrypt/decrypt 的 p50/p95/p99 延迟与吞吐。
+
+调用方式与 ``QQMusicAPI`` 一致（工作线程中同步调用），后端只需实现
+``CryptoBackend``，因此更换桥接协议或实现后结果仍可直接对比。
+``--baseline`` 读取先前的 ``--json`` 输出，任一指标变慢超过 ``--tolerance``
+时以退出码 1 结束::
+
+    python benchmarks/crypto_bridge.py
+    python benchmarks/crypto_bridge.py --json > before.json
+    python benchmarks/crypto_bridge.py --baseline before.json --tolerance 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import functools
+import json
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from fake_qqmusic import PlainCrypto
+
+from qqmusicdownloader.infrastructure import LatencyRecorder
+from qqmusicdownloader.infrastructure.crypto import CryptoBackend, NodeCryptoBackend
+
+BACKENDS: Dict[str, Callable[[], CryptoBackend]] = {
+    "node": lambda: NodeCryptoBackend(dedicated=True),
+    "plain": PlainCrypto,
+}
+
+DEFAULT_SIZES = (256, 4096, 16384)
+DEFAULT_CONCURRENCY = (1, 4)
+
+
+@dataclass(slots=True)
+class ColdStartReport:
+    """冷启动耗时（毫秒）。"""
+
+    backend: str
+    runs: int
+    spawn_ms: float
+    first_call_ms: float
+
+
+@dataclass(slots=True)
+class SteadyReport:
+    """稳态下某一操作/负载大小/并发度组合的结果。"""
+
+    backend: str
+    operation: str
+    size: int
+    concurrency: int
+    calls: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    ops_per_second: float
+    mb_per_second: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.backend}/{self.operation}/{self.size}/x{self.concurrency}"
+
+
+def make_payload(size: int) -> str:
+    """构造约 ``size`` 字节、结构接近真实请求的 JSON。"""
+
+    payload: Dict[str, Any] = {
+        "comm": {"ct": 24, "cv": 0, "format": "json", "uin": "10000", "g_tk": 5381},
+        "req_1": {
+            "module": "music.search.SearchCgiService",
+            "method": "DoSearchForQQMusicDesktop",
+            "param": {"query": "", "num_per_page": 20, "page_num": 1},
+        },
+    }
+    padding = max(0, size - len(json.dumps(payload)))
+    payload["req_1"]["param"]["query"] = "x" * padding
+    return json.dumps(payload)
+
+
+def _close(backend: CryptoBackend) -> None:
+    close = getattr(backend, "close", None)
+    if close is not None:
+        close()
+
+
+def measure_cold_start(
+    name: str, factory: Callable[[], CryptoBackend], *, runs: int = 3
+) -> ColdStartReport:
+    """每轮新建后端：``start`` 的耗时计为启动，随后第一次加密计为首次调用。"""
+
+    spawn: List[float] = []
+    first_call: List[float] = []
+    plain = make_payload(256)
+    for _ in range(max(1, runs)):
+        backend = factory()
+        try:
+            started = time.perf_counter()
+            start = getattr(backend, "start", None)
+            if start is not None:
+                start()
+            spawned = time.perf_counter()
+            backend.encrypt_payload(plain)
+            finished = time.perf_counter()
+        finally:
+            _close(backend)
+        spawn.append(spawned - started)
+        first_call.append(finished - spawned)
+    return ColdStartReport(
+        backend=name,
+        runs=len(spawn),
+        spawn_ms=statistics.median(spawn) * 1000,
+        first_call_ms=statistics.median(first_call) * 1000,
+    )
+
+
+def measure_steady(
+    name: str,
+    backend: CryptoBackend,
+    *,
+    operation: str,
+    size: int,
+    concurrency: int,
+    calls: int = 20,
+    warmup: int = 5,
+) -> SteadyReport:
+    """在 ``concurrency`` 个线程中共执行 ``calls`` 次操作。"""
+
+    plain = make_payload(size)
+    body, _ = backend.encrypt_payload(plain)
+    blob = base64.b64decode(body)
+    call: Callable[[], Any]
+    if operation == "encrypt":
+        call = functools.partial(backend.encrypt_payload, plain)
+        volume = len(plain.encode("utf-8"))
+    elif operation == "decrypt":
+        call = functools.partial(backend.decrypt_response, blob)
+        volume = len(blob)
+    else:
+        raise ValueError(f"未知操作: {operation}")
+
+    for _ in range(warmup):
+        call()
+
+    latency = LatencyRecorder(size=calls)
+    remaining = iter(range(calls))
+    lock = threading.Lock()
+
+    def worker() -> None:
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            call()
+            latency.record(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    seconds = time.perf_counter() - started
+
+    stats = latency.snapshot()
+    return SteadyReport(
+        backend=name,
+        operation=operation,
+        size=size,
+        concurrency=concurrency,
+        calls=int(stats["count"]),
+        p50_ms=stats["p50"],
+        p95_ms=stats["p95"],
+        p99_ms=stats["p99"],
+        ops_per_second=calls / seconds if seconds > 0 else 0.0,
+        mb_per_second=calls * volume / (1024 * 1024) / seconds if seconds > 0 else 0.0,
+    )
+
+
+def run_backend(
+    name: str,
+    factory: Callable[[], CryptoBackend],
+    *,
+    sizes: Sequence[int] = DEFAULT_SIZES,
+    concurrency: Sequence[int] = DEFAULT_CONCURRENCY,
+    calls: int = 20,
+    cold_runs: int = 3,
+) -> tuple[ColdStartReport, List[SteadyReport]]:
+    """测量单个后端的冷启动与全部稳态组合。"""
+
+    cold = measure_cold_start(name, factory, runs=cold_runs)
+    backend = factory()
+    try:
+        steady = [
+            measure_steady(
+                name, backend, operation=operation, size=size, concurrency=level, calls=calls
+            )
+            for operation in ("encrypt", "decrypt")
+            for size in sizes
+            for level in concurrency
+        ]
+    finally:
+        _close(backend)
+    return cold, steady
+
+
+def compare_to_baseline(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    *,
+    tolerance: float = 0.2,
+    min_delta_ms: float = 1.0,
+) -> List[str]:
+    """返回比基线慢超过 ``tolerance`` 的指标描述；只比较两边都有的组合。
+
+    绝对差值不足 ``min_delta_ms`` 的变化视为计时噪声。
+    """
+
+    regressions: List[str] = []
+
+    def check(label: str, now: float, before: float) -> None:
+        if before <= 0 or now - before < min_delta_ms:
+            return
+        if now > before * (1 + tolerance):
+            regressions.append(
+                f"{label}: {before:.2f}ms -> {now:.2f}ms (+{now / before - 1:.0%})"
+            )
+
+    cold_before = {item["backend"]: item for item in baseline.get("cold", [])}
+    for item in current.get("cold", []):
+        before = cold_before.get(item["backend"])
+        if before:
+            check(
+                f"{item['backend']}/first_call",
+                item["first_call_ms"],
+                before["first_call_ms"],
+            )
+
+    def key(item: Dict[str, Any]) -> str:
+        return f"{item['backend']}/{item['operation']}/{item['size']}/x{item['concurrency']}"
+
+    steady_before = {key(item): item for item in baseline.get("steady", [])}
+    for item in current.get("steady", []):
+        before = steady_before.get(key(item))
+        if before:
+            check(f"{key(item)} p50", item["p50_ms"], before["p50_ms"])
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="测量加解密桥接的启动、延迟与吞吐")
+    parser.add_argument(
+        "--backend",
+        action="append",
+        choices=sorted(BACKENDS),
+        help="要测量的后端，可重复指定，默认全部",
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="负载大小（字节）"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_CONCURRENCY),
+        help="并发调用的线程数",
+    )
+    parser.add_argument("--calls", type=int, default=20, help="每个组合的调用次数")
+    parser.add_argument("--cold-runs", type=int, default=3, help="冷启动采样次数")
+    parser.add_argument("--baseline", help="先前 --json 输出的文件，用于回归对比")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的变慢比例")
+    parser.add_argument(
+        "--min-delta-ms", type=float, default=1.0, help="低于该绝对差值的变化视为噪声"
+    )
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    cold_reports: List[ColdStartReport] = []
+    steady_reports: List[SteadyReport] = []
+    for name in args.backend or sorted(BACKENDS):
+        cold, steady = run_backend(
+            name,
+            BACKENDS[name],
+            sizes=args.sizes,
+            concurrency=args.concurrency,
+            calls=args.calls,
+            cold_runs=args.cold_runs,
+        )
+        cold_reports.append(cold)
+        steady_reports.extend(steady)
+
+    result = {
+        "cold": [asdict(report) for report in cold_reports],
+        "steady": [asdict(report) for report in steady_reports],
+    }
+    regressions: List[str] = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare_to_baseline(
+                result,
+                json.load(handle),
+                tolerance=args.tolerance,
+                min_delta_ms=args.min_delta_ms,
+            )
+
+    if args.json:
+        print(json.dumps({**result, "regressions": regressions}, ensure_ascii=False, indent=2))
+    else:
+        for report in cold_reports:
+            print(
+                f"{report.backend:<6} 冷启动  启动 {report.spawn_ms:7.1f}ms  "
+                f"首次调用 {report.first_call_ms:7.1f}ms"
+            )
+        for report in steady_reports:
+            print(
+                f"{report.key:<28} p50 {report.p50_ms:7.2f}ms  p99 {report.p99_ms:7.2f}ms  "
+                f"{report.ops_per_second:8.0f} 次/s  {report.mb_per_second:7.2f} MB/s"
+            )
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""端到端吞吐基准：在本地模拟服务上运行搜索与批量下载。
+
+完整经过 ``DownloadService`` → ``QQMusicAPI`` → HTTP 的调用链，只把加密
+替换为 ``PlainCrypto``、把远端替换为 ``FakeQQMusicServer``，因此数字可以
+离线复现，适合在性能改动前后对比::
+
+    python benchmarks/e2e.py
+    python benchmarks/e2e.py --songs 100 --concurrency 1 4 8 --file-kib 4096
+    python benchmarks/e2e.py --api-latency-ms 40 --bandwidth-kib 2048 --json > after.json
+    python benchmarks/e2e.py --songs 10 --trace trace.json
+    python benchmarks/e2e.py --searches 0 --songs 200 --concurrency 8 --profile profiles
+
+每个并发度各运行一次批量下载；搜索场景按 ``--search-concurrency`` 并发发起
+互不相同的关键词，避免命中搜索缓存。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from fake_qqmusic import FakeQQMusicServer, FakeServerConfig, PlainCrypto
+
+from qqmusicdownloader.domain import DownloadConfig
+from qqmusicdownloader.infrastructure import LatencyRecorder, profiling, tracing
+from qqmusicdownloader.infrastructure.qq_music_api import APIConfig, QQMusicAPI
+from qqmusicdownloader.services import DownloadService
+
+BENCH_COOKIE = "uin=o10000; qqmusic_key=bench;"
+
+
+@dataclass(slots=True)
+class ScenarioReport:
+    """单个场景的结果，耗时单位为毫秒。"""
+
+    name: str
+    operations: int
+    failures: int
+    seconds: float
+    bytes: int
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+
+    @property
+    def ops_per_second(self) -> float:
+        return self.operations / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / (1024 * 1024) / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            **asdict(self),
+            "ops_per_second": self.ops_per_second,
+            "mb_per_second": self.mb_per_second,
+        }
+
+
+def _report(
+    name: str, latency: LatencyRecorder, *, failures: int, seconds: float, size: int
+) -> ScenarioReport:
+    stats = latency.snapshot()
+    return ScenarioReport(
+        name=name,
+        operations=int(stats["count"]),
+        failures=failures,
+        seconds=seconds,
+        bytes=size,
+        p50_ms=stats["p50"],
+        p99_ms=stats["p99"],
+        max_ms=stats["max"],
+    )
+
+
+def build_service(
+    server: FakeQQMusicServer,
+    download_dir: Path,
+    *,
+    max_concurrent: int = 3,
+    with_lyrics: bool = True,
+    crypto_delay: float = 0.0,
+) -> DownloadService:
+    """创建指向模拟服务的下载服务。"""
+
+    api = QQMusicAPI(
+        BENCH_COOKIE,
+        config=APIConfig(musics_url=server.musics_url),
+        crypto=PlainCrypto(crypto_delay),
+    )
+    service = DownloadService(
+        api,
+        config=DownloadConfig(max_concurrent=max_concurrent, download_lyrics=with_lyrics),
+    )
+    service.set_download_path(download_dir)
+    return service
+
+
+async def run_search(
+    service: DownloadService, *, searches: int, concurrency: int
+) -> ScenarioReport:
+    """并发执行 ``searches`` 次互不相同的搜索。"""
+
+    latency = LatencyRecorder(size=max(1, searches))
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    failures = 0
+
+    async def one(index: int) -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            songs = await service.search(f"基准 {index}")
+            latency.record(time.perf_counter() - started)
+            if not songs:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(searches)))
+    return _report(
+        f"search x{concurrency}",
+        latency,
+        failures=failures,
+        seconds=time.perf_counter() - started,
+        size=0,
+    )
+
+
+async def run_download(
+    service: DownloadService, *, songs: int, concurrency: int, quality: int = 1
+) -> ScenarioReport:
+    """批量下载 ``songs`` 首歌曲，单曲耗时从开始下载计到完成。"""
+
+    records = []
+    async for page in service.iter_search("基准下载", page_size=songs, max_results=songs):
+        records.extend(page)
+    latency = LatencyRecorder(size=max(1, songs))
+    started_at: Dict[int, float] = {}
+
+    def on_start(index: int, _song: object) -> None:
+        started_at[index] = time.perf_counter()
+
+    def on_done(index: int, _song: object, _result: object) -> None:
+        latency.record(time.perf_counter() - started_at.pop(index))
+
+    started = time.perf_counter()
+    results = await service.download_many(
+        records,
+        quality,
+        max_concurrent=concurrency,
+        on_song_start=on_start,
+        on_song_done=on_done,
+    )
+    seconds = time.perf_counter() - started
+    progress = service.batch_progress
+    return _report(
+        f"download x{concurrency}",
+        latency,
+        failures=sum(not result.success for result in results),
+        seconds=seconds,
+        size=progress.bytes_downloaded if progress else 0,
+    )
+
+
+async def run_suite(
+    config: FakeServerConfig,
+    *,
+    searches: int = 50,
+    search_concurrency: int = 8,
+    songs: int = 20,
+    concurrency: Sequence[int] = (1, 4),
+    with_lyrics: bool = True,
+    crypto_delay: float = 0.0,
+) -> List[ScenarioReport]:
+    """启动模拟服务并依次运行搜索与各并发度的下载场景。"""
+
+    reports: List[ScenarioReport] = []
+    async with FakeQQMusicServer(config) as server:
+        with tempfile.TemporaryDirectory(prefix="qqmusic-bench-") as temp:
+            base = Path(temp)
+            service = build_service(
+                server, base / "search", crypto_delay=crypto_delay
+            )
+            if searches:
+                reports.append(
+                    await run_search(
+                        service, searches=searches, concurrency=search_concurrency
+                    )
+                )
+            for level in concurrency if songs else ():
+                # 每轮使用新目录，避免“文件已存在”跳过传输
+                service = build_service(
+                    server,
+                    base / f"download-{level}",
+                    max_concurrent=level,
+                    with_lyrics=with_lyrics,
+                    crypto_delay=crypto_delay,
+                )
+                reports.append(
+                    await run_download(service, songs=songs, concurrency=level)
+                )
+    return reports
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="在本地模拟服务上测量搜索与下载吞吐")
+    parser.add_argument("--searches", type=int, default=50, help="搜索次数，0 表示跳过")
+    parser.add_argument("--search-concurrency", type=int, default=8, help="搜索并发数")
+    parser.add_argument("--songs", type=int, default=20, help="每轮下载的歌曲数，0 表示跳过")
+    parser.add_argument(
+        "--concurrency", type=int, nargs="+", default=[1, 4], help="要测量的下载并发度"
+    )
+    parser.add_argument("--file-kib", type=int, default=1024, help="合成音频文件大小（KiB）")
+    parser.add_argument(
+        "--bandwidth-kib", type=int, default=0, help="CDN 单连接限速（KiB/s），0 表示不限"
+    )
+    parser.add_argument("--api-latency-ms", type=float, default=0.0, help="接口响应延迟")
+    parser.add_argument("--cdn-latency-ms", type=float, default=0.0, help="CDN 首字节延迟")
+    parser.add_argument(
+        "--crypto-delay-ms", type=float, default=0.0, help="模拟每次加解密的耗时"
+    )
+    parser.add_argument("--no-lyrics", action="store_true", help="下载时跳过歌词")
+    parser.add_argument("--trace", type=Path, help="导出各阶段耗时的 Chrome Trace 文件")
+    parser.add_argument(
+        "--profile", type=Path, help="对每次搜索与批量下载做性能分析，结果写入该目录"
+    )
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+    if args.trace:
+        tracing.enable()
+    if args.profile:
+        profiling.enable(args.profile)
+
+    config = FakeServerConfig(
+        catalog_size=max(args.songs, 1),
+        file_size=args.file_kib * 1024,
+        api_latency=args.api_latency_ms / 1000,
+        cdn_latency=args.cdn_latency_ms / 1000,
+        bandwidth=args.bandwidth_kib * 1024 or None,
+    )
+    reports = asyncio.run(
+        run_suite(
+            config,
+            searches=args.searches,
+            search_concurrency=args.search_concurrency,
+            songs=args.songs,
+            concurrency=args.concurrency,
+            with_lyrics=not args.no_lyrics,
+            crypto_delay=args.crypto_delay_ms / 1000,
+        )
+    )
+
+    if args.trace:
+        tracing.export_chrome(args.trace)
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "config": asdict(config),
+                    "scenarios": [report.to_dict() for report in reports],
+                },
+                ensure_ascii=False,
+                indent=2,
+            )
+        )
+    else:
+        for report in reports:
+            print(
+                f"{report.name:<14} {report.operations:>5} 次  {report.ops_per_second:8.1f} 次/s  "
+                f"{report.mb_per_second:8.2f} MB/s  p50 {report.p50_ms:7.1f}ms  "
+                f"p99 {report.p99_ms:7.1f}ms  失败 {report.failures}"
+            )
+
+    return 0 if all(report.failures == 0 for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
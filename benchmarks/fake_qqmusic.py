@@ -0,0 +1,241 @@
+"""本地模拟的 QQ 音乐接口与 CDN，供离线基准测试使用。
+
+``FakeQQMusicServer`` 在 ``127.0.0.1`` 的随机端口上同时提供：
+
+* ``/cgi-bin/musics.fcg``：按模块/方法分发搜索、歌单、下载地址与歌词请求；
+* ``/cdn/<文件名>``：返回确定性的合成音频数据，支持首字节延迟、
+  单连接限速与 ``Range`` 请求。
+
+请求体不经过真实加密，客户端需配合 ``PlainCrypto`` 使用::
+
+    async with FakeQQMusicServer(FakeServerConfig(file_size=1 << 20)) as server:
+        api = QQMusicAPI(
+            "uin=o10000; qqmusic_key=bench;",
+            config=APIConfig(musics_url=server.musics_url),
+            crypto=PlainCrypto(),
+        )
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import hashlib
+import json
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+_RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)$")
+_LYRIC = "[00:00.00]本地基准测试\n[00:05.00]合成歌词\n"
+
+
+@dataclass(slots=True)
+class FakeServerConfig:
+    """模拟服务的行为参数，时间单位为秒，速率单位为字节/秒。"""
+
+    catalog_size: int = 500
+    file_size: int = 1024 * 1024
+    api_latency: float = 0.0
+    cdn_latency: float = 0.0
+    bandwidth: Optional[int] = None
+    chunk_size: int = 64 * 1024
+
+
+class PlainCrypto:
+    """不加密的 ``CryptoBackend``，请求体仅做 Base64 编码。
+
+    ``delay`` 用于模拟加解密桥接每次调用的耗时（阻塞所在线程）。
+    """
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+
+    def encrypt_payload(self, payload: str) -> Tuple[str, str]:
+        if self.delay:
+            time.sleep(self.delay)
+        body = base64.b64encode(payload.encode("utf-8")).decode("ascii")
+        return body, hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+    def decrypt_response(self, blob: bytes) -> Tuple[str, Dict[str, Any] | None]:
+        if self.delay:
+            time.sleep(self.delay)
+        text = blob.decode("utf-8")
+        return text, json.loads(text)
+
+
+class FakeQQMusicServer:
+    """同时模拟 ``musics.fcg`` 与 CDN 的本地 aiohttp 服务。"""
+
+    def __init__(self, config: Optional[FakeServerConfig] = None) -> None:
+        self.config = config or FakeServerConfig()
+        self.requests: Counter[str] = Counter()
+        self.cdn_bytes = 0
+        self._block = bytes(range(256)) * (self.config.chunk_size // 256 + 1)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    @property
+    def musics_url(self) -> str:
+        return f"{self.base_url}/cgi-bin/musics.fcg"
+
+    @property
+    def cdn_url(self) -> str:
+        return f"{self.base_url}/cdn/"
+
+    async def start(self) -> "FakeQQMusicServer":
+        app = web.Application()
+        app.router.add_post("/cgi-bin/musics.fcg", self._handle_musics)
+        app.router.add_get("/cdn/{filename}", self._handle_cdn)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.base_url = f"http://{host}:{port}"
+        return self
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeQQMusicServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    # ---- musics.fcg ----
+
+    async def _handle_musics(self, request: web.Request) -> web.Response:
+        body = await request.read()
+        try:
+            payload = json.loads(base64.b64decode(body))
+        except ValueError:
+            return web.Response(status=400, text="invalid body")
+        if self.config.api_latency:
+            await asyncio.sleep(self.config.api_latency)
+
+        result: Dict[str, Any] = {"code": 0}
+        for key, block in payload.items():
+            if key == "comm" or not isinstance(block, dict):
+                continue
+            name = f"{block.get('module')}.{block.get('method')}"
+            self.requests[name] += 1
+            result[key] = self._dispatch(name, block.get("param") or {})
+        return web.Response(
+            body=json.dumps(result, ensure_ascii=False).encode("utf-8"),
+            content_type="application/octet-stream",
+        )
+
+    def _dispatch(self, name: str, param: Dict[str, Any]) -> Dict[str, Any]:
+        if name == "music.search.SearchCgiService.DoSearchForQQMusicDesktop":
+            size = int(param.get("num_per_page", 20))
+            start = (int(param.get("page_num", 1)) - 1) * size
+            songs = self._songs(start, size, prefix=str(param.get("query", "")))
+            return {"code": 0, "data": {"body": {"song": {"list": songs}}}}
+        if name == "music.srfDissInfo.aiDissInfo.uniform_get_Dissinfo":
+            start = int(param.get("song_begin", 0))
+            songs = self._songs(start, int(param.get("song_num", 100)))
+            return {
+                "code": 0,
+                "data": {
+                    "total_song_num": self.config.catalog_size,
+                    "dirinfo": {"title": f"基准歌单 {param.get('disstid')}"},
+                    "songlist": songs,
+                },
+            }
+        if name == "vkey.GetVkeyServer.CgiGetVkey":
+            midurlinfo = [
+                {
+                    "songmid": songmid,
+                    "filename": filename,
+                    "purl": f"{filename}?vkey=bench&guid={param.get('guid', '')}",
+                }
+                for songmid, filename in zip(
+                    param.get("songmid") or [], param.get("filename") or []
+                )
+            ]
+            return {"code": 0, "data": {"midurlinfo": midurlinfo, "sip": [self.cdn_url]}}
+        if name == "music.musichallSong.PlayLyricInfo.GetPlayLyricInfo":
+            lyric = base64.b64encode(_LYRIC.encode("utf-8")).decode("ascii")
+            return {"code": 0, "data": {"lyric": lyric}}
+        return {"code": 404, "data": {}}
+
+    def _songs(self, start: int, count: int, *, prefix: str = "") -> List[Dict[str, Any]]:
+        end = min(self.config.catalog_size, start + max(0, count))
+        size = self.config.file_size
+        return [
+            {
+                "mid": f"bench{index:06d}",
+                "title": f"{prefix} {index}".strip(),
+                "singer": [{"name": f"歌手 {index % 17}"}],
+                "album": {"title": f"专辑 {index % 31}"},
+                "interval": 180 + index % 120,
+                "file": {
+                    "media_mid": f"bench{index:06d}",
+                    "size_128mp3": size,
+                    "size_320mp3": size,
+                    "size_flac": size,
+                },
+            }
+            for index in range(max(0, start), end)
+        ]
+
+    # ---- CDN ----
+
+    async def _handle_cdn(self, request: web.Request) -> web.StreamResponse:
+        self.requests["cdn"] += 1
+        total = self.config.file_size
+        start, end = 0, total - 1
+        status = 200
+        header = request.headers.get("Range")
+        if header:
+            match = _RANGE_PATTERN.match(header.strip())
+            if match is None or not any(match.groups()):
+                return web.Response(status=416, headers={"Content-Range": f"bytes */{total}"})
+            first, last = match.groups()
+            if first:
+                start = int(first)
+                end = min(total - 1, int(last)) if last else total - 1
+            else:
+                start = max(0, total - int(last))
+            if start > end:
+                return web.Response(status=416, headers={"Content-Range": f"bytes */{total}"})
+            status = 206
+
+        response = web.StreamResponse(status=status)
+        response.content_length = end - start + 1
+        response.content_type = "audio/mp4"
+        response.headers["Accept-Ranges"] = "bytes"
+        if status == 206:
+            response.headers["Content-Range"] = f"bytes {start}-{end}/{total}"
+
+        if self.config.cdn_latency:
+            await asyncio.sleep(self.config.cdn_latency)
+        await response.prepare(request)
+
+        chunk_size = self.config.chunk_size
+        bandwidth = self.config.bandwidth
+        position = start
+        while position <= end:
+            length = min(chunk_size, end - position + 1)
+            offset = position % 256
+            await response.write(self._block[offset : offset + length])
+            self.cdn_bytes += length
+            position += length
+            if bandwidth:
+                await asyncio.sleep(length / bandwidth)
+        await response.write_eof()
+        return response
+
+
+def synthetic_bytes(start: int, length: int) -> bytes:
+    """返回 CDN 在 ``[start, start + length)`` 区间提供的数据，便于校验。"""
+
+    return bytes((start + index) % 256 for index in range(length))
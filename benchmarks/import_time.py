@@ -0,0 +1,185 @@
+"""启动耗时基准：基于 ``python -X importtime`` 统计模块导入开销。
+
+每个目标模块在独立子进程中导入多次（首次用于预热字节码缓存），取累计
+耗时的中位数与预算比较，并检查禁止出现的重量级依赖。超出预算或加载了
+禁止的模块时以退出码 1 结束，可直接用于 CI 的回归检查::
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget qqmusicdownloader.cli=200 --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+# 默认预算（毫秒）较为宽松，主要拦截重新引入重量级依赖这类数量级的回归
+DEFAULT_BUDGETS_MS: Dict[str, float] = {
+    "qqmusicdownloader.cli": 300.0,
+    "qqmusicdownloader.services": 250.0,
+    "qqmusicdownloader.domain": 100.0,
+}
+
+# 这些入口不应触发 aiohttp/Textual 的导入
+DEFAULT_FORBIDDEN: Dict[str, List[str]] = {
+    "qqmusicdownloader.cli": ["aiohttp", "textual"],
+    "qqmusicdownloader.services": ["aiohttp", "textual"],
+    "qqmusicdownloader.domain": ["aiohttp", "aiofiles", "textual"],
+}
+
+
+@dataclass(slots=True)
+class ImportSample:
+    """单次导入的解析结果，时间单位为微秒。"""
+
+    total_us: int
+    self_us: Dict[str, int]
+    cumulative_us: Dict[str, int]
+
+
+@dataclass(slots=True)
+class ImportReport:
+    """单个模块的基准结果。"""
+
+    module: str
+    runs: int
+    median_ms: float
+    budget_ms: Optional[float]
+    top_self_ms: List[tuple[str, float]] = field(default_factory=list)
+    forbidden_loaded: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        within_budget = self.budget_ms is None or self.median_ms <= self.budget_ms
+        return within_budget and not self.forbidden_loaded
+
+
+def parse_importtime(stderr: str, module: str) -> ImportSample:
+    """解析 ``-X importtime`` 输出。"""
+
+    self_us: Dict[str, int] = {}
+    cumulative_us: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:") :].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # 表头行
+        name = parts[2].strip()
+        self_us[name] = int(parts[0])
+        cumulative_us[name] = int(parts[1])
+    return ImportSample(
+        total_us=cumulative_us.get(module, 0),
+        self_us=self_us,
+        cumulative_us=cumulative_us,
+    )
+
+
+def sample_import(module: str, python: str = sys.executable) -> ImportSample:
+    """在全新子进程中导入模块并采样一次。"""
+
+    completed = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return parse_importtime(completed.stderr, module)
+
+
+def benchmark(
+    module: str,
+    *,
+    runs: int = 5,
+    budget_ms: Optional[float] = None,
+    forbidden: Sequence[str] = (),
+    top: int = 5,
+) -> ImportReport:
+    """测量模块导入耗时并生成报告。"""
+
+    sample_import(module)  # 预热 __pycache__
+    samples = [sample_import(module) for _ in range(max(1, runs))]
+    median_sample = sorted(samples, key=lambda s: s.total_us)[len(samples) // 2]
+
+    loaded = median_sample.cumulative_us
+    top_self = sorted(median_sample.self_us.items(), key=lambda item: item[1], reverse=True)
+    return ImportReport(
+        module=module,
+        runs=len(samples),
+        median_ms=statistics.median(s.total_us for s in samples) / 1000,
+        budget_ms=budget_ms,
+        top_self_ms=[(name, us / 1000) for name, us in top_self[:top]],
+        forbidden_loaded=[
+            name for name in forbidden if any(m == name or m.startswith(name + ".") for m in loaded)
+        ],
+    )
+
+
+def _parse_budgets(values: Sequence[str]) -> Dict[str, float]:
+    budgets: Dict[str, float] = {}
+    for value in values:
+        module, sep, limit = value.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"预算格式应为 模块=毫秒: {value}")
+        budgets[module] = float(limit)
+    return budgets
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="测量模块导入耗时并检查预算")
+    parser.add_argument(
+        "modules",
+        nargs="*",
+        default=list(DEFAULT_BUDGETS_MS),
+        help="要测量的模块，默认测量主要入口",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="每个模块的采样次数")
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="MODULE=MS",
+        help="覆盖指定模块的耗时预算",
+    )
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args(argv)
+
+    budgets = {**DEFAULT_BUDGETS_MS, **_parse_budgets(args.budget)}
+    reports = [
+        benchmark(
+            module,
+            runs=args.runs,
+            budget_ms=budgets.get(module),
+            forbidden=DEFAULT_FORBIDDEN.get(module, ()),
+        )
+        for module in args.modules
+    ]
+
+    if args.json:
+        print(
+            json.dumps(
+                [{**asdict(report), "ok": report.ok} for report in reports],
+                ensure_ascii=False,
+                indent=2,
+            )
+        )
+    else:
+        for report in reports:
+            status = "OK" if report.ok else "FAIL"
+            budget = f"{report.budget_ms:.0f}ms" if report.budget_ms is not None else "-"
+            print(f"[{status}] {report.module}: {report.median_ms:.1f}ms (预算 {budget})")
+            for name, ms in report.top_self_ms:
+                print(f"    {ms:8.1f}ms  {name}")
+            if report.forbidden_loaded:
+                print(f"    禁止加载的模块: {', '.join(report.forbidden_loaded)}")
+
+    return 0 if all(report.ok for report in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
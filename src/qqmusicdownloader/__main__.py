@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from qqmusicdownloader.ui.app import main
+import sys
+
+from qqmusicdownloader.cli import main
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
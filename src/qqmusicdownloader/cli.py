@@ -0,0 +1,500 @@
+"""命令行入口：无参数时启动 TUI，``get`` 子命令提供无界面的批量下载。
+
+本模块及其导入链不依赖 Textual，``get`` 子命令可在 cron、容器等
+无终端界面的环境中运行；只有启动 TUI 时才会导入 ``qqmusicdownloader.ui``。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Optional,
+    Sequence,
+    TextIO,
+)
+
+from qqmusicdownloader.domain import (
+    BatchProgress,
+    DownloadConfig,
+    DownloadResult,
+    SongRecord,
+)
+from qqmusicdownloader.infrastructure import metrics, profiling, tracing
+from qqmusicdownloader.services import ORDERING_POLICIES, DownloadService
+
+LOGGER = logging.getLogger(__name__)
+
+COOKIE_ENV = "QQMUSIC_COOKIE"
+TRACE_ENV = "QQMUSIC_TRACE"
+PROFILE_ENV = "QQMUSIC_PROFILE"
+
+SEARCH_CONCURRENCY = 4
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def configure_logging(level: int = logging.INFO, stream: TextIO | None = None) -> None:
+    """配置根日志记录器；只在程序入口调用，避免导入时产生副作用。"""
+
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=stream)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构造命令行参数解析器。"""
+
+    parser = argparse.ArgumentParser(
+        prog="qqmusicdownloader",
+        description="QQ 音乐下载器，不带子命令时启动终端界面。",
+    )
+    subparsers = parser.add_subparsers(dest="command")
+
+    get = subparsers.add_parser(
+        "get",
+        help="无界面批量下载",
+        description=(
+            "从输入文件批量下载歌曲。每行为一个搜索关键词（取第一条结果）"
+            "或一条 JSON 格式的歌曲信息；空行与 # 开头的行会被忽略。"
+            "也可以通过 --playlist 直接下载整个歌单。"
+        ),
+    )
+    get.add_argument(
+        "-i",
+        "--input",
+        help="歌曲列表文件，- 表示从标准输入读取",
+    )
+    get.add_argument(
+        "-p",
+        "--playlist",
+        action="append",
+        default=[],
+        help="歌单 ID 或分享链接，可重复指定；歌曲边获取边下载",
+    )
+    get.add_argument(
+        "-q",
+        "--quality",
+        type=int,
+        choices=(1, 2, 3),
+        default=DownloadConfig().default_quality,
+        help="音质：1=128kbps，2=320kbps，3=无损",
+    )
+    get.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=DownloadConfig().max_concurrent,
+        help="并发下载数量",
+    )
+    get.add_argument("-o", "--output", type=Path, help="下载目录")
+    get.add_argument(
+        "--cookie",
+        action="append",
+        default=[],
+        help=f"QQ 音乐 Cookie，可重复指定以启用多账号池，默认读取环境变量 {COOKIE_ENV}",
+    )
+    get.add_argument(
+        "--cookie-file",
+        type=Path,
+        help="从文件读取 Cookie，每行一个账号",
+    )
+    get.add_argument(
+        "--account-policy",
+        choices=("round_robin", "budget"),
+        default="round_robin",
+        help="多账号时的请求分摊策略",
+    )
+    get.add_argument(
+        "--order",
+        choices=sorted(ORDERING_POLICIES),
+        default=DownloadConfig().order_policy,
+        help="任务派发顺序",
+    )
+    get.add_argument(
+        "--fallback",
+        action="store_true",
+        help="目标音质不可用时自动降级",
+    )
+    get.add_argument("--no-lyrics", action="store_true", help="不下载歌词")
+    get.add_argument(
+        "--json-progress",
+        action="store_true",
+        help="以 JSON Lines 格式向标准输出报告进度",
+    )
+    get.add_argument(
+        "--trace",
+        type=Path,
+        help=f"记录各阶段耗时并导出为 Chrome Trace 文件，也可设置环境变量 {TRACE_ENV}",
+    )
+    get.add_argument(
+        "--profile",
+        type=Path,
+        metavar="DIR",
+        help=(
+            "对每次搜索、批次与单曲下载分别做性能分析，结果与摘要写入该目录，"
+            f"也可设置环境变量 {PROFILE_ENV}"
+        ),
+    )
+    get.add_argument(
+        "--metrics-port",
+        type=int,
+        help="在本机该端口提供 Prometheus /metrics 端点（0 表示随机端口）",
+    )
+    get.add_argument(
+        "--metrics-file",
+        type=Path,
+        help="定期将指标以 Prometheus 文本格式写入该文件",
+    )
+    get.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=15.0,
+        help="写入指标文件的间隔（秒）",
+    )
+    get.add_argument("-v", "--verbose", action="store_true", help="输出调试日志")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """命令行入口，返回进程退出码。"""
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "get" and args.input is None and not args.playlist:
+        parser.error("get 需要 --input 或 --playlist")
+    trace_path = getattr(args, "trace", None) or os.environ.get(TRACE_ENV)
+    if trace_path:
+        tracing.enable()
+    profile_dir = getattr(args, "profile", None) or os.environ.get(PROFILE_ENV)
+    if profile_dir:
+        profiling.enable(Path(profile_dir))
+    try:
+        if args.command is None:
+            from qqmusicdownloader.ui.app import main as run_tui
+
+            run_tui()
+            return EXIT_OK
+
+        # 日志写入标准错误，标准输出留给进度报告
+        configure_logging(
+            logging.DEBUG if args.verbose else logging.INFO, stream=sys.stderr
+        )
+        try:
+            exporters = _start_metrics(args)
+        except OSError as exc:
+            LOGGER.error("无法启动指标端点: %s", exc)
+            return EXIT_USAGE
+        try:
+            return asyncio.run(run_get(args))
+        except KeyboardInterrupt:
+            return EXIT_FAILED
+        finally:
+            for stop in exporters:
+                stop()
+    finally:
+        if trace_path:
+            count = tracing.export_chrome(Path(trace_path))
+            LOGGER.info("已导出 %s 个耗时跨度: %s", count, trace_path)
+
+
+def _start_metrics(args: argparse.Namespace) -> list[Callable[[], None]]:
+    """按参数启动指标端点与定期写文件，返回对应的停止函数。"""
+
+    stops: list[Callable[[], None]] = []
+    if args.metrics_port is not None:
+        server = metrics.MetricsServer(args.metrics_port).start()
+        stops.append(server.close)
+    if args.metrics_file is not None:
+        dumper = metrics.MetricsDumper(
+            args.metrics_file, interval=args.metrics_interval
+        ).start()
+        stops.append(dumper.stop)
+    return stops
+
+
+async def run_get(args: argparse.Namespace) -> int:
+    """执行 ``get`` 子命令。"""
+
+    reporter = ProgressReporter(json_mode=args.json_progress)
+    try:
+        cookies = _read_cookies(args)
+    except OSError as exc:
+        reporter.error(f"无法读取 Cookie 文件: {exc}")
+        return EXIT_USAGE
+    if not cookies:
+        reporter.error(f"缺少 Cookie，请使用 --cookie、--cookie-file 或环境变量 {COOKIE_ENV}")
+        return EXIT_USAGE
+    try:
+        lines = _read_input(args.input) if args.input is not None else []
+    except OSError as exc:
+        reporter.error(f"无法读取输入文件: {exc}")
+        return EXIT_USAGE
+
+    config = DownloadConfig(
+        max_concurrent=max(1, args.jobs),
+        default_quality=args.quality,
+        download_lyrics=not args.no_lyrics,
+        order_policy=args.order,
+        quality_fallback=args.fallback,
+    )
+    if len(cookies) == 1:
+        service = DownloadService.from_cookie(cookies[0], config=config)
+    else:
+        service = DownloadService.from_cookies(
+            cookies, config=config, policy=args.account_policy
+        )
+    if not await service.validate_cookie():
+        reporter.error("Cookie 无效或已过期")
+        return EXIT_USAGE
+    if args.output is not None:
+        service.set_download_path(args.output)
+
+    service.open_library()
+    await service.scan_library()
+
+    callbacks = {
+        "on_progress": reporter.progress,
+        "on_song_start": reporter.song_start,
+        "on_song_done": reporter.song_done,
+    }
+    missing: list[str] = []
+    results: list[DownloadResult] = []
+    if lines:
+        songs = _resolve_songs(service, lines, reporter, missing)
+        # 按输入顺序派发时边搜索边下载；其他策略需要完整列表才能排序
+        source: AsyncIterable[SongRecord] | list[SongRecord] = (
+            songs if args.order == "fifo" else [song async for song in songs]
+        )
+        results.extend(await service.download_many(source, args.quality, **callbacks))
+    for playlist in args.playlist:
+        reporter.emit("playlist", playlist=playlist)
+        try:
+            results.extend(
+                await service.download_playlist(playlist, args.quality, **callbacks)
+            )
+        except (ValueError, RuntimeError) as exc:
+            reporter.error(str(exc))
+            return EXIT_FAILED
+
+    if not results:
+        reporter.error("没有可下载的歌曲")
+        return EXIT_FAILED if lines or args.playlist else EXIT_OK
+
+    reporter.summary(results, unresolved=len(missing))
+    if missing or not all(result.success for result in results):
+        return EXIT_FAILED
+    return EXIT_OK
+
+
+class ProgressReporter:
+    """将下载事件输出为人类可读文本或 JSON Lines。"""
+
+    def __init__(
+        self,
+        *,
+        json_mode: bool = False,
+        stream: TextIO | None = None,
+        min_interval: float = 0.5,
+    ) -> None:
+        self.json_mode = json_mode
+        self._stream = stream
+        self._min_interval = min_interval
+        self._last_progress = 0.0
+        self._pending_progress: dict[str, int] | None = None
+
+    @property
+    def stream(self) -> TextIO:
+        # 延迟读取，便于测试中替换 sys.stdout
+        return self._stream or sys.stdout
+
+    def emit(self, event: str, **fields: Any) -> None:
+        if self.json_mode:
+            record = {"event": event, "time": round(time.time(), 3), **fields}
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.stream.flush()
+
+    def error(self, message: str) -> None:
+        if self.json_mode:
+            self.emit("error", message=message)
+        else:
+            print(f"❌ {message}", file=sys.stderr)
+
+    def unresolved(self, query: str) -> None:
+        if self.json_mode:
+            self.emit("unresolved", query=query)
+        else:
+            print(f"⚠️ 未找到歌曲: {query}", file=sys.stderr)
+
+    def song_start(self, index: int, song: SongRecord) -> None:
+        if self.json_mode:
+            self.emit("start", index=index, **_describe(song))
+        else:
+            print(f"⬇️ 开始下载: {_title(song)}", file=sys.stderr)
+
+    def song_done(self, index: int, song: SongRecord, result: DownloadResult) -> None:
+        if self.json_mode:
+            self.emit(
+                "done",
+                index=index,
+                success=result.success,
+                skipped=result.skipped,
+                cancelled=result.cancelled,
+                error=result.error,
+                bytes=result.bytes_downloaded,
+                **_describe(song),
+            )
+        elif result.skipped:
+            print(f"⏭ 已存在: {_title(song)}", file=sys.stderr)
+        elif result.success:
+            print(f"✅ 完成: {_title(song)}", file=sys.stderr)
+        else:
+            print(f"❌ 失败: {_title(song)} ({result.error})", file=sys.stderr)
+
+    def progress(self, progress: BatchProgress) -> None:
+        """按 ``min_interval`` 节流输出进度；批次结束时的进度总会输出。"""
+
+        self._pending_progress = {
+            "total": progress.total,
+            "succeeded": progress.succeeded,
+            "failed": progress.failed,
+            "active": progress.active,
+            "bytes": progress.bytes_downloaded,
+        }
+        now = time.monotonic()
+        if (
+            now - self._last_progress < self._min_interval
+            and progress.finished < progress.total
+        ):
+            return
+        self._last_progress = now
+        self.flush_progress()
+
+    def flush_progress(self) -> None:
+        """输出被节流暂存的最新进度。"""
+
+        if self._pending_progress is not None:
+            self.emit("progress", **self._pending_progress)
+            self._pending_progress = None
+
+    def summary(self, results: Sequence[DownloadResult], *, unresolved: int = 0) -> None:
+        self.flush_progress()
+        succeeded = sum(1 for result in results if result.success)
+        skipped = sum(1 for result in results if result.skipped)
+        failed = len(results) - succeeded
+        if self.json_mode:
+            self.emit(
+                "summary",
+                total=len(results),
+                succeeded=succeeded,
+                skipped=skipped,
+                failed=failed,
+                unresolved=unresolved,
+            )
+        else:
+            print(
+                f"下载结束：成功 {succeeded}（其中已存在 {skipped}），"
+                f"失败 {failed}，未找到 {unresolved}",
+                file=sys.stderr,
+            )
+
+
+def _read_cookies(args: argparse.Namespace) -> list[str]:
+    cookies = [cookie.strip() for cookie in args.cookie]
+    if args.cookie_file is not None:
+        cookies.extend(args.cookie_file.read_text(encoding="utf-8").splitlines())
+    if not cookies:
+        cookies.append(os.environ.get(COOKIE_ENV, ""))
+    return [cookie.strip() for cookie in cookies if cookie.strip()]
+
+
+def _read_input(source: str) -> list[str]:
+    if source == "-":
+        raw: Iterable[str] = sys.stdin
+    else:
+        raw = Path(source).read_text(encoding="utf-8").splitlines()
+    lines = (line.strip() for line in raw)
+    return [line for line in lines if line and not line.startswith("#")]
+
+
+async def _resolve_songs(
+    service: DownloadService,
+    lines: Sequence[str],
+    reporter: ProgressReporter,
+    missing: list[str],
+) -> AsyncIterator[SongRecord]:
+    """将输入行解析为歌曲信息：JSON 行直接使用，其余按关键词搜索取首条。
+
+    最多提前 ``SEARCH_CONCURRENCY`` 行发起查询，消费者每取走一条结果才补充
+    下一行，长列表不会一次性创建全部任务；结果按输入顺序产出，
+    未找到的输入行记入 ``missing``。
+    """
+
+    async def lookup(line: str) -> SongRecord | None:
+        if line.startswith("{"):
+            try:
+                return json.loads(line)
+            except json.JSONDecodeError:
+                LOGGER.warning("无法解析的歌曲信息: %s", line)
+                return None
+        try:
+            found = await service.search(line)
+        except Exception:
+            LOGGER.exception("搜索失败: %s", line)
+            found = []
+        return found[0] if found else None
+
+    remaining = iter(lines)
+    window: deque[tuple[str, asyncio.Task[SongRecord | None]]] = deque()
+
+    def refill() -> None:
+        while len(window) < SEARCH_CONCURRENCY:
+            line = next(remaining, None)
+            if line is None:
+                return
+            window.append((line, asyncio.create_task(lookup(line))))
+
+    try:
+        refill()
+        while window:
+            line, task = window.popleft()
+            song = await task
+            refill()
+            if song is None:
+                missing.append(line)
+                reporter.unresolved(line)
+                continue
+            yield song
+    finally:
+        for _, task in window:
+            task.cancel()
+
+
+def _title(song: SongRecord) -> str:
+    return f"{song.get('name', '未知歌曲')} - {song.get('singer', '未知歌手')}"
+
+
+def _describe(song: SongRecord) -> dict[str, str]:
+    return {
+        "songmid": song.get("songmid", ""),
+        "name": song.get("name", ""),
+        "singer": song.get("singer", ""),
+    }
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,12 +3,31 @@
 from __future__ import annotations
 
 from .config import DownloadConfig
-from .models import SongRecord, FileSizeMap
+from .models import (
+    QUALITY_EXTENSIONS,
+    QUALITY_SIZE_KEYS,
+    BatchProgress,
+    DownloadResult,
+    FileSizeMap,
+    SongRecord,
+    expected_file_size,
+    quality_fallback_chain,
+    sanitize_filename,
+    song_file_stem,
+)
 from .ports import DownloadAPI
 
 __all__ = [
     "DownloadConfig",
     "SongRecord",
     "FileSizeMap",
+    "QUALITY_SIZE_KEYS",
+    "QUALITY_EXTENSIONS",
+    "expected_file_size",
+    "quality_fallback_chain",
+    "sanitize_filename",
+    "song_file_stem",
     "DownloadAPI",
+    "DownloadResult",
+    "BatchProgress",
 ]
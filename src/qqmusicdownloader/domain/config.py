@@ -11,3 +11,10 @@ class DownloadConfig:
 
     max_concurrent: int = 3
     default_quality: int = 1
+    lookahead: int = 2
+    download_lyrics: bool = True
+    max_attempts: int = 3
+    order_policy: str = "fifo"
+    quality_fallback: bool = False
+    search_cache_size: int = 128
+    search_cache_ttl: float = 300.0
@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import TypedDict
 
 FileSizeMap = TypedDict(
     "FileSizeMap",
     {
+        "96aac": int,
         "128": int,
         "320": int,
         "flac": int,
@@ -25,3 +27,87 @@ class SongRecord(TypedDict, total=False):
     media_mid: str
     interval: int
     size: FileSizeMap
+
+
+# 键为实际请求的格式：1 为 C400 前缀的 m4a，2 为 M500 前缀的 320k mp3，3 为 flac
+QUALITY_SIZE_KEYS: dict[int, str] = {
+    1: "96aac",
+    2: "320",
+    3: "flac",
+}
+
+
+# 各音质保存到本地时使用的扩展名
+QUALITY_EXTENSIONS: dict[int, str] = {
+    1: "m4a",
+    2: "mp3",
+    3: "flac",
+}
+
+_ILLEGAL_FILENAME_CHARS = '<>:"/\\|?*'
+
+
+def sanitize_filename(filename: str) -> str:
+    """将文件名中的非法字符替换为下划线。"""
+
+    for char in _ILLEGAL_FILENAME_CHARS:
+        filename = filename.replace(char, "_")
+    return filename
+
+
+def song_file_stem(song: SongRecord) -> str:
+    """返回歌曲下载后的文件名（不含扩展名），形如 ``歌名 - 歌手``。"""
+
+    name = song.get("name", "未知歌曲")
+    singer = song.get("singer", "未知歌手")
+    return sanitize_filename(f"{name} - {singer}")
+
+
+def expected_file_size(song: SongRecord, quality: int) -> int:
+    """返回搜索结果中记录的目标音质文件大小，未知或未采集该格式时返回 0。"""
+
+    key = QUALITY_SIZE_KEYS.get(quality)
+    if key is None:
+        return 0
+    sizes = song.get("size") or {}
+    try:
+        return int(sizes.get(key, 0) or 0)  # type: ignore[call-overload]
+    except (TypeError, ValueError):
+        return 0
+
+
+def quality_fallback_chain(quality: int) -> tuple[int, ...]:
+    """返回从目标音质逐级降到最低音质的候选顺序，例如 3 → (3, 2, 1)。"""
+
+    if quality not in QUALITY_SIZE_KEYS:
+        return (quality,)
+    return tuple(q for q in sorted(QUALITY_SIZE_KEYS, reverse=True) if q <= quality)
+
+
+@dataclass(slots=True)
+class DownloadResult:
+    """批量任务中单首歌曲的下载结果。"""
+
+    song: SongRecord
+    success: bool
+    error: str = ""
+    cancelled: bool = False
+    bytes_downloaded: int = 0
+    skipped: bool = False
+
+
+@dataclass(slots=True)
+class BatchProgress:
+    """批量下载的聚合进度快照。"""
+
+    total: int
+    succeeded: int = 0
+    failed: int = 0
+    active: int = 0
+    bytes_downloaded: int = 0
+
+    @property
+    def finished(self) -> int:
+        """已结束（成功或失败）的歌曲数量。"""
+
+        return self.succeeded + self.failed
@@ -2,12 +2,14 @@
 
 from __future__ import annotations
 
-import asyncio
 from pathlib import Path
-from typing import Iterable, Protocol
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Iterable, Protocol, Sequence
 
 from qqmusicdownloader.domain import SongRecord
 
+if TYPE_CHECKING:
+    import asyncio
+
 
 class DownloadAPI(Protocol):
     """下载相关基础设施应实现的最小接口。"""
@@ -15,8 +17,15 @@ class DownloadAPI(Protocol):
     async def validate_cookie(self) -> bool:
         """校验当前 Cookie 是否有效。"""
 
-    async def search_song(self, keyword: str) -> list[SongRecord]:
-        """根据关键词搜索歌曲。"""
+    async def search_song(
+        self, keyword: str, *, page: int = 1, page_size: int = 20
+    ) -> list[SongRecord]:
+        """根据关键词搜索歌曲，``page`` 从 1 开始。"""
+
+    def iter_playlist(
+        self, playlist: str, *, page_size: int = 100
+    ) -> AsyncIterator[list[SongRecord]]:
+        """按页产出歌单中的歌曲，``playlist`` 可以是歌单 ID 或分享链接。"""
 
     def get_download_path(self) -> str:
         """返回当前下载目录路径字符串。"""
@@ -24,9 +33,20 @@ class DownloadAPI(Protocol):
     def configure_download_dirs(self, base_dir: Path) -> None:
         """使用新的基础目录配置下载路径。"""
 
+    def set_bandwidth_limit(self, bytes_per_second: int | None) -> None:
+        """设置所有并发下载共享的全局限速。"""
+
     async def get_song_url(self, songmid: str, media_mid: str, quality: int) -> str | None:
         """获取指定歌曲在特定音质下的下载链接。"""
 
+    async def get_song_url_with_fallback(
+        self, songmid: str, media_mid: str, qualities: Sequence[int]
+    ) -> tuple[int, str] | None:
+        """一次请求多个候选音质，返回最优可用音质及其下载链接。"""
+
+    async def get_lyrics(self, songmid: str) -> str | None:
+        """获取歌曲歌词文本。"""
+
     async def download_with_lyrics(
         self,
         url: str,
@@ -37,6 +57,11 @@ class DownloadAPI(Protocol):
         progress_bar: object | None = None,
         progress_label: object | None = None,
         pause_events: Iterable[asyncio.Event] | None = None,
+        task_limiter: object | None = None,
+        expected_size: int = 0,
+        lyrics: str | None = None,
+        with_lyrics: bool = True,
+        on_progress: Callable[[int, int], None] | None = None,
     ) -> bool:
         """执行歌曲与歌词的下载流程。"""
 
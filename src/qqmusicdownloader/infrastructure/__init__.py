@@ -1,11 +1,72 @@
-"""基础设施层：封装外部系统的适配实现。"""
+"""基础设施层：封装外部系统的适配实现。
+
+导出项按需加载（PEP 562），``aiohttp`` 等较重的依赖只在首次访问
+``QQMusicAPI`` 时导入，命令行的短生命周期调用无需为此付出启动开销。
+"""
 
 from __future__ import annotations
 
-from .qq_music_api import QQMusicAPI
-from . import crypto
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from . import crypto, metrics, profiling, tracing
+    from .bandwidth import BandwidthLimiter, TokenBucket
+    from .diagnostics import ConnectionStats, LatencyRecorder, LoopLagMonitor
+    from .errors import RateLimitedError
+    from .job_store import Job, JobStore
+    from .library_index import LibraryEntry, LibraryIndex
+    from .manifest import DownloadManifest, ManifestEntry
+    from .qq_music_api import QQMusicAPI
+
+_EXPORTS = {
+    "BandwidthLimiter": ".bandwidth",
+    "TokenBucket": ".bandwidth",
+    "ConnectionStats": ".diagnostics",
+    "LatencyRecorder": ".diagnostics",
+    "LoopLagMonitor": ".diagnostics",
+    "RateLimitedError": ".errors",
+    "Job": ".job_store",
+    "JobStore": ".job_store",
+    "LibraryEntry": ".library_index",
+    "LibraryIndex": ".library_index",
+    "DownloadManifest": ".manifest",
+    "ManifestEntry": ".manifest",
+    "QQMusicAPI": ".qq_music_api",
+}
 
 __all__ = [
+    "BandwidthLimiter",
+    "ConnectionStats",
+    "DownloadManifest",
+    "Job",
+    "JobStore",
+    "LatencyRecorder",
+    "LibraryEntry",
+    "LibraryIndex",
+    "LoopLagMonitor",
+    "ManifestEntry",
     "QQMusicAPI",
+    "RateLimitedError",
+    "TokenBucket",
     "crypto",
+    "metrics",
+    "profiling",
+    "tracing",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name in ("crypto", "metrics", "profiling", "tracing"):
+        return import_module(f".{name}", __name__)
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
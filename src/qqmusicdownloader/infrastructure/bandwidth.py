@@ -0,0 +1,93 @@
+"""下载带宽限速器：基于令牌桶实现全局与单任务限速。"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """异步令牌桶，速率单位为字节/秒。
+
+    速率为 ``None`` 或非正数时表示不限速，``consume`` 直接返回。
+    等待令牌时持有 ``asyncio.Lock``，由于锁按 FIFO 顺序唤醒，
+    多个并发数据流会按块轮流获得带宽，从而实现公平分配。
+    """
+
+    def __init__(self, rate: Optional[float] = None, *, burst: Optional[float] = None) -> None:
+        self._rate: Optional[float] = None
+        self._burst_override = burst
+        self._capacity = 0.0
+        self._tokens = 0.0
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.set_rate(rate)
+
+    @property
+    def rate(self) -> Optional[float]:
+        """当前速率，``None`` 表示不限速。"""
+
+        return self._rate
+
+    def set_rate(self, rate: Optional[float]) -> None:
+        """运行时调整速率，立即对后续数据块生效。"""
+
+        self._refill()
+        if rate is None or rate <= 0:
+            self._rate = None
+            self._capacity = 0.0
+            self._tokens = 0.0
+            return
+
+        self._rate = float(rate)
+        self._capacity = float(self._burst_override or rate)
+        self._tokens = min(self._tokens, self._capacity)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self._rate is not None:
+            elapsed = now - self._updated_at
+            self._tokens = min(self._capacity, self._tokens + elapsed * self._rate)
+        self._updated_at = now
+
+    async def consume(self, amount: int) -> None:
+        """消耗 ``amount`` 个令牌，不足时等待。
+
+        允许令牌透支：单块数据大于桶容量时，先记账再按欠额休眠，
+        避免大块数据永远拿不到令牌。
+        """
+
+        if self._rate is None or amount <= 0:
+            return
+
+        async with self._lock:
+            self._refill()
+            self._tokens -= amount
+            if self._tokens < 0 and self._rate is not None:
+                await asyncio.sleep(-self._tokens / self._rate)
+
+
+class BandwidthLimiter:
+    """组合全局令牌桶与可选的单任务令牌桶。"""
+
+    def __init__(self, global_rate: Optional[float] = None) -> None:
+        self.global_bucket = TokenBucket(global_rate)
+
+    @property
+    def global_rate(self) -> Optional[float]:
+        """当前全局限速（字节/秒）。"""
+
+        return self.global_bucket.rate
+
+    def set_global_rate(self, rate: Optional[float]) -> None:
+        """调整全局限速，``None`` 表示取消限速。"""
+
+        self.global_bucket.set_rate(rate)
+
+    async def throttle(self, amount: int, task_bucket: Optional[TokenBucket] = None) -> None:
+        """按数据块大小依次通过单任务与全局令牌桶。"""
+
+        if task_bucket is not None:
+            await task_bucket.consume(amount)
+        await self.global_bucket.consume(amount)
@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
+from .backend import CryptoBackend, NodeCryptoBackend
 from .bridge import (
     NodeCryptoError,
+    bridge_stats,
     decrypt_response,
     encrypt_payload,
 )
 
 __all__ = [
+    "CryptoBackend",
+    "NodeCryptoBackend",
     "NodeCryptoError",
+    "bridge_stats",
     "decrypt_response",
     "encrypt_payload",
 ]
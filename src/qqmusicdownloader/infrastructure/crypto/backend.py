@@ -0,0 +1,55 @@
+"""musics.fcg 加解密后端接口。"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Protocol, Tuple
+
+from .bridge import (
+    _NODE_CLIENT,
+    _NodeCryptoClient,
+    decrypt_response,
+    encrypt_payload,
+)
+
+
+class CryptoBackend(Protocol):
+    """``QQMusicAPI`` 依赖的加解密能力，方法会在工作线程中调用。"""
+
+    def encrypt_payload(self, payload: str) -> Tuple[str, str]:
+        """返回加密后的请求体与 sign。"""
+
+    def decrypt_response(self, blob: bytes) -> Tuple[str, Dict[str, Any] | None]:
+        """返回解密后的文本与可选 JSON 对象。"""
+
+
+class NodeCryptoBackend:
+    """默认后端：通过长驻 Node 进程复用官方加解密逻辑。
+
+    默认与模块级函数共享同一个进程；``dedicated=True`` 时使用独立进程，
+    便于基准测试测量冷启动，用毕需调用 ``close``。
+    """
+
+    def __init__(self, *, dedicated: bool = False) -> None:
+        self._client = _NodeCryptoClient() if dedicated else None
+
+    def start(self) -> None:
+        """提前启动 Node 进程。"""
+
+        (self._client or _NODE_CLIENT).start()
+
+    def stats(self) -> Dict[str, Any]:
+        """返回所用进程的排队深度与耗时分位数。"""
+
+        return (self._client or _NODE_CLIENT).stats()
+
+    def close(self) -> None:
+        """关闭独立进程，共享进程由退出钩子负责。"""
+
+        if self._client is not None:
+            self._client.close()
+
+    def encrypt_payload(self, payload: str) -> Tuple[str, str]:
+        return encrypt_payload(payload, client=self._client)
+
+    def decrypt_response(self, blob: bytes) -> Tuple[str, Dict[str, Any] | None]:
+        return decrypt_response(blob, client=self._client)
@@ -10,10 +10,14 @@ import shutil
 import subprocess
 import tempfile
 import threading
+import time
 from importlib import resources
 from pathlib import Path
 from typing import IO, Any, Dict, Optional, Tuple
 
+from qqmusicdownloader.infrastructure import metrics, tracing
+from qqmusicdownloader.infrastructure.diagnostics import LatencyRecorder
+
 
 class NodeCryptoError(RuntimeError):
     """Node 工具执行失败时抛出的异常."""
@@ -77,6 +81,12 @@ class _NodeCryptoClient:
         self._stdout: IO[str] | None = None
         self._stderr_thread: threading.Thread | None = None
         self._lock = threading.Lock()
+        # 诊断计数：排队等待进程锁的调用数、排队耗时与进程往返耗时
+        self._stats_lock = threading.Lock()
+        self.waiting = 0
+        self.errors = 0
+        self.wait_latency = LatencyRecorder()
+        self.latency = LatencyRecorder()
 
     def _drain_stderr(self, stream: IO[str]) -> None:
         """持续读取 stderr 并记录异常输出."""
@@ -147,24 +157,56 @@ class _NodeCryptoClient:
             )
             self._stderr_thread.start()
 
-    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
-        """向 Node 进程发送请求并解析结果."""
+    def start(self) -> None:
+        """提前启动 Node 进程，首次请求时不再承担启动开销."""
 
-        message = json.dumps(payload, ensure_ascii=False)
         with self._lock:
             self._ensure_process()
-            assert self._stdin is not None
-            assert self._stdout is not None
 
-            _LOGGER.debug("发送 Node 请求: %s", payload.get("action"))
-            self._stdin.write(message + "\n")
-            self._stdin.flush()
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """向 Node 进程发送请求并解析结果."""
 
-            response = self._stdout.readline()
-            if response == "":
-                returncode = self._process.poll() if self._process else None
-                self._close_no_lock()
-                raise NodeCryptoError(f"Node 进程意外退出, returncode={returncode}")
+        message = json.dumps(payload, ensure_ascii=False)
+        queued_at = time.perf_counter()
+        with self._stats_lock:
+            self.waiting += 1
+        try:
+            return self._request(message, payload, queued_at)
+        except NodeCryptoError:
+            with self._stats_lock:
+                self.errors += 1
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """返回排队深度、错误数与耗时分位数（毫秒）."""
+
+        return {
+            "waiting": self.waiting,
+            "busy": self._lock.locked(),
+            "errors": self.errors,
+            "latency": self.latency.snapshot(),
+            "wait": self.wait_latency.snapshot(),
+        }
+
+    def _request(
+        self, message: str, payload: Dict[str, Any], queued_at: float
+    ) -> Dict[str, Any]:
+        with self._lock:
+            started = time.perf_counter()
+            with self._stats_lock:
+                self.waiting -= 1
+            self.wait_latency.record(started - queued_at)
+            try:
+                with tracing.span(
+                    "bridge.round_trip",
+                    action=payload.get("action"),
+                    wait_ms=(started - queued_at) * 1000,
+                ):
+                    response = self._round_trip(message, payload)
+            finally:
+                elapsed = time.perf_counter() - started
+                self.latency.record(elapsed)
+                metrics.BRIDGE_SECONDS.observe(elapsed, action=payload.get("action"))
 
         response = response.strip()
         if not response:
@@ -190,6 +232,24 @@ class _NodeCryptoClient:
 
         return data
 
+    def _round_trip(self, message: str, payload: Dict[str, Any]) -> str:
+        """在持有进程锁的前提下写入一行请求并读取一行响应."""
+
+        self._ensure_process()
+        assert self._stdin is not None
+        assert self._stdout is not None
+
+        _LOGGER.debug("发送 Node 请求: %s", payload.get("action"))
+        self._stdin.write(message + "\n")
+        self._stdin.flush()
+
+        response = self._stdout.readline()
+        if response == "":
+            returncode = self._process.poll() if self._process else None
+            self._close_no_lock()
+            raise NodeCryptoError(f"Node 进程意外退出, returncode={returncode}")
+        return response
+
     def close(self) -> None:
         """终止 Node 进程."""
 
@@ -201,18 +261,29 @@ _NODE_CLIENT = _NodeCryptoClient()
 atexit.register(_NODE_CLIENT.close)
 
 
-def _node_request(action: str, **payload: Any) -> Dict[str, Any]:
-    """封装 Node 请求, 自动附加 action 字段."""
+def bridge_stats() -> Dict[str, Any]:
+    """返回加解密桥接的排队深度与耗时分位数，供诊断界面展示."""
+
+    return _NODE_CLIENT.stats()
+
+
+def _node_request(
+    action: str, *, client: Optional[_NodeCryptoClient] = None, **payload: Any
+) -> Dict[str, Any]:
+    """封装 Node 请求, 自动附加 action 字段; 默认使用共享进程."""
 
     request_body = {"action": action, **payload}
-    return _NODE_CLIENT.request(request_body)
+    return (client or _NODE_CLIENT).request(request_body)
 
 
-def encrypt_payload(payload: str) -> Tuple[str, str]:
+def encrypt_payload(
+    payload: str, *, client: Optional[_NodeCryptoClient] = None
+) -> Tuple[str, str]:
     """生成 musics.fcg 所需的加密体与 sign.
 
     Args:
         payload (str): 原始 JSON 字符串。
+        client: 指定的 Node 进程客户端，默认使用共享进程。
 
     Returns:
         Tuple[str, str]: 依次返回 Base64 请求体与 sign。
@@ -221,7 +292,7 @@ def encrypt_payload(payload: str) -> Tuple[str, str]:
         NodeCryptoError: 当 Node 工具执行失败。
     """
 
-    result = _node_request("encrypt", plain=payload)
+    result = _node_request("encrypt", client=client, plain=payload)
 
     body = result.get("body")
     sign = result.get("sign")
@@ -231,11 +302,14 @@ def encrypt_payload(payload: str) -> Tuple[str, str]:
     return body, sign
 
 
-def decrypt_response(blob: bytes) -> Tuple[str, Dict[str, Any] | None]:
+def decrypt_response(
+    blob: bytes, *, client: Optional[_NodeCryptoClient] = None
+) -> Tuple[str, Dict[str, Any] | None]:
     """解密 musics.fcg 的响应二进制数据.
 
     Args:
         blob (bytes): 从接口获取的原始字节流。
+        client: 指定的 Node 进程客户端，默认使用共享进程。
 
     Returns:
         Tuple[str, Dict[str, Any] | None]: 解密后的文本与可选 JSON 对象。
@@ -245,7 +319,7 @@ def decrypt_response(blob: bytes) -> Tuple[str, Dict[str, Any] | None]:
     """
 
     base64_blob = base64.b64encode(blob).decode("ascii")
-    result = _node_request("decrypt", base64=base64_blob)
+    result = _node_request("decrypt", client=client, base64=base64_blob)
 
     text = result.get("text")
     parsed = result.get("json")
@@ -0,0 +1,108 @@
+"""轻量的运行时诊断计数：耗时分位数、并发连接数与事件循环延迟。
+
+这些计数器会在加解密线程与事件循环中频繁更新，只做常数时间的追加与加减，
+分位数等汇总计算推迟到读取快照时进行。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+
+class LatencyRecorder:
+    """保留最近 ``size`` 个耗时样本（秒）并按需计算分位数，可跨线程使用。"""
+
+    def __init__(self, size: int = 512) -> None:
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self.count += 1
+
+    def snapshot(self) -> dict[str, float]:
+        """返回样本数与 p50/p95/p99/最大值（毫秒）。"""
+
+        with self._lock:
+            ordered = sorted(self._samples)
+            count = self.count
+        return {
+            "count": count,
+            "p50": _nearest_rank(ordered, 50) * 1000,
+            "p95": _nearest_rank(ordered, 95) * 1000,
+            "p99": _nearest_rank(ordered, 99) * 1000,
+            "max": (ordered[-1] if ordered else 0.0) * 1000,
+        }
+
+
+def _nearest_rank(ordered: list[float], q: float) -> float:
+    """最近秩法分位数，``ordered`` 须已排序，没有样本时为 0。"""
+
+    if not ordered:
+        return 0.0
+    rank = math.ceil(q / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+class ConnectionStats:
+    """统计进行中与累计的 HTTP 请求。
+
+    当前实现为每次请求创建独立会话，进行中的请求数即占用的连接数。
+    """
+
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+        self.requests = 0
+        self.failures = 0
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """在请求期间计入进行中的连接，异常退出计为失败。"""
+
+        self.in_flight += 1
+        self.requests += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            yield
+        except Exception:
+            self.failures += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+    def snapshot(self) -> dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "peak": self.peak,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+class LoopLagMonitor:
+    """周期性休眠并测量实际唤醒的延迟，反映事件循环被阻塞的程度。"""
+
+    def __init__(self, interval: float = 0.5, size: int = 240) -> None:
+        self.interval = interval
+        self.lag = LatencyRecorder(size)
+
+    async def run(self) -> None:
+        """持续采样直至被取消。"""
+
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lag.record(max(0.0, loop.time() - started - self.interval))
+
+    def snapshot(self) -> dict[str, Any]:
+        return self.lag.snapshot()
+
@@ -0,0 +1,17 @@
+"""基础设施层的异常类型。"""
+
+from __future__ import annotations
+
+from typing import Optional
+
+
+class RateLimitedError(Exception):
+    """接口提示当前账号请求过于频繁。
+
+    账号池据此将账号暂时移出轮转，``retry_after`` 为服务端建议的等待秒数。
+    """
+
+    def __init__(self, code: int, *, retry_after: Optional[float] = None) -> None:
+        super().__init__(f"请求受限: code={code}")
+        self.code = code
+        self.retry_after = retry_after
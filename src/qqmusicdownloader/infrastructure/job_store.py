@@ -0,0 +1,214 @@
+"""基于 SQLite 的持久化下载任务队列。"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from qqmusicdownloader.domain import SongRecord
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    songmid TEXT NOT NULL,
+    quality INTEGER NOT NULL,
+    song_json TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    bytes_done INTEGER NOT NULL DEFAULT 0,
+    error TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (songmid, quality)
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs (state, id);
+"""
+
+
+@dataclass(slots=True)
+class Job:
+    """任务队列中的一条下载任务。"""
+
+    id: int
+    song: SongRecord
+    quality: int
+    state: str = JOB_PENDING
+    attempts: int = 0
+    bytes_done: int = 0
+    error: str = ""
+
+
+class JobStore:
+    """记录任务状态、尝试次数、已下载字节与错误信息。
+
+    使用 WAL 模式，进程崩溃后已提交的状态不会丢失；
+    ``recover`` 会把上次异常退出时仍处于运行中的任务放回待处理队列。
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """关闭数据库连接。"""
+
+        self._conn.close()
+
+    def enqueue(self, songs: Iterable[SongRecord], quality: int) -> List[int]:
+        """批量加入任务并返回任务编号。
+
+        同一歌曲与音质只保留一条任务；已失败或已完成的任务视为用户要求
+        重新下载，重置为待处理（文件仍在时由曲库或“文件已存在”检查跳过），
+        进行中的任务保持不变。
+        """
+
+        ids: List[int] = []
+        with self._conn:
+            self._conn.execute("BEGIN")
+            for song in songs:
+                songmid = song.get("songmid") or song.get("id")
+                if not songmid:
+                    logger.warning("跳过缺少 songmid 的歌曲: %s", song.get("name"))
+                    continue
+                self._conn.execute(
+                    """
+                    INSERT INTO jobs (songmid, quality, song_json)
+                    VALUES (?, ?, ?)
+                    ON CONFLICT (songmid, quality) DO UPDATE SET
+                        song_json = excluded.song_json,
+                        state = 'pending',
+                        attempts = 0,
+                        bytes_done = 0,
+                        error = '',
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE jobs.state IN ('failed', 'done')
+                    """,
+                    (songmid, quality, json.dumps(song, ensure_ascii=False)),
+                )
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE songmid = ? AND quality = ?",
+                    (songmid, quality),
+                ).fetchone()
+                ids.append(int(row["id"]))
+        return ids
+
+    def recover(self) -> int:
+        """将上次中断时仍在运行的任务恢复为待处理，返回恢复数量。"""
+
+        cursor = self._conn.execute(
+            "UPDATE jobs SET state = ?, updated_at = CURRENT_TIMESTAMP WHERE state = ?",
+            (JOB_PENDING, JOB_RUNNING),
+        )
+        if cursor.rowcount:
+            logger.info("恢复 %s 个中断的下载任务", cursor.rowcount)
+        return cursor.rowcount
+
+    def pending(self, job_ids: Optional[Iterable[int]] = None) -> List[Job]:
+        """按入队顺序返回待处理任务，可限定任务编号。"""
+
+        rows = self._conn.execute(
+            "SELECT * FROM jobs WHERE state = ? ORDER BY id", (JOB_PENDING,)
+        ).fetchall()
+        wanted = set(job_ids) if job_ids is not None else None
+        return [
+            self._row_to_job(row)
+            for row in rows
+            if wanted is None or row["id"] in wanted
+        ]
+
+    def get(self, job_id: int) -> Optional[Job]:
+        """读取单个任务。"""
+
+        row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def mark_running(self, job_id: int) -> None:
+        """标记任务开始执行并累计尝试次数。"""
+
+        self._conn.execute(
+            """
+            UPDATE jobs SET state = ?, attempts = attempts + 1,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (JOB_RUNNING, job_id),
+        )
+
+    def mark_done(self, job_id: int, bytes_done: int) -> None:
+        """标记任务完成。"""
+
+        self._conn.execute(
+            """
+            UPDATE jobs SET state = ?, bytes_done = ?, error = '',
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (JOB_DONE, bytes_done, job_id),
+        )
+
+    def mark_failed(
+        self,
+        job_id: int,
+        error: str,
+        *,
+        bytes_done: int = 0,
+        retry: bool = False,
+    ) -> None:
+        """记录任务失败；``retry`` 为 ``True`` 时放回待处理队列。"""
+
+        self._conn.execute(
+            """
+            UPDATE jobs SET state = ?, bytes_done = ?, error = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+            """,
+            (JOB_PENDING if retry else JOB_FAILED, bytes_done, error, job_id),
+        )
+
+    def release(self, job_id: int) -> None:
+        """将被取消的任务放回待处理队列，不计入失败。"""
+
+        self._conn.execute(
+            """
+            UPDATE jobs SET state = ?, attempts = MAX(attempts - 1, 0),
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ? AND state = ?
+            """,
+            (JOB_PENDING, job_id, JOB_RUNNING),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """统计各状态的任务数量。"""
+
+        rows = self._conn.execute(
+            "SELECT state, COUNT(*) AS total FROM jobs GROUP BY state"
+        ).fetchall()
+        return {row["state"]: int(row["total"]) for row in rows}
+
+    @staticmethod
+    def _row_to_job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=int(row["id"]),
+            song=json.loads(row["song_json"]),
+            quality=int(row["quality"]),
+            state=row["state"],
+            attempts=int(row["attempts"]),
+            bytes_done=int(row["bytes_done"]),
+            error=row["error"],
+        )
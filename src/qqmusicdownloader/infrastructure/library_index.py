@@ -0,0 +1,427 @@
+"""本地曲库索引：按 ``(songmid, quality)`` 记录已下载文件，下载前即可判重。
+
+清单之外的音频文件（例如启用清单之前下载或手动放入的文件）无法得知
+songmid，只能按 ``歌名 - 歌手.扩展名`` 的文件名记录，查询时以同样规则
+生成文件名进行匹配，因此同名同歌手的不同版本会被视为同一首。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from qqmusicdownloader.domain import QUALITY_EXTENSIONS
+from qqmusicdownloader.infrastructure.manifest import DownloadManifest, ManifestEntry
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS library (
+    songmid TEXT NOT NULL,
+    quality INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    PRIMARY KEY (songmid, quality)
+);
+CREATE INDEX IF NOT EXISTS idx_library_path ON library (path);
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    stem TEXT NOT NULL,
+    quality INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_stem ON files (stem, quality);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_MANIFEST_OFFSET_KEY = "manifest_offset"
+_HASH_CHUNK_SIZE = 1024 * 1024
+_EXTENSION_QUALITIES = {f".{ext}": quality for quality, ext in QUALITY_EXTENSIONS.items()}
+
+
+@dataclass(slots=True)
+class LibraryEntry:
+    """曲库索引中的一条记录。"""
+
+    songmid: str
+    quality: int
+    path: str
+    size: int
+    mtime: float
+
+
+class LibraryIndex:
+    """以 SQLite 保存的曲库索引。
+
+    索引来源是下载清单：``sync_manifest`` 只读取清单中新追加的部分，
+    ``scan`` 在此基础上遍历下载目录，复核已索引文件的大小，通过清单中的
+    SHA-256 找回被改名的文件，其余音频文件按文件名记入 ``files`` 表，
+    供 ``lookup_name`` 查询。``lookup`` 只访问数据库；``lookup_any`` 与
+    ``lookup_name`` 还会确认文件仍然存在，运行期间被删除的文件会顺带移出索引。
+
+    扫描通常在线程中执行，因此连接允许跨线程使用并以锁串行化，
+    文件系统操作均在锁外完成，避免阻塞事件循环中的查询。
+    """
+
+    def __init__(self, path: Path, *, music_dir: Path, manifest_path: Path) -> None:
+        self.path = path
+        self.music_dir = music_dir
+        self.manifest_path = manifest_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """关闭数据库连接。"""
+
+        with self._lock:
+            self._conn.close()
+
+    def lookup(self, songmid: str, quality: int) -> Optional[LibraryEntry]:
+        """查找指定歌曲与音质的本地文件。"""
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM library WHERE songmid = ? AND quality = ?",
+                (songmid, quality),
+            ).fetchone()
+        return self._row_to_entry(row) if row else None
+
+    def lookup_any(self, songmid: str, qualities: Iterable[int]) -> Optional[LibraryEntry]:
+        """按给定顺序返回第一个文件仍然存在的音质记录，文件已缺失的记录会被删除。"""
+
+        for quality in qualities:
+            entry = self.lookup(songmid, quality)
+            if entry is None:
+                continue
+            if os.path.exists(entry.path):
+                return entry
+            logger.info("曲库文件已不存在，移出索引: %s", entry.path)
+            self.remove(songmid, quality)
+        return None
+
+    def lookup_name(self, stem: str, qualities: Iterable[int]) -> Optional[LibraryEntry]:
+        """按文件名（不含扩展名）查找清单之外的文件，返回记录的 ``songmid`` 为空。"""
+
+        for quality in qualities:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT * FROM files WHERE stem = ? AND quality = ?",
+                    (stem, quality),
+                ).fetchone()
+            if row is None:
+                continue
+            if os.path.exists(row["path"]):
+                return LibraryEntry(
+                    songmid="",
+                    quality=quality,
+                    path=row["path"],
+                    size=int(row["size"]),
+                    mtime=float(row["mtime"]),
+                )
+            logger.info("曲库文件已不存在，移出索引: %s", row["path"])
+            with self._lock:
+                self._conn.execute("DELETE FROM files WHERE path = ?", (row["path"],))
+        return None
+
+    def remove(self, songmid: str, quality: int) -> None:
+        """删除一条记录，用于文件已被移除的过期索引。"""
+
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM library WHERE songmid = ? AND quality = ?",
+                (songmid, quality),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) AS total FROM library").fetchone()
+        return int(row["total"])
+
+    def record(self, songmid: str, quality: int, path: Path) -> Optional[LibraryEntry]:
+        """将一个已存在的文件写入索引，文件不存在时返回 ``None``。"""
+
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        entry = LibraryEntry(songmid, quality, str(path), stat.st_size, stat.st_mtime)
+        with self._lock:
+            self._upsert(entry)
+        return entry
+
+    def sync_manifest(self) -> int:
+        """读取清单中上次同步之后追加的记录，返回新增的索引条数。"""
+
+        with self._lock:
+            offset = int(self._get_meta(_MANIFEST_OFFSET_KEY) or 0)
+
+        try:
+            size = self.manifest_path.stat().st_size
+        except OSError:
+            return 0
+        if size < offset:
+            # 清单被重写或截断，从头重新同步
+            offset = 0
+        if size == offset:
+            return 0
+
+        with self.manifest_path.open("rb") as handle:
+            handle.seek(offset)
+            data = handle.read()
+        # 只处理完整的行，未写完的行留到下次
+        complete = data[: data.rfind(b"\n") + 1]
+
+        entries: List[LibraryEntry] = []
+        for line in complete.decode("utf-8", errors="replace").splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                manifest_entry = ManifestEntry(**json.loads(line))
+            except (TypeError, json.JSONDecodeError):
+                logger.warning("跳过无法解析的清单记录: %s", line)
+                continue
+            entry = self._entry_from_manifest(manifest_entry)
+            if entry is not None:
+                entries.append(entry)
+
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            for entry in entries:
+                self._upsert(entry)
+            self._set_meta(_MANIFEST_OFFSET_KEY, str(offset + len(complete)))
+        return len(entries)
+
+    def scan(self) -> int:
+        """增量扫描下载目录，返回索引变更条数。
+
+        先同步清单新增记录，再逐条复核已索引文件：大小变化的记录被移除，
+        文件缺失的记录会在下载目录中按大小筛选候选文件，并用清单中的
+        SHA-256 确认是否为改名后的同一文件。目录中其余的音频文件按文件名
+        记入 ``files`` 表，大小与修改时间未变的文件不会重复写入。
+        """
+
+        changed = self.sync_manifest()
+        files = self._list_music_files()
+
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM library").fetchall()
+        entries = [self._row_to_entry(row) for row in rows]
+
+        updates: List[LibraryEntry] = []
+        removals: List[LibraryEntry] = []
+        missing: List[LibraryEntry] = []
+        indexed_paths: Set[str] = set()
+        for entry in entries:
+            try:
+                stat = os.stat(entry.path)
+            except OSError:
+                missing.append(entry)
+                continue
+            if stat.st_size != entry.size:
+                removals.append(entry)
+                continue
+            indexed_paths.add(entry.path)
+            if stat.st_mtime != entry.mtime:
+                entry.mtime = stat.st_mtime
+                updates.append(entry)
+
+        if missing:
+            for entry in self._find_renamed(missing, files, indexed_paths):
+                updates.append(entry)
+                indexed_paths.add(entry.path)
+                missing.remove(entry)
+            removals.extend(missing)
+
+        if updates or removals:
+            with self._lock, self._conn:
+                self._conn.execute("BEGIN")
+                for entry in updates:
+                    self._upsert(entry)
+                for entry in removals:
+                    self._conn.execute(
+                        "DELETE FROM library WHERE songmid = ? AND quality = ?",
+                        (entry.songmid, entry.quality),
+                    )
+        changed += len(updates) + len(removals)
+        changed += self._sync_files(
+            [entry for entry in files if entry.path not in indexed_paths]
+        )
+        if changed:
+            logger.info("曲库索引更新 %s 条记录", changed)
+        return changed
+
+    def _list_music_files(self) -> List[LibraryEntry]:
+        """列出下载目录中可识别音质的音频文件，``songmid`` 留空。"""
+
+        files: List[LibraryEntry] = []
+        try:
+            with os.scandir(self.music_dir) as it:
+                for item in it:
+                    extension = os.path.splitext(item.name)[1].lower()
+                    quality = _EXTENSION_QUALITIES.get(extension)
+                    if quality is None:
+                        continue
+                    try:
+                        if not item.is_file():
+                            continue
+                        stat = item.stat()
+                    except OSError:
+                        continue
+                    files.append(
+                        LibraryEntry("", quality, item.path, stat.st_size, stat.st_mtime)
+                    )
+        except OSError:
+            return []
+        return files
+
+    def _sync_files(self, files: List[LibraryEntry]) -> int:
+        """让 ``files`` 表与清单之外的音频文件一致，返回变更条数。"""
+
+        with self._lock:
+            rows = self._conn.execute("SELECT path, size, mtime FROM files").fetchall()
+        known = {row["path"]: (int(row["size"]), float(row["mtime"])) for row in rows}
+        current = {entry.path for entry in files}
+        changed = [
+            entry for entry in files if known.get(entry.path) != (entry.size, entry.mtime)
+        ]
+        stale = [path for path in known if path not in current]
+        if not changed and not stale:
+            return 0
+
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            for entry in changed:
+                self._conn.execute(
+                    """
+                    INSERT INTO files (path, stem, quality, size, mtime)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (path) DO UPDATE SET
+                        size = excluded.size,
+                        mtime = excluded.mtime
+                    """,
+                    (
+                        entry.path,
+                        Path(entry.path).stem,
+                        entry.quality,
+                        entry.size,
+                        entry.mtime,
+                    ),
+                )
+            for path in stale:
+                self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+        return len(changed) + len(stale)
+
+    def _find_renamed(
+        self,
+        missing: List[LibraryEntry],
+        files: List[LibraryEntry],
+        indexed_paths: Set[str],
+    ) -> List[LibraryEntry]:
+        hashes: Dict[Tuple[str, int], str] = {
+            key: entry.sha256
+            for key, entry in DownloadManifest(self.manifest_path).load().items()
+        }
+        by_size: Dict[int, List[LibraryEntry]] = {}
+        for entry in missing:
+            if (entry.songmid, entry.quality) in hashes:
+                by_size.setdefault(entry.size, []).append(entry)
+
+        found: List[LibraryEntry] = []
+        for file_entry in files:
+            if not by_size:
+                break
+            if file_entry.path in indexed_paths:
+                continue
+            candidates = by_size.get(file_entry.size)
+            if not candidates:
+                continue
+            digest = _sha256_file(Path(file_entry.path))
+            for entry in candidates:
+                if hashes[(entry.songmid, entry.quality)] == digest:
+                    logger.info("曲库文件已改名: %s -> %s", entry.path, file_entry.path)
+                    entry.path = file_entry.path
+                    entry.mtime = file_entry.mtime
+                    found.append(entry)
+                    candidates.remove(entry)
+                    if not candidates:
+                        del by_size[file_entry.size]
+                    break
+        return found
+
+    @staticmethod
+    def _entry_from_manifest(manifest_entry: ManifestEntry) -> Optional[LibraryEntry]:
+        try:
+            stat = os.stat(manifest_entry.path)
+        except OSError:
+            return None
+        if stat.st_size != manifest_entry.size:
+            return None
+        return LibraryEntry(
+            songmid=manifest_entry.songmid,
+            quality=manifest_entry.quality,
+            path=manifest_entry.path,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+        )
+
+    def _upsert(self, entry: LibraryEntry) -> None:
+        self._conn.execute(
+            """
+            INSERT INTO library (songmid, quality, path, size, mtime)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (songmid, quality) DO UPDATE SET
+                path = excluded.path,
+                size = excluded.size,
+                mtime = excluded.mtime
+            """,
+            (entry.songmid, entry.quality, entry.path, entry.size, entry.mtime),
+        )
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key: str, value: str) -> None:
+        self._conn.execute(
+            """
+            INSERT INTO meta (key, value) VALUES (?, ?)
+            ON CONFLICT (key) DO UPDATE SET value = excluded.value
+            """,
+            (key, value),
+        )
+
+    @staticmethod
+    def _row_to_entry(row: sqlite3.Row) -> LibraryEntry:
+        return LibraryEntry(
+            songmid=row["songmid"],
+            quality=int(row["quality"]),
+            path=row["path"],
+            size=int(row["size"]),
+            mtime=float(row["mtime"]),
+        )
+
+
+def _sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        while chunk := handle.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -0,0 +1,83 @@
+"""下载清单：记录每个已完成文件的大小与哈希，便于后续快速校验。"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class ManifestEntry:
+    """单个下载文件的清单条目。"""
+
+    songmid: str
+    quality: int
+    size: int
+    sha256: str
+    path: str
+    completed_at: str = ""
+
+    def matches_file(self) -> bool:
+        """仅通过 stat 判断文件是否仍与清单一致，无需重新读取内容。"""
+
+        try:
+            return Path(self.path).stat().st_size == self.size
+        except OSError:
+            return False
+
+
+class DownloadManifest:
+    """以 JSON Lines 追加写入的下载清单。
+
+    同一 ``(songmid, quality)`` 可能出现多条记录，读取时以最后一条为准。
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = asyncio.Lock()
+
+    async def record(self, entry: ManifestEntry) -> None:
+        """追加一条清单记录。"""
+
+        import aiofiles  # 延迟导入，只读索引的调用方无需加载
+
+        if not entry.completed_at:
+            entry.completed_at = datetime.now().isoformat(timespec="seconds")
+        line = json.dumps(asdict(entry), ensure_ascii=False)
+        async with self._lock:
+            async with aiofiles.open(self.path, "a", encoding="utf-8") as f:
+                await f.write(line + "\n")
+
+    def iter_entries(self) -> Iterator[ManifestEntry]:
+        """按写入顺序遍历清单，跳过损坏的行。"""
+
+        try:
+            handle = self.path.open(encoding="utf-8")
+        except FileNotFoundError:
+            return
+        with handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield ManifestEntry(**json.loads(line))
+                except (TypeError, json.JSONDecodeError):
+                    logger.warning("跳过无法解析的清单记录: %s", line)
+
+    def load(self) -> Dict[Tuple[str, int], ManifestEntry]:
+        """读取清单并按 ``(songmid, quality)`` 建立索引。"""
+
+        return {(entry.songmid, entry.quality): entry for entry in self.iter_entries()}
+
+    def lookup(self, songmid: str, quality: int) -> Optional[ManifestEntry]:
+        """查找指定歌曲与音质的最新清单记录。"""
+
+        return self.load().get((songmid, quality))
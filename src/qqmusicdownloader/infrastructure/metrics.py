@@ -0,0 +1,385 @@
+"""Prometheus 文本格式的进程内指标：计数器、仪表与直方图。
+
+只依赖标准库，命令行入口也能直接使用。指标更新来自事件循环与加解密
+线程，统一用锁保护；导出时一次性渲染为文本，可通过 ``MetricsServer``
+提供 ``/metrics`` 抓取端点，或由 ``MetricsDumper`` 定期写入文件（兼容
+node_exporter 的 textfile 收集方式）。
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import logging
+import math
+import os
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+_LabelKey = Tuple[str, ...]
+# 样本：名称后缀、标签值、额外标签（如直方图的 le）、数值
+_Sample = Tuple[str, _LabelKey, Tuple[Tuple[str, str], ...], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> _LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} 需要标签 {self.labelnames}，实际为 {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abstractmethod
+    def _samples(self) -> Iterable[_Sample]:
+        """返回当前的全部样本。"""
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, key, extra, value in self._samples():
+            names = self.labelnames + tuple(name for name, _ in extra)
+            values = key + tuple(label for _, label in extra)
+            lines.append(
+                f"{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Counter(_Metric):
+    """单调递增的计数器。"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[_LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        if amount < 0:
+            raise ValueError("计数器只能增加")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterable[_Sample]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", key, (), value) for key, value in items]
+
+
+class Gauge(_Metric):
+    """可增可减的当前值。"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[_LabelKey, float] = {}
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: object) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: object) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> Iterable[_Sample]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", key, (), value) for key, value in items]
+
+
+@dataclass(slots=True)
+class _Series:
+    """直方图中一组标签的各桶计数（非累计）与观测值总和。"""
+
+    counts: List[int]
+    total: float = 0.0
+
+
+class Histogram(_Metric):
+    """按上界分桶的观测值分布，单位通常为秒。"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[_LabelKey, _Series] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        index = len(self.buckets)
+        for position, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = position
+                break
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = _Series([0] * (len(self.buckets) + 1))
+            series.counts[index] += 1
+            series.total += value
+
+    def count(self, **labels: object) -> int:
+        with self._lock:
+            series = self._values.get(self._key(labels))
+            return sum(series.counts) if series else 0
+
+    def _samples(self) -> Iterable[_Sample]:
+        with self._lock:
+            items = sorted(
+                (key, list(series.counts), series.total)
+                for key, series in self._values.items()
+            )
+        samples: List[_Sample] = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append(("_bucket", key, (("le", _format_value(bound)),), cumulative))
+            samples.append(("_sum", key, (), total))
+            samples.append(("_count", key, (), cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """按名称保存指标；同名重复注册返回已有实例。"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric):
+                    raise ValueError(f"指标 {metric.name} 已注册为 {existing.kind}")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(
+        self, name: str, documentation: str, labelnames: Sequence[str] = ()
+    ) -> Counter:
+        metric = self._register(Counter(name, documentation, labelnames))
+        return metric  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        metric = self._register(Gauge(name, documentation, labelnames))
+        return metric  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(  # type: ignore[return-value]
+            Histogram(name, documentation, labelnames, buckets=buckets)
+        )
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """注册导出前调用的回调，用于刷新按需计算的仪表。"""
+
+        with self._lock:
+            self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]) -> None:
+        with self._lock:
+            if collector in self._collectors:
+                self._collectors.remove(collector)
+
+    def render(self) -> str:
+        """渲染为 Prometheus 文本格式。"""
+
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        for collector in collectors:
+            try:
+                collector()
+            except Exception:  # pragma: no cover - 回调出错不影响其他指标
+                logger.exception("指标收集回调失败")
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+DOWNLOAD_BYTES = REGISTRY.counter(
+    "qqmusic_download_bytes_total", "从 CDN 下载的字节数", ("host",)
+)
+SONGS = REGISTRY.counter(
+    "qqmusic_songs_total",
+    "按结果统计的歌曲数（succeeded/skipped/failed/cancelled）",
+    ("result",),
+)
+ACTIVE_DOWNLOADS = REGISTRY.gauge("qqmusic_active_downloads", "进行中的下载数")
+API_REQUESTS = REGISTRY.counter(
+    "qqmusic_api_requests_total",
+    "musics.fcg 子请求数，按接口与返回码统计",
+    ("module", "method", "code"),
+)
+API_SECONDS = REGISTRY.histogram(
+    "qqmusic_api_request_seconds", "musics.fcg 调用耗时（含加解密）"
+)
+BRIDGE_SECONDS = REGISTRY.histogram(
+    "qqmusic_bridge_seconds", "加解密桥接往返耗时（不含排队）", ("action",)
+)
+RETRIES = REGISTRY.counter("qqmusic_retries_total", "重试次数，按原因统计", ("reason",))
+CACHE_REQUESTS = REGISTRY.counter(
+    "qqmusic_cache_requests_total", "缓存查询次数", ("cache", "result")
+)
+
+
+class MetricsServer:
+    """在后台线程中提供 ``GET /metrics``，默认只监听本机。"""
+
+    def __init__(
+        self, port: int = 0, *, host: str = "127.0.0.1", registry: MetricsRegistry = REGISTRY
+    ) -> None:
+        self.registry = registry
+        handler = self._handler_class(registry)
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-server", daemon=True
+        )
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        logger.info("指标端点已启动: http://%s:%s/metrics", *self.address)
+        return self
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._server.shutdown()
+            self._thread.join()
+        self._server.server_close()
+
+    @staticmethod
+    def _handler_class(registry: MetricsRegistry) -> type[BaseHTTPRequestHandler]:
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802 - http.server 约定
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:
+                logger.debug("metrics: " + format, *args)
+
+        return Handler
+
+
+class MetricsDumper:
+    """每隔 ``interval`` 秒将指标原子写入文件，停止时再写一次。"""
+
+    def __init__(
+        self, path: Path, *, interval: float = 15.0, registry: MetricsRegistry = REGISTRY
+    ) -> None:
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="metrics-dumper", daemon=True)
+
+    def start(self) -> "MetricsDumper":
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.dump()
+
+    def dump(self) -> None:
+        temp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        try:
+            temp.write_text(self.registry.render(), encoding="utf-8")
+            temp.replace(self.path)
+        except OSError as exc:
+            logger.error("写入指标文件失败: %s", exc)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.dump()
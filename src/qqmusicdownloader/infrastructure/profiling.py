@@ -0,0 +1,176 @@
+"""按操作范围启用的 cProfile 性能分析。
+
+对整个应用套一层 cProfile 时，下载热点会被终端界面的渲染开销淹没。
+这里只在指定的服务操作（一次搜索、一个批次、一次单曲下载）期间开启
+分析器，每个操作写出一个 ``.prof`` 文件，并在旁边生成同名 ``.txt``
+摘要，列出自身耗时与累计耗时最高的函数::
+
+    profiling.enable(Path("profiles"))
+    with profiling.profile("batch", songs=200):
+        ...
+
+``.prof`` 可用 ``python -m pstats`` 或 snakeviz 等工具进一步查看。
+
+cProfile 只记录开启它的线程：事件循环上并发运行的其他协程会一并计入，
+而 ``asyncio.to_thread`` 中的加解密只体现为等待时间。同一时刻只分析一个
+操作，已有分析进行时嵌套或并发的操作（如批次中的单曲）直接计入外层，
+不再单独输出。
+"""
+
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import functools
+import io
+import itertools
+import logging
+import pstats
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, ContextManager, Dict, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+_UNSAFE_NAME = re.compile(r"[^\w.-]+")
+
+
+class _Session:
+    """一次操作的分析过程，退出时写出结果。"""
+
+    __slots__ = ("_profiler", "name", "labels", "_profile", "_start")
+
+    def __init__(self, profiler: "Profiler", name: str, labels: Dict[str, Any]) -> None:
+        self._profiler = profiler
+        self.name = name
+        self.labels = labels
+        self._profile = cProfile.Profile()
+        self._start = 0.0
+
+    def __enter__(self) -> "_Session":
+        self._start = time.perf_counter()
+        self._profile.enable()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self._profile.disable()
+        seconds = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.labels["error"] = exc_type.__name__
+        try:
+            self._profiler._write(self, self._profile, seconds)
+        finally:
+            self._profiler._release()
+
+
+class Profiler:
+    """为指定操作创建分析会话并写入 ``directory``；未设置目录时不做任何事。"""
+
+    def __init__(self, directory: Optional[Path] = None, *, top: int = 30) -> None:
+        self.directory = directory
+        self.top = top
+        self.written: list[Path] = []
+        self._lock = threading.Lock()
+        self._active = False
+        self._sequence = itertools.count(1)
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None
+
+    def profile(self, name: str, **labels: Any) -> ContextManager[Any]:
+        """返回分析 ``name`` 操作的上下文；未启用或已有分析进行时为空操作。"""
+
+        if self.directory is None:
+            return contextlib.nullcontext()
+        with self._lock:
+            if self._active:
+                return contextlib.nullcontext()
+            self._active = True
+        return _Session(self, name, labels)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._active = False
+
+    def _write(self, session: _Session, profile: cProfile.Profile, seconds: float) -> None:
+        directory = self.directory
+        if directory is None:
+            return
+        stem = f"{next(self._sequence):04d}-{_UNSAFE_NAME.sub('_', session.name)}"
+        target = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{stem}.prof"
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            profile.dump_stats(target)
+            target.with_suffix(".txt").write_text(
+                self.summarize(profile, session.name, session.labels, seconds),
+                encoding="utf-8",
+            )
+        except OSError as exc:
+            logger.error("写入性能分析结果失败: %s", exc)
+            return
+        self.written.append(target)
+        logger.info("%s 耗时 %.3fs，性能分析已写入 %s", session.name, seconds, target)
+
+    def summarize(
+        self,
+        profile: cProfile.Profile,
+        name: str,
+        labels: Dict[str, Any],
+        seconds: float,
+    ) -> str:
+        """生成文本摘要：操作信息以及按自身耗时、累计耗时排序的前若干函数。"""
+
+        stream = io.StringIO()
+        stream.write(f"操作: {name}\n")
+        for key, value in labels.items():
+            stream.write(f"{key}: {value}\n")
+        stream.write(f"墙钟耗时: {seconds:.3f}s\n")
+        for title, order in (("自身耗时", "tottime"), ("累计耗时", "cumulative")):
+            stream.write(f"\n==== 按{title}排序（前 {self.top} 个函数） ====\n")
+            pstats.Stats(profile, stream=stream).sort_stats(order).print_stats(self.top)
+        return stream.getvalue()
+
+
+PROFILER = Profiler()
+
+
+def profile(name: str, **labels: Any) -> ContextManager[Any]:
+    """在全局分析器上分析一个操作。"""
+
+    return PROFILER.profile(name, **labels)
+
+
+def enabled() -> bool:
+    return PROFILER.enabled
+
+
+def enable(directory: Path, *, top: int = 30) -> None:
+    PROFILER.directory = directory
+    PROFILER.top = top
+
+
+def disable() -> None:
+    PROFILER.directory = None
+
+
+def profiled(
+    name: str,
+) -> Callable[[Callable[..., Awaitable[_T]]], Callable[..., Awaitable[_T]]]:
+    """将整个协程函数作为一个操作进行分析。"""
+
+    def decorate(func: Callable[..., Awaitable[_T]]) -> Callable[..., Awaitable[_T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> _T:
+            if PROFILER.directory is None:
+                return await func(*args, **kwargs)
+            with PROFILER.profile(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
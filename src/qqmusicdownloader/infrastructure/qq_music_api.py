@@ -2,28 +2,63 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
+import hashlib
 import json
 import logging
 import random
 import re
 import time
+import uuid
+import weakref
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
 
 import aiofiles
 import aiohttp
 
-from qqmusicdownloader.infrastructure.crypto.bridge import (
-    NodeCryptoError,
-    decrypt_response,
-    encrypt_payload,
+from qqmusicdownloader.domain import QUALITY_EXTENSIONS, sanitize_filename
+from qqmusicdownloader.infrastructure.bandwidth import BandwidthLimiter, TokenBucket
+from qqmusicdownloader.infrastructure.crypto.backend import (
+    CryptoBackend,
+    NodeCryptoBackend,
 )
+from qqmusicdownloader.infrastructure.crypto.bridge import NodeCryptoError
+from qqmusicdownloader.infrastructure import metrics, tracing
+from qqmusicdownloader.infrastructure.diagnostics import ConnectionStats
+from qqmusicdownloader.infrastructure.errors import RateLimitedError
+from qqmusicdownloader.infrastructure.manifest import DownloadManifest, ManifestEntry
 
 logger = logging.getLogger(__name__)
 
+# 视为账号限流/风控的接口返回码（HTTP 429 同样按限流处理）
+RATE_LIMIT_CODES = frozenset({429, 2001, 500001})
+
+_PLAYLIST_ID_PATTERNS = (
+    re.compile(r"[?&#](?:id|disstid)=(\d+)"),
+    re.compile(r"/playlist/(\d+)"),
+)
+
+
+def parse_playlist_id(value: str) -> Optional[str]:
+    """从歌单 ID 或分享链接中提取歌单 ID，无法识别时返回 ``None``。
+
+    支持纯数字 ID、``y.qq.com/n/ryqq/playlist/<id>`` 以及移动端分享链接
+    ``...taoge.html?id=<id>`` 等形式。
+    """
+
+    value = value.strip()
+    if value.isdigit():
+        return value
+    for pattern in _PLAYLIST_ID_PATTERNS:
+        match = pattern.search(value)
+        if match:
+            return match.group(1)
+    return None
+
 
 @dataclass
 class APIConfig:
@@ -33,6 +68,7 @@ class APIConfig:
     retry_times: int = 3
     retry_delay: float = 1.0
     chunk_size: int = 8192
+    musics_url: str = "https://u6.y.qq.com/cgi-bin/musics.fcg"
 
 
 class QQMusicAPI:
@@ -40,15 +76,31 @@ class QQMusicAPI:
 
     _UNICODE_PATTERN = re.compile(r"\\u[0-9a-fA-F]{4}|\\U[0-9a-fA-F]{8}")
 
-    def __init__(self, cookie: str):
+    def __init__(
+        self,
+        cookie: str,
+        *,
+        config: Optional[APIConfig] = None,
+        crypto: Optional[CryptoBackend] = None,
+    ):
         self.cookie = self._clean_cookie(cookie)
-        self.config = APIConfig()
+        self.config = config or APIConfig()
+        # 基准测试可替换为不依赖 Node 的实现，配合本地模拟服务使用
+        self.crypto = crypto or NodeCryptoBackend()
         raw_uin = self._extract_cookie_value("uin") or "0"
         self._uin = self._normalize_uin(raw_uin)
         self._g_tk = self._calculate_g_tk()
         self._setup_headers()
         self.configure_download_dirs(self._default_download_base())
         self._setup_session()
+        self.bandwidth = BandwidthLimiter()
+        # 每次请求使用独立会话，进行中的请求数即占用的连接数
+        self.api_connections = ConnectionStats()
+        self.cdn_connections = ConnectionStats()
+        # 同名歌曲（或同一歌曲的重复任务）串行写入同一目标文件
+        self._path_locks: weakref.WeakValueDictionary[Path, asyncio.Lock] = (
+            weakref.WeakValueDictionary()
+        )
 
     def _setup_headers(self):
         """初始化请求头"""
@@ -137,52 +189,127 @@ class QQMusicAPI:
         *,
         encoding: str = "ag-1",
     ) -> Optional[Dict[str, Any]]:
-        """调用 musics.fcg 并解密响应."""
+        """调用 musics.fcg 并解密响应，同时按接口记录调用次数与耗时."""
 
-        plain = json.dumps(payload, ensure_ascii=False)
+        started = time.perf_counter()
+        parsed: Optional[Dict[str, Any]] = None
+        limited: Optional[RateLimitedError] = None
         try:
-            body, sign_value = encrypt_payload(plain)
-        except NodeCryptoError as exc:
-            logger.error("musics.fcg 加密失败: %s", exc)
-            return None
+            parsed = await self._exchange_musics(payload, encoding=encoding)
+        except RateLimitedError as exc:
+            limited = exc
+            raise
+        finally:
+            metrics.API_SECONDS.observe(time.perf_counter() - started)
+            for key, block in payload.items():
+                if key == "comm" or not isinstance(block, dict):
+                    continue
+                if limited is not None:
+                    code = str(limited.code)
+                elif parsed is None:
+                    code = "error"
+                else:
+                    result = parsed.get(key)
+                    code = str(result.get("code")) if isinstance(result, dict) else "missing"
+                metrics.API_REQUESTS.inc(
+                    module=block.get("module"), method=block.get("method"), code=code
+                )
+        return parsed
 
-        params = {
-            "_": str(int(time.time() * 1000)),
-            "encoding": encoding,
-            "sign": sign_value,
-        }
-        headers = self._build_musics_headers()
-        url = "https://u6.y.qq.com/cgi-bin/musics.fcg"
+    async def _exchange_musics(
+        self,
+        payload: Dict[str, Any],
+        *,
+        encoding: str,
+    ) -> Optional[Dict[str, Any]]:
+        """加密请求、发送并解密响应."""
 
-        try:
-            async with aiohttp.ClientSession(
-                headers=headers,
-                timeout=self.timeout,
-                trust_env=True,
-            ) as session:
-                async with session.post(url, params=params, data=body) as resp:
-                    resp.raise_for_status()
-                    raw = await resp.read()
-        except Exception as exc:  # pragma: no cover - 网络波动
-            logger.error("musics.fcg 请求失败: %s", exc)
-            return None
+        with tracing.span("musics.fcg") as call_span:
+            if tracing.enabled():
+                call_span.set(requests=self._describe_requests(payload))
+            plain = json.dumps(payload, ensure_ascii=False)
+            try:
+                # Node 桥接是阻塞调用，放到线程中执行以免卡住并发中的下载流
+                with tracing.span("crypto.encrypt", size=len(plain)):
+                    body, sign_value = await asyncio.to_thread(
+                        self.crypto.encrypt_payload, plain
+                    )
+            except NodeCryptoError as exc:
+                logger.error("musics.fcg 加密失败: %s", exc)
+                return None
 
-        try:
-            text, parsed = decrypt_response(raw)
-        except NodeCryptoError as exc:
-            logger.error("musics.fcg 解密失败: %s", exc)
-            return None
+            params = {
+                "_": str(int(time.time() * 1000)),
+                "encoding": encoding,
+                "sign": sign_value,
+            }
+            headers = self._build_musics_headers()
+            url = self.config.musics_url
 
-        if parsed is None:
             try:
-                parsed = json.loads(text)
-            except json.JSONDecodeError:
-                logger.error("musics.fcg 响应无法解析为 JSON")
+                with self.api_connections.track(), tracing.span("musics.http"):
+                    raw = await self._post_musics(url, params, body, headers)
+            except RateLimitedError:
+                raise
+            except Exception as exc:  # pragma: no cover - 网络波动
+                logger.error("musics.fcg 请求失败: %s", exc)
                 return None
 
-        parsed = self._decode_unicode_tree(parsed)
+            try:
+                with tracing.span("crypto.decrypt", size=len(raw)):
+                    text, parsed = await asyncio.to_thread(
+                        self.crypto.decrypt_response, raw
+                    )
+            except NodeCryptoError as exc:
+                logger.error("musics.fcg 解密失败: %s", exc)
+                return None
 
-        return parsed
+            if parsed is None:
+                try:
+                    parsed = json.loads(text)
+                except json.JSONDecodeError:
+                    logger.error("musics.fcg 响应无法解析为 JSON")
+                    return None
+
+            parsed = self._decode_unicode_tree(parsed)
+
+            return parsed
+
+    @staticmethod
+    def _describe_requests(payload: Dict[str, Any]) -> List[str]:
+        """列出请求中包含的接口，用于跨度标注."""
+
+        return [
+            f"{block.get('module')}.{block.get('method')}"
+            for key, block in payload.items()
+            if key != "comm" and isinstance(block, dict)
+        ]
+
+    async def _post_musics(
+        self,
+        url: str,
+        params: Dict[str, str],
+        body: str,
+        headers: Dict[str, str],
+    ) -> bytes:
+        """发送加密后的 musics.fcg 请求并返回原始响应体."""
+
+        async with aiohttp.ClientSession(
+            headers=headers,
+            timeout=self.timeout,
+            trust_env=True,
+        ) as session:
+            async with session.post(url, params=params, data=body) as resp:
+                if resp.status == 429:
+                    retry_after = resp.headers.get("Retry-After")
+                    raise RateLimitedError(
+                        429,
+                        retry_after=float(retry_after)
+                        if retry_after and retry_after.isdigit()
+                        else None,
+                    )
+                resp.raise_for_status()
+                return await resp.read()
 
     async def validate_cookie(self) -> bool:
         """验证Cookie是否有效
@@ -218,13 +345,18 @@ class QQMusicAPI:
             logger.error(f"Cookie验证失败: {e}")
             return False
 
-    async def search_song(self, keyword: str) -> List[Dict]:
+    @tracing.traced("api.search")
+    async def search_song(
+        self, keyword: str, *, page: int = 1, page_size: int = 20
+    ) -> List[Dict]:
         """搜索歌曲
 
         使用关键词搜索QQ音乐，返回歌曲列表。每首歌曲包含名称、歌手、专辑等信息。
 
         Args:
             keyword (str): 搜索关键词
+            page (int): 页码，从 1 开始
+            page_size (int): 每页歌曲数量
 
         Returns:
             List[Dict]: 歌曲信息列表，每个字典包含歌曲详细信息
@@ -237,8 +369,8 @@ class QQMusicAPI:
                     "method": "DoSearchForQQMusicDesktop",
                     "param": {
                         "query": keyword,
-                        "num_per_page": 20,
-                        "page_num": 1,
+                        "num_per_page": page_size,
+                        "page_num": page,
                         "search_type": 0,
                     },
                 },
@@ -250,6 +382,7 @@ class QQMusicAPI:
                 return []
 
             search_block = response.get("req_1", {})
+            self._raise_if_rate_limited(search_block)
             if search_block.get("code") != 0:
                 logger.error("搜索接口返回错误码: %s", search_block.get("code"))
                 return []
@@ -262,33 +395,113 @@ class QQMusicAPI:
             )
 
             # 整理歌曲信息为标准格式
-            songs = []
-            for song in songs_data:
-                # 组合所有歌手名称
-                singer = " / ".join(singer["name"] for singer in song.get("singer", []))
-
-                songs.append(
-                    {
-                        "name": song.get("title", "未知歌曲"),
-                        "singer": singer or "未知歌手",
-                        "album": song.get("album", {}).get("title", "未知专辑"),
-                        "songmid": song.get("mid", ""),  # 歌曲的唯一标识符
-                        "media_mid": song.get("file", {}).get("media_mid", ""),
-                        "interval": song.get("interval", 0),  # 歌曲时长（秒）
-                        "size": {  # 不同品质对应的文件大小
-                            "128": song.get("file", {}).get("size_128mp3", 0),
-                            "320": song.get("file", {}).get("size_320mp3", 0),
-                            "flac": song.get("file", {}).get("size_flac", 0),
-                        },
-                    }
-                )
-
-            return songs
+            return [self._to_song_record(song) for song in songs_data]
 
         except Exception as e:
             logger.error(f"搜索歌曲时出错: {e}")
             raise  # 向上层抛出异常，让调用者处理
 
+    async def iter_playlist(
+        self, playlist: str, *, page_size: int = 100
+    ) -> AsyncIterator[List[Dict]]:
+        """分页获取歌单中的歌曲
+
+        每获取一页立即产出，调用方无需等待整个歌单加载完成即可开始下载。
+
+        Args:
+            playlist (str): 歌单 ID 或分享链接
+            page_size (int): 每页请求的歌曲数量
+
+        Yields:
+            List[Dict]: 一页歌曲信息，格式与 ``search_song`` 一致
+
+        Raises:
+            ValueError: 无法识别歌单 ID
+            RuntimeError: 歌单接口返回错误
+        """
+        disstid = parse_playlist_id(playlist)
+        if disstid is None:
+            raise ValueError(f"无法识别的歌单: {playlist}")
+
+        begin = 0
+        total: Optional[int] = None
+        while total is None or begin < total:
+            payload = {
+                "comm": self._build_comm(guid=self._generate_guid()),
+                "req_1": {
+                    "module": "music.srfDissInfo.aiDissInfo",
+                    "method": "uniform_get_Dissinfo",
+                    "param": {
+                        "disstid": int(disstid),
+                        "userinfo": 1,
+                        "tag": 1,
+                        "orderlist": 1,
+                        "song_begin": begin,
+                        "song_num": page_size,
+                        "onlysonglist": 0 if total is None else 1,
+                        "enc_host_uin": "",
+                    },
+                },
+            }
+
+            response = await self._call_musics(payload)
+            block = (response or {}).get("req_1", {})
+            self._raise_if_rate_limited(block)
+            if block.get("code") != 0:
+                raise RuntimeError(
+                    f"获取歌单失败: disstid={disstid}, code={block.get('code')}"
+                )
+
+            data = block.get("data", {})
+            if total is None:
+                total = int(data.get("total_song_num") or data.get("songnum") or 0)
+                logger.info(
+                    "开始获取歌单 %s: %s（共 %s 首）",
+                    disstid,
+                    data.get("dirinfo", {}).get("title", ""),
+                    total,
+                )
+
+            page = [
+                self._to_song_record(song)
+                for song in data.get("songlist") or []
+                if song.get("mid")
+            ]
+            raw_count = len(data.get("songlist") or [])
+            if page:
+                yield page
+            if raw_count == 0:
+                break
+            begin += raw_count
+
+    @staticmethod
+    def _raise_if_rate_limited(block: Dict[str, Any]) -> None:
+        """接口分块返回限流码时抛出 ``RateLimitedError``"""
+        code = block.get("code")
+        if isinstance(code, int) and code in RATE_LIMIT_CODES:
+            raise RateLimitedError(code)
+
+    @staticmethod
+    def _to_song_record(song: Dict[str, Any]) -> Dict[str, Any]:
+        """将接口返回的歌曲条目整理为标准格式"""
+        # 组合所有歌手名称
+        singer = " / ".join(singer["name"] for singer in song.get("singer", []))
+        file_info = song.get("file", {})
+        return {
+            "name": song.get("title") or song.get("name") or "未知歌曲",
+            "singer": singer or "未知歌手",
+            "album": song.get("album", {}).get("title", "未知专辑"),
+            "songmid": song.get("mid", ""),  # 歌曲的唯一标识符
+            "media_mid": file_info.get("media_mid", ""),
+            "interval": song.get("interval", 0),  # 歌曲时长（秒）
+            "size": {  # 不同品质对应的文件大小
+                "96aac": file_info.get("size_96aac", 0),
+                "128": file_info.get("size_128mp3", 0),
+                "320": file_info.get("size_320mp3", 0),
+                "flac": file_info.get("size_flac", 0),
+            },
+        }
+
     def _setup_session(self) -> None:
         """设置异步会话."""
 
@@ -310,12 +523,20 @@ class QQMusicAPI:
         for directory in (self.music_dir, self.lyrics_dir):
             directory.mkdir(parents=True, exist_ok=True)
 
+        self.manifest = DownloadManifest(resolved / "manifest.jsonl")
+
         logger.info("下载目录初始化完成: %s", resolved)
 
     def get_download_path(self) -> str:
         """返回下载目录路径"""
         return str(self.base_dir)  # 返回基础目录的字符串表示
 
+    def set_bandwidth_limit(self, bytes_per_second: Optional[int]) -> None:
+        """设置所有并发下载共享的全局限速，``None`` 表示不限速。"""
+
+        self.bandwidth.set_global_rate(bytes_per_second)
+        logger.info("全局限速更新为: %s", bytes_per_second or "不限速")
+
     async def download_with_lyrics(
         self,
         url: str,
@@ -325,72 +546,166 @@ class QQMusicAPI:
         progress_bar=None,
         progress_label=None,
         pause_events=None,
+        task_limiter: Optional[TokenBucket] = None,
+        expected_size: int = 0,
+        lyrics: Optional[str] = None,
+        with_lyrics: bool = True,
+        on_progress: Optional[Callable[[int, int], None]] = None,
     ) -> bool:
-        """支持多重暂停控制的下载实现"""
+        """支持多重暂停控制的下载实现
+
+        每个数据块写入前依次经过 ``task_limiter``（单任务限速）与
+        ``self.bandwidth``（全局限速），同时在写入过程中计算 SHA-256。
+        重命名前校验实际字节数与 ``content-length`` 一致，成功后写入清单。
+        响应缺少 ``content-length``（分块传输）时照常下载，流结束后再校验；
+        ``expected_size`` 来自搜索结果，用于估算进度并记录偏差。
+
+        歌词请求与音频传输并发进行，音频成功后再原子写入歌词文件。
+        目标文件相同的任务按顺序执行，后到的任务会命中“文件已存在”。
+        ``lyrics`` 为调用方预取的歌词，提供时不再请求歌词接口；
+        ``with_lyrics`` 为 ``False`` 时跳过歌词。
+        ``on_progress`` 在每个数据块写入后以 ``(已下载字节, 预计总字节)`` 调用，
+        总字节未知时为 0，回调应保持轻量。
+        """
         try:
-            ext_mapping = {
-                1: "m4a",  # 128kbps - m4a格式
-                2: "mp3",  # 320kbps - mp3格式
-                3: "flac",  # 无损 - flac格式
-            }
-            ext = ext_mapping.get(quality, "m4a")
+            ext = QUALITY_EXTENSIONS.get(quality, "m4a")
             filename = self._sanitize_filename(filename)
             file_path = self.music_dir / f"{filename}.{ext}"
 
-            if file_path.exists():
-                logger.info(f"文件已存在: {filename}.{ext}")
-                if progress_label:
-                    progress_label.text = f"文件已存在: {filename}.{ext}"
+            path_lock = self._path_locks.get(file_path)
+            if path_lock is None:
+                path_lock = self._path_locks[file_path] = asyncio.Lock()
+            async with path_lock:
+                if file_path.exists():
+                    logger.info(f"文件已存在: {filename}.{ext}")
+                    if progress_label:
+                        progress_label.text = f"文件已存在: {filename}.{ext}"
+                    return True
+
+                logger.info(f"开始下载文件: {filename}.{ext}")
+
+                lyrics_task: Optional[asyncio.Task[Optional[str]]] = None
+                if lyrics is None and with_lyrics:
+                    lyrics_task = asyncio.create_task(self._fetch_lyrics_quietly(songmid))
+
+                try:
+                    with self.cdn_connections.track():
+                        audio_ok = await self._stream_audio(
+                            url,
+                            file_path,
+                            filename,
+                            quality,
+                            songmid,
+                            progress_bar=progress_bar,
+                            progress_label=progress_label,
+                            pause_events=pause_events,
+                            task_limiter=task_limiter,
+                            expected_size=expected_size,
+                            on_progress=on_progress,
+                        )
+                except BaseException:
+                    if lyrics_task is not None:
+                        lyrics_task.cancel()
+                    raise
+
+                if not audio_ok:
+                    if lyrics_task is not None:
+                        lyrics_task.cancel()
+                    return False
+
+                if lyrics_task is not None:
+                    lyrics = await lyrics_task
+                if lyrics:
+                    await self._write_lyrics(filename, lyrics)
+                elif with_lyrics:
+                    logger.info("未获取到可用歌词: %s", songmid)
+
                 return True
 
-            logger.info(f"开始下载文件: {filename}.{ext}")
+        except Exception as e:
+            logger.error(f"下载失败 {filename}: {str(e)}")
+            return False
 
-            logger.info(f"开始下载文件: {filename}.{ext}")
+    async def _stream_audio(
+        self,
+        url: str,
+        file_path: Path,
+        filename: str,
+        quality: int,
+        songmid: str,
+        *,
+        progress_bar=None,
+        progress_label=None,
+        pause_events=None,
+        task_limiter: Optional[TokenBucket] = None,
+        expected_size: int = 0,
+        on_progress: Optional[Callable[[int, int], None]] = None,
+    ) -> bool:
+        """将音频流写入临时文件，校验后重命名并记录清单。"""
 
+        with tracing.span("cdn.stream", file=filename) as stream_span:
+            requested = time.perf_counter()
             async with aiohttp.ClientSession(
                 headers=self.headers,
                 timeout=self.timeout,
                 trust_env=True,
             ) as session:
                 async with session.get(url) as response:
+                    stream_span.set(
+                        status=response.status,
+                        first_byte_ms=(time.perf_counter() - requested) * 1000,
+                    )
                     if response.status != 200:
                         logger.error("下载请求失败: HTTP %s", response.status)
                         return False
 
-                    total_size = int(response.headers.get("content-length", 0))
-                    if total_size == 0:
-                        logger.error("下载请求缺少 content-length，可能被权限限制")
-                        return False
-
-                    temp_path = file_path.with_suffix(".tmp")
+                    total_size = int(response.headers.get("content-length") or 0)
+                    # 分块传输或 CDN 未返回长度时，用搜索结果中的大小估算进度
+                    progress_total = total_size or expected_size
+                    if not total_size:
+                        logger.info("响应未提供 content-length，按未知长度下载: %s", filename)
+
+                    # 每个任务使用独立的临时文件，避免并发写入同一路径
+                    temp_path = file_path.with_name(
+                        f"{file_path.stem}.{songmid}-{quality}-{uuid.uuid4().hex[:8]}.tmp"
+                    )
+                    gates = self._normalize_pause_events(pause_events)
                     downloaded = 0
+                    digest = hashlib.sha256()
                     if progress_bar:
                         progress_bar.value = 0
                     start_time = datetime.now()
                     last_progress_update = datetime.now()
+                    # 仅在记录跨度时统计磁盘写入耗时，关闭时不增加逐块开销
+                    timed = tracing.enabled()
+                    write_seconds = 0.0
 
                     try:
                         async with aiofiles.open(temp_path, mode="wb") as f:
                             async for chunk in response.content.iter_chunked(
                                 self.config.chunk_size
                             ):
-                                # 检查所有暂停事件
-                                if pause_events:
-                                    if not isinstance(pause_events, list):
-                                        pause_events = [pause_events]
-
-                                    for event in pause_events:
-                                        await event.wait()
-
-                                await f.write(chunk)
+                                # 闸门通常处于放行状态，仅在暂停时才挂起等待
+                                for gate in gates:
+                                    if not gate.is_set():
+                                        await gate.wait()
+
+                                await self.bandwidth.throttle(len(chunk), task_limiter)
+                                if timed:
+                                    write_started = time.perf_counter()
+                                    await f.write(chunk)
+                                    write_seconds += time.perf_counter() - write_started
+                                else:
+                                    await f.write(chunk)
+                                digest.update(chunk)
                                 downloaded += len(chunk)
+                                if on_progress is not None:
+                                    on_progress(downloaded, progress_total)
 
                                 current_time = datetime.now()
                                 if (
                                     current_time - last_progress_update
                                 ).total_seconds() >= 0.1:
-                                    # 计算单个文件的下载进度
-                                    file_progress = (downloaded * 100) / total_size
                                     speed = (
                                         downloaded
                                         / max(
@@ -400,67 +715,112 @@ class QQMusicAPI:
                                         / 1024
                                     )
 
-                                    if progress_bar and not isinstance(
-                                        progress_bar.value, str
-                                    ):
-                                        # 这里只更新进度条，不设置为100%
-                                        progress_bar.value = file_progress
-
-                                    if progress_label:
-                                        eta = (total_size - downloaded) / (
-                                            max(1, speed) * 1024
+                                    if progress_total:
+                                        # 计算单个文件的下载进度，估算值不超过 99.9%
+                                        file_progress = min(
+                                            99.9, (downloaded * 100) / progress_total
                                         )
+
+                                        if progress_bar and not isinstance(
+                                            progress_bar.value, str
+                                        ):
+                                            # 这里只更新进度条，不设置为100%
+                                            progress_bar.value = file_progress
+
+                                        if progress_label:
+                                            eta = max(0, progress_total - downloaded) / (
+                                                max(1, speed) * 1024
+                                            )
+                                            progress_label.text = (
+                                                f"下载中: {filename}\n"
+                                                f"进度: {file_progress:.1f}%\n"
+                                                f"速度: {speed:.1f} KB/s\n"
+                                                f"剩余时间: {int(eta)}秒"
+                                            )
+                                    elif progress_label:
                                         progress_label.text = (
                                             f"下载中: {filename}\n"
-                                            f"进度: {file_progress:.1f}%\n"
-                                            f"速度: {speed:.1f} KB/s\n"
-                                            f"剩余时间: {int(eta)}秒"
+                                            f"已下载: {downloaded / 1024 / 1024:.1f} MB\n"
+                                            f"速度: {speed:.1f} KB/s"
                                         )
 
                                     last_progress_update = current_time
 
-                        # 下载完成后重命名文件
+                        stream_span.set(bytes=downloaded, write_ms=write_seconds * 1000)
+                        if downloaded == 0:
+                            raise IOError("下载内容为空，可能被权限限制")
+                        if total_size and downloaded != total_size:
+                            raise IOError(
+                                f"文件大小不匹配: 已接收 {downloaded} 字节, "
+                                f"content-length 为 {total_size} 字节"
+                            )
+                        if expected_size and expected_size != downloaded:
+                            logger.warning(
+                                "文件大小与搜索结果不一致: %s 实际 %s, 预期 %s",
+                                filename,
+                                downloaded,
+                                expected_size,
+                            )
+
+                        # 校验通过后重命名文件
                         temp_path.rename(file_path)
                         logger.info(f"下载完成: {filename}")
 
-                        # 下载歌词
                         try:
-                            await self._download_lyrics(
-                                filename, songmid, progress_label
+                            await self.manifest.record(
+                                ManifestEntry(
+                                    songmid=songmid,
+                                    quality=quality,
+                                    size=downloaded,
+                                    sha256=digest.hexdigest(),
+                                    path=str(file_path),
+                                )
                             )
-                        except Exception as e:
-                            logger.error(f"歌词下载失败: {e}")
+                        except OSError as e:
+                            logger.error(f"写入下载清单失败: {e}")
 
                         return True
 
-                    except Exception:
+                    except BaseException:
+                        # 包括取消：句柄或批次取消时同样清理半写的临时文件
                         if temp_path.exists():
                             temp_path.unlink()
                         raise
 
-        except Exception as e:
-            logger.error(f"下载失败 {filename}: {str(e)}")
-            return False
+    @staticmethod
+    def _normalize_pause_events(pause_events) -> tuple[asyncio.Event, ...]:
+        """在进入下载循环前整理暂停事件，避免每个数据块重复处理。"""
 
-    async def _download_lyrics(
-        self, filename: str, songmid: str, progress_label=None
-    ) -> bool:
-        """下载歌词"""
-        try:
-            if progress_label:
-                progress_label.text = "正在获取歌词..."
+        if not pause_events:
+            return ()
+        if isinstance(pause_events, asyncio.Event):
+            return (pause_events,)
+        return tuple(pause_events)
 
-            lyrics = await self.get_lyrics(songmid)
-            if lyrics:
-                lyrics_path = self.lyrics_dir / f"{filename}.lrc"
-                async with aiofiles.open(lyrics_path, "w", encoding="utf-8") as f:
-                    await f.write(lyrics)
-                return True
-            logger.info("未获取到可用歌词: %s", songmid)
-            return False
+    async def _fetch_lyrics_quietly(self, songmid: str) -> Optional[str]:
+        """获取歌词，任何异常都只记录日志而不影响音频下载。"""
 
+        try:
+            return await self.get_lyrics(songmid)
         except Exception as e:
             logger.error(f"歌词下载失败: {e}")
+            return None
+
+    @tracing.traced("lyrics.write")
+    async def _write_lyrics(self, filename: str, lyrics: str) -> bool:
+        """先写临时文件再替换，保证歌词文件不会处于半写状态。"""
+
+        lyrics_path = self.lyrics_dir / f"{filename}.lrc"
+        temp_path = lyrics_path.with_name(f"{lyrics_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            async with aiofiles.open(temp_path, "w", encoding="utf-8") as f:
+                await f.write(lyrics)
+            temp_path.replace(lyrics_path)
+            return True
+        except OSError as e:
+            logger.error(f"歌词写入失败: {e}")
+            if temp_path.exists():
+                temp_path.unlink()
             return False
 
     async def _update_progress(
@@ -491,6 +851,7 @@ class QQMusicAPI:
                     f"剩余时间: {eta:.1f}s"
                 )
 
+    @tracing.traced("api.get_song_url")
     async def get_song_url(
         self,
         songmid: str,
@@ -518,14 +879,8 @@ class QQMusicAPI:
                     "未提供 media_mid，回退使用 songmid 构造文件名: %s", songmid
                 )
 
-            # 根据质量选择对应的格式和编码
-            if quality == 1:
-                filename = f"C400{file_mid}.m4a"
-            elif quality == 2:
-                filename = f"M500{file_mid}.mp3"
-            elif quality == 3:
-                filename = f"F000{file_mid}.flac"
-            else:
+            filename = self._song_filename(file_mid, quality)
+            if filename is None:
                 return None
 
             logger.info(f"请求参数: guid={guid}, uin={uin}, 目标文件名: {filename}")
@@ -543,11 +898,83 @@ class QQMusicAPI:
             logger.error("未能获取到下载地址")
             return None
 
+        except RateLimitedError:
+            raise
         except Exception as e:
             logger.error(f"获取歌曲下载地址时出错: {str(e)}")
             logger.exception(e)  # 这会打印完整的错误堆栈
             return None
 
+    @tracing.traced("api.get_song_url")
+    async def get_song_url_with_fallback(
+        self,
+        songmid: str,
+        media_mid: Optional[str],
+        qualities: Sequence[int],
+    ) -> Optional[Tuple[int, str]]:
+        """按优先顺序尝试多个音质，一次请求取回全部候选链接
+
+        Args:
+            songmid (str): 歌曲的唯一标识符
+            media_mid (Optional[str]): 文件存储用的 media_mid
+            qualities (Sequence[int]): 按偏好排列的音质等级，例如 ``(3, 2, 1)``
+
+        Returns:
+            Optional[Tuple[int, str]]: 最优可用音质及其下载链接，全部不可用时返回 None
+        """
+        candidates: List[Tuple[int, str]] = []
+        file_mid = media_mid or songmid
+        for quality in qualities:
+            filename = self._song_filename(file_mid, quality)
+            if filename is not None:
+                candidates.append((quality, filename))
+        if not candidates:
+            return None
+
+        try:
+            logger.info(
+                "批量获取歌曲下载地址: songmid=%s, 候选音质=%s",
+                songmid,
+                [quality for quality, _ in candidates],
+            )
+            urls = await self._request_song_purls(
+                guid=self._generate_guid(),
+                songmid=songmid,
+                filenames=[filename for _, filename in candidates],
+            )
+        except RateLimitedError:
+            raise
+        except Exception as e:
+            logger.error(f"获取歌曲下载地址时出错: {str(e)}")
+            logger.exception(e)
+            return None
+
+        for quality, filename in candidates:
+            url = urls.get(filename)
+            if url:
+                if quality != candidates[0][0]:
+                    logger.info(
+                        "音质 %s 不可用，降级为 %s: %s",
+                        candidates[0][0],
+                        quality,
+                        songmid,
+                    )
+                return quality, url
+
+        logger.error("所有候选音质均未能获取到下载地址: %s", songmid)
+        return None
+
+    @staticmethod
+    def _song_filename(file_mid: str, quality: int) -> Optional[str]:
+        """根据音质构造服务器上的文件名"""
+        if quality == 1:
+            return f"C400{file_mid}.m4a"
+        if quality == 2:
+            return f"M500{file_mid}.mp3"
+        if quality == 3:
+            return f"F000{file_mid}.flac"
+        return None
+
     async def _request_song_purl(
         self,
         *,
@@ -555,15 +982,29 @@ class QQMusicAPI:
         songmid: str,
         filename: str,
     ) -> Optional[str]:
-        """调用最新 musics.fcg 接口获取 purl.
+        """调用最新 musics.fcg 接口获取单个文件的 purl."""
+
+        urls = await self._request_song_purls(
+            guid=guid, songmid=songmid, filenames=[filename]
+        )
+        return urls.get(filename)
+
+    async def _request_song_purls(
+        self,
+        *,
+        guid: str,
+        songmid: str,
+        filenames: Sequence[str],
+    ) -> Dict[str, str]:
+        """在一次 CgiGetVkey 请求中获取多个候选文件的 purl.
 
         Args:
             guid (str): 随机 GUID
             songmid (str): 歌曲 mid
-            filename (str): 服务器上的文件名
+            filenames (Sequence[str]): 服务器上的候选文件名
 
         Returns:
-            Optional[str]: 拼接完成的下载 URL
+            Dict[str, str]: 文件名到下载 URL 的映射，仅包含可用的文件
         """
 
         payload = {
@@ -573,20 +1014,21 @@ class QQMusicAPI:
                 "method": "CgiGetVkey",
                 "param": {
                     "guid": guid,
-                    "songmid": [songmid],
-                    "songtype": [0],
+                    "songmid": [songmid] * len(filenames),
+                    "songtype": [0] * len(filenames),
                     "uin": self._uin,
                     "loginflag": 1,
                     "platform": "20",
-                    "filename": [filename],
+                    "filename": list(filenames),
                 },
             },
         }
 
         parsed = await self._call_musics(payload)
         if not parsed:
-            return None
+            return {}
 
+        self._raise_if_rate_limited(parsed.get("req_0", {}))
         req_data = parsed.get("req_0", {}).get("data", {})
         msg = req_data.get("msg", "")
         midurlinfo = req_data.get("midurlinfo") or []
@@ -595,30 +1037,37 @@ class QQMusicAPI:
                 "musics.fcg 返回缺少 midurlinfo: %s",
                 json.dumps(parsed, ensure_ascii=False),
             )
-            return None
+            return {}
+
+        sip_list = req_data.get("sip") or []
+        base_url = "https://isure.stream.qqmusic.qq.com/"
+        if sip_list:
+            base_url = sip_list[0]
+        if not base_url.endswith("/"):
+            base_url += "/"
 
-        purl = midurlinfo[0].get("purl")
-        if not purl:
+        urls: Dict[str, str] = {}
+        for index, info in enumerate(midurlinfo):
+            # 服务端通常回传 filename，缺失时按请求顺序对应
+            filename = info.get("filename")
+            if not filename and index < len(filenames):
+                filename = filenames[index]
+            purl = info.get("purl")
+            if filename and purl:
+                urls[filename] = f"{base_url}{purl}"
+
+        if not urls:
             if msg:
                 logger.error("musics.fcg 返回空 purl，服务端消息: %s", msg)
             else:
                 logger.error(
                     "musics.fcg 返回空 purl: %s",
-                    json.dumps(midurlinfo[0], ensure_ascii=False),
+                    json.dumps(midurlinfo, ensure_ascii=False),
                 )
-            return None
-
-        if msg and ("404" in msg or "fnameHitCache_404" in msg):
+        elif msg and ("404" in msg or "fnameHitCache_404" in msg):
             logger.warning("CDN 消息提示 404，但成功获取 purl: %s", msg)
 
-        sip_list = req_data.get("sip") or []
-        base_url = "https://isure.stream.qqmusic.qq.com/"
-        if sip_list:
-            base_url = sip_list[0]
-        if not base_url.endswith("/"):
-            base_url += "/"
-
-        return f"{base_url}{purl}"
+        return urls
 
     def _build_musics_headers(self) -> Dict[str, str]:
         """构造 musics.fcg 请求头."""
@@ -649,6 +1098,7 @@ class QQMusicAPI:
         }
         return headers
 
+    @tracing.traced("api.lyrics")
     async def get_lyrics(self, songmid: str) -> Optional[str]:
         """获取歌曲歌词
 
@@ -707,10 +1157,7 @@ class QQMusicAPI:
 
     def _sanitize_filename(self, filename: str) -> str:
         """清理文件名"""
-        illegal_chars = '<>:"/\\|?*'
-        for char in illegal_chars:
-            filename = filename.replace(char, "_")
-        return filename
+        return sanitize_filename(filename)
 
     @classmethod
     def _decode_unicode_value(cls, value: Any) -> Any:
@@ -747,61 +1194,3 @@ class QQMusicAPI:
         if isinstance(data, list):
             return [cls._decode_unicode_tree(item) for item in data]
         return cls._decode_unicode_value(data)
-
-
-@dataclass
-class DownloadMonitor:
-    """下载状态监控器"""
-
-    filename: str
-    total_size: int = 0
-    downloaded: int = 0
-    start_time: datetime | None = None
-    last_update: datetime | None = None
-    status: str = "准备中"
-    error_message: str = ""
-
-    def start(self):
-        """开始下载"""
-        self.start_time = datetime.now()
-        self.last_update = datetime.now()
-        self.status = "下载中"
-        logger.info(f"开始下载: {self.filename}")
-
-    def update(self, chunk_size: int):
-        """更新下载进度"""
-        self.downloaded += chunk_size
-        current_time = datetime.now()
-        start_time = self.start_time or current_time
-        last_update = self.last_update or start_time
-
-        if (current_time - last_update).total_seconds() >= 0.1:
-            progress = (
-                (self.downloaded * 100) / self.total_size if self.total_size > 0 else 0
-            )
-            elapsed = max(1e-3, (current_time - start_time).total_seconds())
-            speed = self.downloaded / elapsed / 1024
-
-            logger.info(
-                f"下载进度 - {self.filename}: {progress:.1f}% "
-                f"({self.downloaded}/{self.total_size} bytes), "
-                f"速度: {speed:.1f} KB/s"
-            )
-
-            self.last_update = current_time
-
-    def complete(self):
-        """完成下载"""
-        self.status = "已完成"
-        start_time = self.start_time or datetime.now()
-        duration = (datetime.now() - start_time).total_seconds()
-        logger.info(
-            f"下载完成 - {self.filename}: 总大小 {self.total_size / 1024 / 1024:.2f}MB, "
-            f"耗时 {duration:.1f}秒"
-        )
-
-    def error(self, message: str):
-        """记录错误"""
-        self.status = "错误"
-        self.error_message = message
-        logger.error(f"下载错误 - {self.filename}: {message}")
@@ -0,0 +1,219 @@
+"""轻量的耗时跨度（span）记录，可导出为 Chrome Trace 格式。
+
+默认关闭：``span`` 只做一次布尔判断并返回共享的空上下文，可以放在下载
+循环等热点路径上。开启后每个跨度记录开始时间、耗时与附加字段，导出的
+JSON 可在 ``chrome://tracing`` 或 https://ui.perfetto.dev 中按时间线查看::
+
+    tracing.enable()
+    with tracing.span("musics.fcg", module="search") as current:
+        ...
+        current.set(bytes=1024)
+    tracing.export_chrome(Path("trace.json"))
+
+同一事件循环中并发的协程各自占用一条轨道；通过 ``asyncio.to_thread``
+进入工作线程的跨度沿用发起协程的轨道，因此加解密会嵌套显示在调用它的
+请求之下。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+# 协程进入工作线程后仍可找到所属轨道
+_current_track: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "qqmusic_trace_track", default=None
+)
+
+
+class _NullSpan:
+    """关闭时使用的空跨度，可重复进入。"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def set(self, **attrs: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """一次记录中的跨度，退出时写入 ``Tracer``。"""
+
+    __slots__ = ("_tracer", "name", "attrs", "track", "_start", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict[str, Any]) -> None:
+        self._tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        self.track = 0
+        self._start = 0.0
+        self._token: Optional[contextvars.Token[Optional[int]]] = None
+
+    def set(self, **attrs: Any) -> None:
+        """补充附加字段，例如在结束前记录传输字节数。"""
+
+        self.attrs.update(attrs)
+
+    def __enter__(self) -> "Span":
+        self.track = self._tracer._track()
+        self._token = _current_track.set(self.track)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        end = time.perf_counter()
+        if self._token is not None:
+            _current_track.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self._tracer._record(self, self._start, end)
+
+
+class Tracer:
+    """收集跨度并导出；最多保留 ``max_events`` 个最近的跨度。"""
+
+    def __init__(self, max_events: int = 200_000) -> None:
+        self.enabled = False
+        self._events: deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._tracks: Dict[int, int] = {}
+        self._names: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def span(self, name: str, **attrs: Any) -> Span | _NullSpan:
+        if not self.enabled:
+            return _NULL_SPAN
+        return Span(self, name, attrs)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._events.clear()
+            self._tracks.clear()
+            self._names.clear()
+            self._origin = time.perf_counter()
+
+    def events(self) -> list[Dict[str, Any]]:
+        """返回已记录的跨度（Chrome Trace 的完整事件格式）。"""
+
+        with self._lock:
+            return list(self._events)
+
+    def _track(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            key, label = id(task), task.get_name()
+        else:
+            inherited = _current_track.get()
+            if inherited is not None:
+                return inherited
+            thread = threading.current_thread()
+            key, label = thread.ident or 0, thread.name
+        with self._lock:
+            track = self._tracks.get(key)
+            if track is None:
+                track = self._tracks[key] = len(self._tracks) + 1
+                self._names[track] = label
+            return track
+
+    def _record(self, span: Span, start: float, end: float) -> None:
+        event = {
+            "name": span.name,
+            "ph": "X",
+            "pid": os.getpid(),
+            "tid": span.track,
+            "ts": (start - self._origin) * 1_000_000,
+            "dur": (end - start) * 1_000_000,
+            "args": span.attrs,
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def export_chrome(self, path: Path) -> int:
+        """写入 Chrome Trace JSON，返回写入的跨度数量。"""
+
+        with self._lock:
+            events = list(self._events)
+            names = dict(self._names)
+        pid = os.getpid()
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": track, "args": {"name": name}}
+            for track, name in sorted(names.items())
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(
+                {"traceEvents": metadata + events, "displayTimeUnit": "ms"},
+                ensure_ascii=False,
+                default=str,
+            ),
+            encoding="utf-8",
+        )
+        return len(events)
+
+
+TRACER = Tracer()
+
+
+def span(name: str, **attrs: Any) -> Span | _NullSpan:
+    """在全局记录器上开启一个跨度；未启用时几乎没有开销。"""
+
+    if not TRACER.enabled:
+        return _NULL_SPAN
+    return Span(TRACER, name, attrs)
+
+
+def enabled() -> bool:
+    return TRACER.enabled
+
+
+def enable() -> None:
+    TRACER.enabled = True
+
+
+def disable() -> None:
+    TRACER.enabled = False
+
+
+def export_chrome(path: Path) -> int:
+    """导出全局记录器中的跨度。"""
+
+    return TRACER.export_chrome(path)
+
+
+def traced(
+    name: str,
+) -> Callable[[Callable[..., Awaitable[_T]]], Callable[..., Awaitable[_T]]]:
+    """将整个协程函数记录为一个跨度。"""
+
+    def decorate(func: Callable[..., Awaitable[_T]]) -> Callable[..., Awaitable[_T]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> _T:
+            if not TRACER.enabled:
+                return await func(*args, **kwargs)
+            with Span(TRACER, name, {}):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
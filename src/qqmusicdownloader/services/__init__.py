@@ -1,9 +1,52 @@
-"""应用服务层：编排跨模块的业务用例。"""
+"""应用服务层：编排跨模块的业务用例。
+
+导出项按需加载（PEP 562），仅使用排序策略等轻量功能时不会导入下载服务。
+"""
 
 from __future__ import annotations
 
-from .download_service import DownloadService
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .account_pool import AccountPool
+    from .download_service import DownloadService
+    from .handles import DownloadHandle
+    from .ordering import ORDERING_POLICIES, OrderingPolicy
+    from .transfer_monitor import DashboardSnapshot, TransferMonitor, TransferStat
+
+_EXPORTS = {
+    "AccountPool": ".account_pool",
+    "DownloadService": ".download_service",
+    "DownloadHandle": ".handles",
+    "ORDERING_POLICIES": ".ordering",
+    "OrderingPolicy": ".ordering",
+    "DashboardSnapshot": ".transfer_monitor",
+    "TransferMonitor": ".transfer_monitor",
+    "TransferStat": ".transfer_monitor",
+}
 
 __all__ = [
+    "AccountPool",
+    "DashboardSnapshot",
+    "DownloadHandle",
     "DownloadService",
+    "ORDERING_POLICIES",
+    "OrderingPolicy",
+    "TransferMonitor",
+    "TransferStat",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
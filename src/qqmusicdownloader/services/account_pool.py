@@ -0,0 +1,298 @@
+"""多账号 Cookie 池：在多个账号之间分摊接口请求。"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterable, Sequence
+
+from qqmusicdownloader.domain import DownloadAPI, SongRecord
+from qqmusicdownloader.infrastructure import RateLimitedError, metrics
+
+logger = logging.getLogger(__name__)
+
+ACCOUNT_ACTIVE = "active"
+ACCOUNT_COOLING = "cooling"
+ACCOUNT_INVALID = "invalid"
+
+ROTATION_POLICIES = ("round_robin", "budget")
+
+
+@dataclass(slots=True)
+class Account:
+    """账号池中的单个账号及其轮转状态。"""
+
+    name: str
+    api: DownloadAPI
+    state: str = ACCOUNT_ACTIVE
+    cooldown_until: float = 0.0
+    window_started: float = 0.0
+    used_in_window: int = 0
+    total_requests: int = 0
+    rate_limited: int = 0
+
+
+class AccountPool:
+    """实现 ``DownloadAPI`` 的多账号适配器。
+
+    解析类请求（下载地址、歌词、搜索、歌单）按 ``policy`` 分摊到各账号：
+    ``round_robin`` 依次轮转，``budget`` 优先选择本时间窗口内剩余额度最多的账号。
+    账号触发限流后在 ``cooldown`` 秒内移出轮转，冷却结束后在后台重新校验，
+    校验通过才回到轮转中，连续 ``max_revalidations`` 次失败则视为失效。
+
+    音频传输、下载目录与限速由第一个账号（主账号）负责：CDN 链接本身不依赖
+    Cookie，集中在一处也便于共享全局限速与下载清单。传输时需要的歌词仍经
+    轮转获取，再交给主账号写入。
+    """
+
+    def __init__(
+        self,
+        apis: Sequence[DownloadAPI],
+        *,
+        policy: str = "round_robin",
+        budget: int | None = None,
+        window: float = 60.0,
+        cooldown: float = 300.0,
+        max_revalidations: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not apis:
+            raise ValueError("账号池至少需要一个账号")
+        if policy not in ROTATION_POLICIES:
+            choices = "、".join(ROTATION_POLICIES)
+            raise ValueError(f"未知的轮转策略: {policy}（可选: {choices}）")
+        self.accounts = [
+            Account(name=f"account-{index + 1}", api=api) for index, api in enumerate(apis)
+        ]
+        self.policy = policy
+        self.budget = budget
+        self.window = window
+        self.cooldown = cooldown
+        self.max_revalidations = max_revalidations
+        self._clock = clock
+        self._next = 0
+        self._revalidations: dict[str, asyncio.Task[None]] = {}
+
+    @classmethod
+    def from_cookies(cls, cookies: Iterable[str], **options: Any) -> "AccountPool":
+        """为每个 Cookie 创建独立的 ``QQMusicAPI`` 并组成账号池。"""
+
+        from qqmusicdownloader.infrastructure.qq_music_api import QQMusicAPI
+
+        return cls([QQMusicAPI(cookie) for cookie in cookies], **options)
+
+    @property
+    def primary(self) -> DownloadAPI:
+        """负责传输与目录配置的主账号。"""
+
+        return self.accounts[0].api
+
+    def close(self) -> None:
+        """取消后台校验任务。"""
+
+        for task in self._revalidations.values():
+            task.cancel()
+        self._revalidations.clear()
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        """返回各账号的状态快照，便于展示与诊断。"""
+
+        now = self._clock()
+        return [
+            {
+                "name": account.name,
+                "state": account.state,
+                "requests": account.total_requests,
+                "rate_limited": account.rate_limited,
+                "remaining_budget": self._remaining(account, now),
+                "cooldown_remaining": max(0.0, account.cooldown_until - now),
+            }
+            for account in self.accounts
+        ]
+
+    # ---- DownloadAPI：解析类请求分摊到各账号 ----
+
+    async def validate_cookie(self) -> bool:
+        """并发校验所有账号，至少一个有效即返回 ``True``。"""
+
+        results = await asyncio.gather(
+            *(account.api.validate_cookie() for account in self.accounts),
+            return_exceptions=True,
+        )
+        for account, result in zip(self.accounts, results):
+            if result is True:
+                account.state = ACCOUNT_ACTIVE
+            else:
+                account.state = ACCOUNT_INVALID
+                logger.warning("账号 %s 校验失败，已移出轮转", account.name)
+        return any(account.state == ACCOUNT_ACTIVE for account in self.accounts)
+
+    async def search_song(
+        self, keyword: str, *, page: int = 1, page_size: int = 20
+    ) -> list[SongRecord]:
+        return await self._call("search_song", keyword, page=page, page_size=page_size)
+
+    async def get_song_url(self, songmid: str, media_mid: str, quality: int) -> str | None:
+        return await self._call("get_song_url", songmid, media_mid, quality)
+
+    async def get_song_url_with_fallback(
+        self, songmid: str, media_mid: str, qualities: Sequence[int]
+    ) -> tuple[int, str] | None:
+        return await self._call("get_song_url_with_fallback", songmid, media_mid, qualities)
+
+    async def get_lyrics(self, songmid: str) -> str | None:
+        return await self._call("get_lyrics", songmid)
+
+    async def iter_playlist(
+        self, playlist: str, *, page_size: int = 100
+    ) -> AsyncIterator[list[SongRecord]]:
+        # 分页请求依赖同一份歌单上下文，整个歌单由一个账号获取
+        account = await self._acquire()
+        try:
+            async for page in account.api.iter_playlist(playlist, page_size=page_size):
+                yield page
+        except RateLimitedError as exc:
+            self._cool_down(account, exc.retry_after)
+            raise
+
+    # ---- DownloadAPI：传输与配置交给主账号 ----
+
+    def get_download_path(self) -> str:
+        return self.primary.get_download_path()
+
+    def configure_download_dirs(self, base_dir: Path) -> None:
+        for account in self.accounts:
+            account.api.configure_download_dirs(base_dir)
+
+    def set_bandwidth_limit(self, bytes_per_second: int | None) -> None:
+        self.primary.set_bandwidth_limit(bytes_per_second)
+
+    async def download_with_lyrics(
+        self, url: str, filename: str, quality: int, songmid: str, **options: Any
+    ) -> bool:
+        if options.get("lyrics") is None and options.get("with_lyrics", True):
+            options["lyrics"] = await self._fetch_lyrics(songmid)
+            options["with_lyrics"] = False
+        return await self.primary.download_with_lyrics(
+            url, filename, quality, songmid, **options
+        )
+
+    async def _fetch_lyrics(self, songmid: str) -> str | None:
+        try:
+            return await self.get_lyrics(songmid)
+        except Exception as exc:
+            logger.warning("获取歌词失败 %s: %s", songmid, exc)
+            return None
+
+    # ---- 轮转与冷却 ----
+
+    async def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+        tried: set[str] = set()
+        while True:
+            account = await self._acquire()
+            try:
+                return await getattr(account.api, method)(*args, **kwargs)
+            except RateLimitedError as exc:
+                self._cool_down(account, exc.retry_after)
+                tried.add(account.name)
+                if len(tried) >= len(self.accounts):
+                    raise
+                metrics.RETRIES.inc(reason="rate_limited")
+
+    async def _acquire(self) -> Account:
+        while True:
+            account = self._pick()
+            if account is not None:
+                account.used_in_window += 1
+                account.total_requests += 1
+                return account
+            if all(account.state == ACCOUNT_INVALID for account in self.accounts):
+                raise RuntimeError("账号池中没有可用账号")
+            await asyncio.sleep(self._wait_time())
+
+    def _pick(self) -> Account | None:
+        now = self._clock()
+        for account in self.accounts:
+            self._roll_window(account, now)
+        candidates = [
+            (index, account)
+            for index, account in enumerate(self.accounts)
+            if account.state == ACCOUNT_ACTIVE and self._remaining(account, now) > 0
+        ]
+        if not candidates:
+            return None
+        if self.policy == "budget":
+            return max(candidates, key=lambda item: self._remaining(item[1], now))[1]
+
+        count = len(self.accounts)
+        for offset in range(count):
+            index = (self._next + offset) % count
+            for candidate_index, account in candidates:
+                if candidate_index == index:
+                    self._next = index + 1
+                    return account
+        return None  # pragma: no cover - candidates 非空时必然命中
+
+    def _roll_window(self, account: Account, now: float) -> None:
+        if now - account.window_started >= self.window:
+            account.window_started = now
+            account.used_in_window = 0
+
+    def _remaining(self, account: Account, now: float) -> float:
+        """账号在 ``now`` 时的剩余额度；窗口已过期时按新窗口计算，不修改状态。"""
+
+        if self.budget is None:
+            return math.inf
+        if now - account.window_started >= self.window:
+            return self.budget
+        return self.budget - account.used_in_window
+
+    def _wait_time(self) -> float:
+        now = self._clock()
+        deadlines = [
+            account.cooldown_until - now
+            for account in self.accounts
+            if account.state == ACCOUNT_COOLING
+        ]
+        if self.budget is not None:
+            deadlines.extend(
+                account.window_started + self.window - now
+                for account in self.accounts
+                if account.state == ACCOUNT_ACTIVE
+            )
+        # 冷却结束后还需等待后台校验完成，因此设置最小轮询间隔
+        return max(0.05, min(deadlines, default=0.05))
+
+    def _cool_down(self, account: Account, retry_after: float | None = None) -> None:
+        account.state = ACCOUNT_COOLING
+        account.rate_limited += 1
+        account.cooldown_until = self._clock() + (retry_after or self.cooldown)
+        logger.warning(
+            "账号 %s 触发限流，冷却 %.0f 秒", account.name, retry_after or self.cooldown
+        )
+        task = self._revalidations.get(account.name)
+        if task is None or task.done():
+            self._revalidations[account.name] = asyncio.create_task(
+                self._revalidate(account)
+            )
+
+    async def _revalidate(self, account: Account) -> None:
+        for _ in range(self.max_revalidations):
+            await asyncio.sleep(max(0.0, account.cooldown_until - self._clock()))
+            try:
+                valid = await account.api.validate_cookie()
+            except Exception as exc:
+                logger.warning("账号 %s 重新校验出错: %s", account.name, exc)
+                valid = False
+            if valid:
+                account.state = ACCOUNT_ACTIVE
+                account.cooldown_until = 0.0
+                logger.info("账号 %s 已恢复轮转", account.name)
+                return
+            account.cooldown_until = self._clock() + self.cooldown
+        account.state = ACCOUNT_INVALID
+        logger.error("账号 %s 多次校验失败，已停用", account.name)
@@ -3,11 +3,46 @@
 from __future__ import annotations
 
 import asyncio
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Sequence
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Iterable,
+    Sequence,
+)
+from urllib.parse import urlsplit
 
-from qqmusicdownloader.domain import DownloadConfig, DownloadAPI, SongRecord
-from qqmusicdownloader.infrastructure import QQMusicAPI
+from qqmusicdownloader.domain import (
+    BatchProgress,
+    DownloadConfig,
+    DownloadAPI,
+    DownloadResult,
+    SongRecord,
+    expected_file_size,
+    quality_fallback_chain,
+    song_file_stem,
+)
+from qqmusicdownloader.infrastructure import (
+    Job,
+    JobStore,
+    LibraryEntry,
+    LibraryIndex,
+    TokenBucket,
+)
+from qqmusicdownloader.infrastructure import metrics, profiling, tracing
+from qqmusicdownloader.services.handles import DownloadHandle
+from qqmusicdownloader.services.ordering import OrderingPolicy, resolve_ordering
+
+logger = logging.getLogger(__name__)
 
 
 class DownloadService:
@@ -18,19 +53,57 @@ class DownloadService:
         api_client: DownloadAPI,
         *,
         config: DownloadConfig | None = None,
+        job_store: JobStore | None = None,
+        library: LibraryIndex | None = None,
     ) -> None:
         self._api = api_client
         self.config = config or DownloadConfig()
+        self.job_store = job_store
+        self.library = library
         self.current_songs: list[SongRecord] = []
-        self.global_pause_event = asyncio.Event()
+        self.batch_progress: BatchProgress | None = None
+        self._handles: set[DownloadHandle] = set()
+        # 兼容直接操作事件的调用方：clear/set 与 pause_all/resume_all 等价
+        self.global_pause_event = _GlobalPauseEvent(self._apply_global_pause)
         self.global_pause_event.set()
+        self._background: set[asyncio.Task[DownloadResult]] = set()
+        self._search_cache: OrderedDict[
+            tuple[str, int, int], tuple[float, list[SongRecord]]
+        ] = OrderedDict()
+        self.search_cache_hits = 0
+        self.search_cache_misses = 0
+        self.library_hits = 0
+        self.library_misses = 0
+        self.host_bytes: dict[str, int] = {}
 
     @classmethod
-    def from_cookie(cls, cookie: str) -> "DownloadService":
+    def from_cookie(
+        cls, cookie: str, *, config: DownloadConfig | None = None
+    ) -> "DownloadService":
         """使用原始 Cookie 创建服务实例。"""
 
+        # 延迟导入：aiohttp 体积较大，只在真正需要联网时加载
+        from qqmusicdownloader.infrastructure.qq_music_api import QQMusicAPI
+
         api = QQMusicAPI(cookie)
-        return cls(api)
+        return cls(api, config=config)
+
+    @classmethod
+    def from_cookies(
+        cls,
+        cookies: Sequence[str],
+        *,
+        config: DownloadConfig | None = None,
+        **pool_options: Any,
+    ) -> "DownloadService":
+        """使用多个账号的 Cookie 创建服务，解析请求在账号池中分摊。
+
+        ``pool_options`` 透传给 ``AccountPool``（轮转策略、额度、冷却时间等）。
+        """
+
+        from qqmusicdownloader.services.account_pool import AccountPool
+
+        return cls(AccountPool.from_cookies(cookies, **pool_options), config=config)
 
     async def validate_cookie(self) -> bool:
         """验证 Cookie 是否有效。"""
@@ -40,10 +113,121 @@ class DownloadService:
     async def search(self, keyword: str) -> list[SongRecord]:
         """搜索歌曲并缓存最新结果。"""
 
-        songs: list[SongRecord] = await self._api.search_song(keyword)
+        songs = await self._search_page(keyword)
         self.current_songs = songs
         return songs
 
+    async def iter_search(
+        self,
+        keyword: str,
+        *,
+        page_size: int = 50,
+        max_results: int = 500,
+    ) -> AsyncIterator[list[SongRecord]]:
+        """逐页搜索歌曲，每获取一页立即产出。
+
+        ``current_songs`` 随分页增长；接口返回不足一页、没有新歌曲或累计达到
+        ``max_results`` 时停止翻页。接口在相邻页之间偶尔会重复返回同一首歌，
+        按 ``songmid`` 去重后再产出。
+        """
+
+        self.current_songs = []
+        seen: set[str] = set()
+        page = 1
+        while len(self.current_songs) < max_results:
+            songs = await self._search_page(keyword, page=page, page_size=page_size)
+            fresh: list[SongRecord] = []
+            for song in songs:
+                songmid = song.get("songmid", "")
+                if songmid and songmid in seen:
+                    continue
+                seen.add(songmid)
+                fresh.append(song)
+            fresh = fresh[: max_results - len(self.current_songs)]
+            if fresh:
+                self.current_songs.extend(fresh)
+                yield fresh
+            if len(songs) < page_size or not fresh:
+                return
+            page += 1
+
+    def diagnostics(self) -> dict[str, Any]:
+        """汇总加解密桥接、HTTP 连接、缓存命中与各 CDN 主机下载量，供诊断界面展示。"""
+
+        from qqmusicdownloader.infrastructure.crypto.bridge import bridge_stats
+        from qqmusicdownloader.services.account_pool import AccountPool
+
+        pool = self._api if isinstance(self._api, AccountPool) else None
+        apis = [account.api for account in pool.accounts] if pool else [self._api]
+
+        def connections(attr: str) -> dict[str, int]:
+            merged: dict[str, int] = {}
+            for api in apis:
+                stats = getattr(api, attr, None)
+                if stats is None:
+                    continue
+                for key, value in stats.snapshot().items():
+                    merged[key] = merged.get(key, 0) + value
+            return merged
+
+        return {
+            "bridge": bridge_stats(),
+            "api_http": connections("api_connections"),
+            "cdn_http": connections("cdn_connections"),
+            "search_cache": {
+                "hits": self.search_cache_hits,
+                "misses": self.search_cache_misses,
+                "size": len(self._search_cache),
+                "capacity": self.config.search_cache_size,
+            },
+            "library": {
+                "hits": self.library_hits,
+                "misses": self.library_misses,
+                "entries": len(self.library) if self.library is not None else 0,
+            },
+            "hosts": dict(self.host_bytes),
+            "accounts": pool.snapshot() if pool else [],
+        }
+
+    def clear_search_cache(self) -> None:
+        """清空搜索缓存。"""
+
+        self._search_cache.clear()
+
+    @profiling.profiled("search")
+    async def _search_page(self, keyword: str, **paging: int) -> list[SongRecord]:
+        """获取一页搜索结果，命中缓存时不发起请求。
+
+        缓存按关键词、页码与每页数量区分，容量与有效期取自
+        ``config.search_cache_size``/``config.search_cache_ttl``，按最近使用淘汰。
+        边输入边搜索时同一前缀会被反复查询，缓存可省去重复的加解密与网络请求。
+        空结果不缓存，以免一次接口抖动在有效期内一直返回空列表。
+        """
+
+        key = (
+            keyword.strip().casefold(),
+            paging.get("page", 1),
+            paging.get("page_size", 20),
+        )
+        now = time.monotonic()
+        cached = self._search_cache.get(key)
+        if cached is not None and cached[0] > now:
+            self._search_cache.move_to_end(key)
+            self.search_cache_hits += 1
+            metrics.CACHE_REQUESTS.inc(cache="search", result="hit")
+            return list(cached[1])
+
+        self.search_cache_misses += 1
+        metrics.CACHE_REQUESTS.inc(cache="search", result="miss")
+        # 不分页时按最小接口调用，兼容只实现 ``search_song(keyword)`` 的适配器
+        songs: list[SongRecord] = await self._api.search_song(keyword, **paging)
+        if songs and self.config.search_cache_size > 0:
+            self._search_cache[key] = (now + self.config.search_cache_ttl, list(songs))
+            self._search_cache.move_to_end(key)
+            while len(self._search_cache) > self.config.search_cache_size:
+                self._search_cache.popitem(last=False)
+        return songs
+
     def get_download_path(self) -> str:
         """返回默认下载目录。"""
 
@@ -54,6 +238,62 @@ class DownloadService:
 
         self._api.configure_download_dirs(base_dir)
 
+    def set_bandwidth_limit(self, bytes_per_second: int | None) -> None:
+        """运行时调整全局限速，``None`` 表示不限速。"""
+
+        self._api.set_bandwidth_limit(bytes_per_second)
+
+    @property
+    def is_paused(self) -> bool:
+        """是否处于全局暂停状态。"""
+
+        return not self.global_pause_event.is_set()
+
+    def pause_all(self) -> None:
+        """全局暂停：同步关闭所有任务的闸门。"""
+
+        self.global_pause_event.clear()
+
+    def resume_all(self) -> None:
+        """取消全局暂停，单独暂停的任务仍保持暂停。"""
+
+        self.global_pause_event.set()
+
+    def _apply_global_pause(self, paused: bool) -> None:
+        for handle in self._handles:
+            handle._set_globally_paused(paused)
+
+    def active_handles(self) -> list[DownloadHandle]:
+        """返回尚未结束的任务句柄。"""
+
+        return [handle for handle in self._handles if not handle.done()]
+
+    def start_download(
+        self,
+        song: SongRecord,
+        quality: int,
+        *,
+        rate_limit: int | TokenBucket | None = None,
+        with_lyrics: bool | None = None,
+    ) -> DownloadHandle:
+        """在后台开始下载单首歌曲并立即返回控制句柄。"""
+
+        handle = self._new_handle(song, rate_limit)
+        fetch_lyrics = self._lyrics_enabled(with_lyrics)
+
+        @profiling.profiled("download")
+        async def work() -> DownloadResult:
+            resolved = await self._resolve(song, quality, with_lyrics=False)
+            return await self._download_resolved(
+                song, resolved, quality, fetch_lyrics, handle=handle
+            )
+
+        runner = asyncio.create_task(self._run_handle(handle, work()))
+        self._background.add(runner)
+        runner.add_done_callback(self._background.discard)
+        return handle
+
+    @profiling.profiled("download")
     async def download_song(
         self,
         song: SongRecord,
@@ -62,32 +302,727 @@ class DownloadService:
         progress_bar: object | None = None,
         progress_label: object | None = None,
         extra_pause_events: Sequence[asyncio.Event] | None = None,
+        rate_limit: int | TokenBucket | None = None,
+        with_lyrics: bool | None = None,
     ) -> bool:
-        """下载单首歌曲，包含歌词。"""
+        """下载单首歌曲，包含歌词。
+
+        ``rate_limit`` 可以是字节/秒数值，也可以是调用方持有的 ``TokenBucket``，
+        后者便于在下载过程中通过 ``set_rate`` 动态调整单任务限速。
+        ``with_lyrics`` 为 ``None`` 时沿用 ``config.download_lyrics``。
+        需要单独暂停或取消时请使用 ``start_download`` 获取句柄。
+        """
+
+        songmid, media_mid = self._song_ids(song)
+
+        if self._library_hit(song, songmid, quality) is not None:
+            metrics.SONGS.inc(result="skipped")
+            return True
+
+        resolved_quality, download_url = await self._resolve_url(
+            songmid, media_mid, quality
+        )
+        if not download_url:
+            metrics.SONGS.inc(result="failed")
+            return False
+
+        handle = self._new_handle(song, rate_limit)
+        metrics.ACTIVE_DOWNLOADS.inc()
+        success = False
+        try:
+            success = await self._transfer(
+                _ResolvedSong(
+                    song=song,
+                    songmid=songmid,
+                    url=download_url,
+                    quality=resolved_quality,
+                ),
+                quality,
+                handle=handle,
+                progress_bar=progress_bar,
+                progress_label=progress_label,
+                extra_pause_events=extra_pause_events,
+                with_lyrics=self._lyrics_enabled(with_lyrics),
+            )
+        finally:
+            self._handles.discard(handle)
+            metrics.ACTIVE_DOWNLOADS.dec()
+            metrics.SONGS.inc(result="succeeded" if success else "failed")
+        if success:
+            await self._sync_library()
+        return success
+
+    def open_library(self, path: Path | None = None) -> LibraryIndex:
+        """打开曲库索引，默认位于下载目录下的 ``library.sqlite3``。
+
+        打开后批量与单曲下载都会先查询索引，已下载的歌曲不再请求任何接口。
+        """
+
+        if self.library is not None:
+            self.library.close()
+        base = Path(self.get_download_path())
+        self.library = LibraryIndex(
+            path or base / "library.sqlite3",
+            music_dir=base / "Music",
+            manifest_path=base / "manifest.jsonl",
+        )
+        return self.library
+
+    async def scan_library(self) -> int:
+        """在后台线程中增量扫描下载目录，返回索引变更条数。"""
+
+        if self.library is None:
+            return 0
+        try:
+            return await asyncio.to_thread(self.library.scan)
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning("扫描曲库失败: %s", exc)
+            return 0
+
+    def open_job_store(self, path: Path | None = None) -> JobStore:
+        """打开持久化任务队列，默认位于下载目录下的 ``jobs.sqlite3``。"""
+
+        if self.job_store is not None:
+            self.job_store.close()
+        store_path = path or Path(self.get_download_path()) / "jobs.sqlite3"
+        self.job_store = JobStore(store_path)
+        self.job_store.recover()
+        return self.job_store
+
+    def enqueue_jobs(self, songs: Iterable[SongRecord], quality: int) -> list[int]:
+        """将歌曲写入持久化任务队列，返回任务编号。"""
+
+        return self._require_job_store().enqueue(songs, quality)
+
+    def pending_job_count(self, job_ids: Iterable[int] | None = None) -> int:
+        """返回待处理（含中断后恢复）的任务数量，可限定任务编号。"""
+
+        if self.job_store is None:
+            return 0
+        return len(self.job_store.pending(job_ids))
+
+    async def run_jobs(
+        self,
+        job_ids: Iterable[int] | None = None,
+        *,
+        max_concurrent: int | None = None,
+        order: str | OrderingPolicy | None = None,
+        cancel_event: asyncio.Event | None = None,
+        on_progress: Callable[[BatchProgress], None] | None = None,
+        on_song_start: Callable[[int, SongRecord], None] | None = None,
+        on_song_done: Callable[[int, SongRecord, DownloadResult], None] | None = None,
+    ) -> list[DownloadResult]:
+        """执行持久化队列中的待处理任务，可限定任务编号。
+
+        每个任务的状态、尝试次数、已下载字节与错误都会即时写回队列；
+        失败任务在 ``config.max_attempts`` 次以内自动重新排队，
+        取消的任务放回待处理状态，进程重启后可继续执行。
+        """
+
+        store = self._require_job_store()
+        wanted = set(job_ids) if job_ids is not None else None
+        final: dict[int, DownloadResult] = {}
+        released: set[int] = set()
+
+        while cancel_event is None or not cancel_event.is_set():
+            # 本轮被单独取消的任务留待下次运行，避免立即重新派发
+            jobs = [job for job in store.pending(wanted) if job.id not in released]
+            if not jobs:
+                break
+
+            by_quality: dict[int, list[Job]] = {}
+            for job in jobs:
+                by_quality.setdefault(job.quality, []).append(job)
+
+            for quality, group in by_quality.items():
+                if cancel_event is not None and cancel_event.is_set():
+                    break
+
+                def start(index: int, song: SongRecord, group: list[Job] = group) -> None:
+                    store.mark_running(group[index].id)
+                    if on_song_start:
+                        on_song_start(index, song)
+
+                def done(
+                    index: int,
+                    song: SongRecord,
+                    result: DownloadResult,
+                    group: list[Job] = group,
+                ) -> None:
+                    job = group[index]
+                    if result.success:
+                        store.mark_done(job.id, result.bytes_downloaded)
+                    elif not result.cancelled:
+                        retry = job.attempts + 1 < self.config.max_attempts
+                        store.mark_failed(
+                            job.id,
+                            result.error,
+                            bytes_done=result.bytes_downloaded,
+                            retry=retry,
+                        )
+                        if retry:
+                            metrics.RETRIES.inc(reason="job_requeued")
+                    if on_song_done:
+                        on_song_done(index, song, result)
+
+                results = await self.download_many(
+                    [job.song for job in group],
+                    quality,
+                    max_concurrent=max_concurrent,
+                    order=order,
+                    cancel_event=cancel_event,
+                    on_progress=on_progress,
+                    on_song_start=start,
+                    on_song_done=done,
+                )
+                for job, result in zip(group, results):
+                    if result.cancelled:
+                        store.release(job.id)
+                        released.add(job.id)
+                    final[job.id] = result
+
+        return list(final.values())
+
+    def _require_job_store(self) -> JobStore:
+        if self.job_store is None:
+            raise RuntimeError("尚未打开任务队列，请先调用 open_job_store")
+        return self.job_store
+
+    async def download_batch(
+        self,
+        songs: Iterable[SongRecord],
+        quality: int,
+        *,
+        lookahead: int | None = None,
+        with_lyrics: bool | None = None,
+        on_song_start: Callable[[int, SongRecord], None] | None = None,
+        on_song_done: Callable[[int, SongRecord, bool], None] | None = None,
+    ) -> list[bool]:
+        """流水线方式逐首批量下载，等价于单并发的 ``download_many``。
+
+        Returns:
+            list[bool]: 与输入顺序一致的逐首下载结果。
+        """
+
+        def report(index: int, song: SongRecord, result: DownloadResult) -> None:
+            if on_song_done:
+                on_song_done(index, song, result.success)
+
+        results = await self.download_many(
+            songs,
+            quality,
+            max_concurrent=1,
+            lookahead=lookahead,
+            with_lyrics=with_lyrics,
+            on_song_start=on_song_start,
+            on_song_done=report,
+        )
+        return [result.success for result in results]
 
+    async def download_playlist(
+        self,
+        playlist: str,
+        quality: int,
+        *,
+        page_size: int = 100,
+        **options: Any,
+    ) -> list[DownloadResult]:
+        """下载整个歌单，歌曲按页流式进入调度器。
+
+        首页到达后立即开始下载，后续分页在下载过程中继续获取；
+        ``options`` 与 ``download_many`` 的关键字参数相同。
+        首页获取失败（歌单不存在、链接无法识别等）时直接抛出异常，
+        后续分页出错只会提前结束，已获取的歌曲照常下载。
+        """
+
+        pages = aiter(self._api.iter_playlist(playlist, page_size=page_size))
+        first_page = await anext(pages, [])
+
+        async def songs() -> AsyncIterator[SongRecord]:
+            for song in first_page:
+                yield song
+            async for page in pages:
+                for song in page:
+                    yield song
+
+        return await self.download_many(songs(), quality, **options)
+
+    @profiling.profiled("batch")
+    async def download_many(
+        self,
+        songs: Iterable[SongRecord] | AsyncIterable[SongRecord],
+        quality: int,
+        *,
+        max_concurrent: int | None = None,
+        lookahead: int | None = None,
+        with_lyrics: bool | None = None,
+        order: str | OrderingPolicy | None = None,
+        cancel_event: asyncio.Event | None = None,
+        on_progress: Callable[[BatchProgress], None] | None = None,
+        on_song_start: Callable[[int, SongRecord], None] | None = None,
+        on_song_done: Callable[[int, SongRecord, DownloadResult], None] | None = None,
+        on_handles: Callable[[list[DownloadHandle]], None] | None = None,
+    ) -> list[DownloadResult]:
+        """使用有界工作池并发批量下载。
+
+        解析阶段并发地为后续 ``lookahead`` 首歌曲获取下载地址与歌词，
+        按派发顺序经有界队列交给最多 ``max_concurrent`` 个下载协程（默认取
+        ``config.max_concurrent``），使接口延迟与传输重叠。
+        下载地址带有时效，因此预取深度不宜过大。
+
+        ``order`` 指定派发顺序（``fifo``/``shortest``/``largest``/``artist``/
+        ``mixed`` 或自定义策略，默认取 ``config.order_policy``）。
+
+        单曲失败只记录在结果中，不会中断批次。``cancel_event`` 被设置后
+        停止派发并取消进行中的下载，未完成的歌曲标记为已取消；
+        直接取消调用方任务同样会清理全部工作协程。批次中的每首歌曲都有
+        ``DownloadHandle``，可通过 ``on_handles`` 或 ``active_handles`` 获取，
+        用于单独暂停、恢复或取消而不影响其他槽位。
+
+        ``songs`` 也可以是异步可迭代对象（如分页获取的歌单）：歌曲到达即
+        进入解析队列，按到达顺序派发（不应用 ``order``），``BatchProgress.total``
+        与 ``on_handles`` 收到的句柄列表随之增长。来源中途出错时停止接收，
+        已到达的歌曲照常完成。
+
+        Returns:
+            list[DownloadResult]: 与输入顺序一致的逐首下载结果。
+        """
+
+        streaming = isinstance(songs, AsyncIterable)
+        pending: list[SongRecord] = [] if streaming else list(songs)  # type: ignore[arg-type]
+        workers_count = max(
+            1, max_concurrent if max_concurrent is not None else self.config.max_concurrent
+        )
+        depth = max(1, lookahead if lookahead is not None else self.config.lookahead)
+        queue: asyncio.Queue[tuple[int, _ResolvedSong | None] | None] = asyncio.Queue(
+            maxsize=depth
+        )
+        # 空闲的下载协程不应等待串行解析，解析并发度至少与下载并发一致
+        slots = asyncio.Semaphore(max(depth, workers_count))
+        results: list[DownloadResult | None] = [None] * len(pending)
+        progress = BatchProgress(total=len(pending))
+        self.batch_progress = progress
+        fetch_lyrics = self._lyrics_enabled(with_lyrics)
+        handles = [self._new_handle(song) for song in pending]
+        if on_handles:
+            on_handles(handles)
+
+        def publish() -> None:
+            if on_progress:
+                on_progress(progress)
+
+        def count_bytes(delta: int) -> None:
+            progress.bytes_downloaded += delta
+
+        async def arrivals() -> AsyncIterator[int]:
+            if not streaming:
+                policy = resolve_ordering(order or self.config.order_policy)
+                for index in policy(pending, quality):
+                    yield index
+                return
+            async for song in songs:  # type: ignore[union-attr]
+                pending.append(song)
+                results.append(None)
+                handles.append(self._new_handle(song))
+                progress.total += 1
+                publish()
+                yield len(pending) - 1
+
+        async def resolve_stage() -> None:
+            # 最多 ``depth`` 首歌曲同时处于解析中或等待下载，工作协程取走后释放名额；
+            # 解析并发进行，但按派发顺序交给工作协程
+            ordered: asyncio.Queue[
+                tuple[int, asyncio.Task[_ResolvedSong | None] | None] | None
+            ] = asyncio.Queue()
+
+            async def feed() -> None:
+                while (entry := await ordered.get()) is not None:
+                    index, task = entry
+                    await queue.put((index, await task if task is not None else None))
+
+            feeder = asyncio.create_task(feed())
+            resolving: list[asyncio.Task[_ResolvedSong | None]] = []
+            try:
+                try:
+                    async for index in arrivals():
+                        await slots.acquire()
+                        if handles[index].cancel_requested:
+                            ordered.put_nowait((index, None))
+                            continue
+                        task = asyncio.create_task(
+                            self._resolve(pending[index], quality, with_lyrics=fetch_lyrics)
+                        )
+                        resolving.append(task)
+                        ordered.put_nowait((index, task))
+                except Exception:
+                    logger.exception("获取待下载歌曲失败，已到达的歌曲继续下载")
+                ordered.put_nowait(None)
+                await feeder
+            finally:
+                feeder.cancel()
+                for task in resolving:
+                    task.cancel()
+                await asyncio.gather(feeder, *resolving, return_exceptions=True)
+            for _ in range(workers_count):
+                await queue.put(None)
+
+        async def worker() -> None:
+            while (item := await queue.get()) is not None:
+                index, resolved = item
+                slots.release()
+                song = pending[index]
+                if on_song_start:
+                    on_song_start(index, song)
+                progress.active += 1
+                publish()
+
+                try:
+                    result = await self._run_handle(
+                        handles[index],
+                        self._download_resolved(
+                            song,
+                            resolved,
+                            quality,
+                            fetch_lyrics,
+                            handle=handles[index],
+                            on_bytes=count_bytes,
+                        ),
+                    )
+                finally:
+                    progress.active -= 1
+
+                results[index] = result
+                if result.success:
+                    progress.succeeded += 1
+                else:
+                    progress.failed += 1
+                publish()
+                if on_song_done:
+                    on_song_done(index, song, result)
+
+        resolver = asyncio.create_task(resolve_stage())
+        workers = [asyncio.create_task(worker()) for _ in range(workers_count)]
+        all_workers = asyncio.gather(*workers)
+        watcher = asyncio.ensure_future(
+            cancel_event.wait() if cancel_event is not None else asyncio.Future()
+        )
+
+        try:
+            done, _ = await asyncio.wait(
+                {all_workers, watcher}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if all_workers in done:
+                all_workers.result()
+            else:
+                logger.info("批量下载已取消")
+        finally:
+            watcher.cancel()
+            resolver.cancel()
+            all_workers.cancel()
+            await asyncio.gather(resolver, all_workers, watcher, return_exceptions=True)
+            for handle in handles:
+                if not handle.done():
+                    handle._finish(_cancelled(handle.song))
+                    metrics.SONGS.inc(result="cancelled")
+                self._handles.discard(handle)
+
+        return [
+            result if result is not None else _cancelled(pending[index])
+            for index, result in enumerate(results)
+        ]
+
+    def _new_handle(
+        self, song: SongRecord, rate_limit: int | TokenBucket | None = None
+    ) -> DownloadHandle:
+        handle = DownloadHandle(song, globally_paused=self.is_paused, rate_limit=rate_limit)
+        self._handles.add(handle)
+        return handle
+
+    async def _run_handle(
+        self, handle: DownloadHandle, work: Awaitable[DownloadResult]
+    ) -> DownloadResult:
+        """在句柄控制下执行任务，句柄取消只影响该任务本身。"""
+
+        if handle.cancel_requested:
+            if isinstance(work, Coroutine):
+                work.close()
+            result = _cancelled(handle.song)
+        else:
+            task = asyncio.ensure_future(work)
+            handle._attach(task)
+            try:
+                result = await task
+            except asyncio.CancelledError:
+                if not handle.cancel_requested:
+                    handle._finish(_cancelled(handle.song))
+                    self._handles.discard(handle)
+                    metrics.SONGS.inc(result="cancelled")
+                    raise
+                result = _cancelled(handle.song)
+
+        handle._finish(result)
+        self._handles.discard(handle)
+        metrics.SONGS.inc(result=_outcome(result))
+        return result
+
+    async def _download_resolved(
+        self,
+        song: SongRecord,
+        resolved: _ResolvedSong | None,
+        quality: int,
+        with_lyrics: bool,
+        *,
+        handle: DownloadHandle,
+        on_bytes: Callable[[int], None] | None = None,
+    ) -> DownloadResult:
+        if resolved is None:
+            return DownloadResult(song=song, success=False, error="解析歌曲信息失败")
+        if resolved.local_path:
+            return DownloadResult(song=song, success=True, skipped=True)
+        if not resolved.url:
+            return DownloadResult(song=song, success=False, error="未能获取下载地址")
+
+        last_reported = 0
+        handle.host = urlsplit(resolved.url).hostname or ""
+        handle.bytes_total = expected_file_size(song, resolved.quality or quality)
+        handle.started_at = time.monotonic()
+
+        def on_progress(downloaded: int, total: int) -> None:
+            nonlocal last_reported
+            delta = downloaded - last_reported
+            if on_bytes is not None:
+                on_bytes(delta)
+            self.host_bytes[handle.host] = self.host_bytes.get(handle.host, 0) + delta
+            metrics.DOWNLOAD_BYTES.inc(delta, host=handle.host)
+            last_reported = downloaded
+            handle.bytes_done = downloaded
+            if total:
+                handle.bytes_total = total
+
+        metrics.ACTIVE_DOWNLOADS.inc()
+        try:
+            with tracing.span("service.download", song=song.get("name"), host=handle.host):
+                success = await self._transfer(
+                    resolved,
+                    quality,
+                    handle=handle,
+                    with_lyrics=with_lyrics,
+                    on_progress=on_progress,
+                )
+        except Exception as exc:
+            logger.exception("下载失败: %s", song.get("name"))
+            return DownloadResult(
+                song=song,
+                success=False,
+                error=str(exc),
+                bytes_downloaded=last_reported,
+            )
+        finally:
+            metrics.ACTIVE_DOWNLOADS.dec()
+
+        if success:
+            await self._sync_library()
+        return DownloadResult(
+            song=song,
+            success=success,
+            error="" if success else "下载失败",
+            bytes_downloaded=last_reported,
+        )
+
+    def _lyrics_enabled(self, with_lyrics: bool | None) -> bool:
+        if with_lyrics is None:
+            return self.config.download_lyrics
+        return with_lyrics
+
+    def _song_ids(self, song: SongRecord) -> tuple[str, str]:
         songmid = song.get("songmid") or song.get("id")
         media_mid = song.get("media_mid") or songmid
         if not songmid:
             raise ValueError("歌曲信息缺少 songmid")
+        return songmid, media_mid or ""
 
-        download_url = await self._api.get_song_url(songmid, media_mid or "", quality)
-        if not download_url:
-            return False
+    @tracing.traced("service.resolve")
+    async def _resolve(
+        self,
+        song: SongRecord,
+        quality: int,
+        *,
+        with_lyrics: bool = True,
+    ) -> _ResolvedSong | None:
+        """并发获取下载地址与歌词，失败时返回 ``None``。"""
+
+        try:
+            songmid, media_mid = self._song_ids(song)
+        except ValueError as exc:
+            logger.error("歌曲信息不完整: %s", exc)
+            return None
+
+        entry = self._library_hit(song, songmid, quality)
+        if entry is not None:
+            return _ResolvedSong(
+                song=song,
+                songmid=songmid,
+                url=None,
+                quality=entry.quality,
+                local_path=entry.path,
+            )
+
+        try:
+            if with_lyrics:
+                (resolved_quality, url), lyrics = await asyncio.gather(
+                    self._resolve_url(songmid, media_mid, quality),
+                    self._fetch_lyrics(songmid),
+                )
+            else:
+                resolved_quality, url = await self._resolve_url(
+                    songmid, media_mid, quality
+                )
+                lyrics = None
+        except Exception:
+            logger.exception("解析下载地址失败: %s", songmid)
+            return None
+
+        return _ResolvedSong(
+            song=song,
+            songmid=songmid,
+            url=url,
+            quality=resolved_quality,
+            lyrics=lyrics,
+            lyrics_prefetched=with_lyrics,
+        )
+
+    def _library_hit(
+        self, song: SongRecord, songmid: str, quality: int
+    ) -> LibraryEntry | None:
+        """查询曲库索引；启用音质降级时任一候选音质已存在即视为命中。
+
+        先按 songmid 查找清单中的记录，找不到时再按下载文件名匹配清单之外的
+        文件。运行期间被删除的文件会被移出索引，随后重新下载。
+        """
+
+        if self.library is None:
+            return None
+        qualities = (
+            quality_fallback_chain(quality) if self.config.quality_fallback else (quality,)
+        )
+        entry = self.library.lookup_any(songmid, qualities)
+        if entry is None:
+            entry = self.library.lookup_name(song_file_stem(song), qualities)
+        if entry is None:
+            self.library_misses += 1
+            metrics.CACHE_REQUESTS.inc(cache="library", result="miss")
+        else:
+            self.library_hits += 1
+            metrics.CACHE_REQUESTS.inc(cache="library", result="hit")
+            logger.info("曲库中已存在，跳过下载: %s -> %s", songmid, entry.path)
+        return entry
+
+    async def _sync_library(self) -> None:
+        """在后台线程中将新写入的清单行同步到曲库索引。"""
+
+        if self.library is None:
+            return
+        try:
+            await asyncio.to_thread(self.library.sync_manifest)
+        except (OSError, sqlite3.Error) as exc:
+            logger.warning("更新曲库索引失败: %s", exc)
+
+    async def _resolve_url(
+        self, songmid: str, media_mid: str, quality: int
+    ) -> tuple[int, str | None]:
+        """获取下载地址；启用音质降级时一次请求全部候选音质。"""
+
+        chain = quality_fallback_chain(quality)
+        if not self.config.quality_fallback or len(chain) < 2:
+            return quality, await self._api.get_song_url(songmid, media_mid, quality)
 
-        name = song.get("name", "未知歌曲")
-        singer = song.get("singer", "未知歌手")
-        filename = f"{name} - {singer}"
+        picked = await self._api.get_song_url_with_fallback(songmid, media_mid, chain)
+        if picked is None:
+            return quality, None
+        return picked
 
-        pause_events = [self.global_pause_event]
+    async def _fetch_lyrics(self, songmid: str) -> str | None:
+        try:
+            return await self._api.get_lyrics(songmid)
+        except Exception as exc:
+            logger.warning("预取歌词失败 %s: %s", songmid, exc)
+            return None
+
+    async def _transfer(
+        self,
+        resolved: _ResolvedSong,
+        quality: int,
+        *,
+        handle: DownloadHandle,
+        progress_bar: object | None = None,
+        progress_label: object | None = None,
+        extra_pause_events: Sequence[asyncio.Event] | None = None,
+        with_lyrics: bool = True,
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> bool:
+        song = resolved.song
+        quality = resolved.quality or quality
+        filename = song_file_stem(song)
+
+        # 组合闸门已包含全局暂停，额外事件仅用于兼容旧调用方
+        pause_events = [handle.gate]
         if extra_pause_events:
             pause_events.extend(extra_pause_events)
 
         return await self._api.download_with_lyrics(
-            download_url,
+            resolved.url or "",
             filename,
             quality,
-            songmid,
+            resolved.songmid,
             progress_bar=progress_bar,
             progress_label=progress_label,
             pause_events=pause_events,
+            task_limiter=handle.task_limiter,
+            expected_size=expected_file_size(song, quality),
+            lyrics=resolved.lyrics,
+            with_lyrics=with_lyrics and not resolved.lyrics_prefetched,
+            on_progress=on_progress,
         )
+
+
+class _GlobalPauseEvent(asyncio.Event):
+    """全局暂停事件，状态变化时同步到各任务的闸门。"""
+
+    def __init__(self, on_change: Callable[[bool], None]) -> None:
+        super().__init__()
+        self._on_change = on_change
+
+    def set(self) -> None:
+        super().set()
+        self._on_change(False)
+
+    def clear(self) -> None:
+        super().clear()
+        self._on_change(True)
+
+
+def _cancelled(song: SongRecord) -> DownloadResult:
+    return DownloadResult(song=song, success=False, error="已取消", cancelled=True)
+
+
+def _outcome(result: DownloadResult) -> str:
+    """指标中使用的结果分类。"""
+
+    if result.skipped:
+        return "skipped"
+    if result.success:
+        return "succeeded"
+    return "cancelled" if result.cancelled else "failed"
+
+
+@dataclass(slots=True)
+class _ResolvedSong:
+    """解析阶段的产物：下载地址、实际音质与可选的预取歌词。"""
+
+    song: SongRecord
+    songmid: str
+    url: str | None
+    quality: int = 0
+    lyrics: str | None = None
+    lyrics_prefetched: bool = False
+    local_path: str | None = None
@@ -0,0 +1,109 @@
+"""单个下载任务的控制句柄。"""
+
+from __future__ import annotations
+
+import asyncio
+
+from qqmusicdownloader.domain import DownloadResult, SongRecord
+from qqmusicdownloader.infrastructure import TokenBucket
+
+
+class DownloadHandle:
+    """提供暂停、恢复、取消与等待结果的任务句柄。
+
+    每个任务只有一个组合闸门 ``gate``：仅当任务自身与全局都未暂停时才处于
+    set 状态，下载循环每个数据块只需检查这一个事件。全局暂停由
+    ``DownloadService.pause_all``/``resume_all`` 同步到各个句柄。
+
+    ``host``、``bytes_done``、``bytes_total`` 与 ``started_at`` 由下载循环直接
+    写入，每个数据块只是两次属性赋值；速率与剩余时间由 ``TransferMonitor``
+    按固定频率采样计算。
+    """
+
+    def __init__(
+        self,
+        song: SongRecord,
+        *,
+        globally_paused: bool = False,
+        rate_limit: int | TokenBucket | None = None,
+    ) -> None:
+        self.song = song
+        self.gate = asyncio.Event()
+        self.task_limiter = (
+            rate_limit if isinstance(rate_limit, TokenBucket) else TokenBucket(rate_limit)
+        )
+        self.cancel_requested = False
+        self.host = ""
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.started_at: float | None = None
+        self._paused = False
+        self._globally_paused = globally_paused
+        self._task: asyncio.Task[DownloadResult] | None = None
+        self._result: asyncio.Future[DownloadResult] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self._sync_gate()
+
+    @property
+    def paused(self) -> bool:
+        """任务自身是否处于暂停状态（不含全局暂停）。"""
+
+        return self._paused
+
+    @property
+    def started(self) -> bool:
+        """任务是否已开始传输。"""
+
+        return self._task is not None
+
+    def pause(self) -> None:
+        """暂停该任务，其余任务不受影响。"""
+
+        self._paused = True
+        self._sync_gate()
+
+    def resume(self) -> None:
+        """恢复该任务；全局暂停期间仍保持等待。"""
+
+        self._paused = False
+        self._sync_gate()
+
+    def cancel(self) -> None:
+        """取消该任务；尚未开始的任务将被直接跳过。"""
+
+        self.cancel_requested = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def set_rate_limit(self, bytes_per_second: int | None) -> None:
+        """运行时调整该任务的限速。"""
+
+        self.task_limiter.set_rate(bytes_per_second)
+
+    def done(self) -> bool:
+        """任务是否已结束。"""
+
+        return self._result.done()
+
+    async def result(self) -> DownloadResult:
+        """等待任务结束并返回结果。"""
+
+        return await asyncio.shield(self._result)
+
+    def _set_globally_paused(self, paused: bool) -> None:
+        self._globally_paused = paused
+        self._sync_gate()
+
+    def _sync_gate(self) -> None:
+        if self._paused or self._globally_paused:
+            self.gate.clear()
+        else:
+            self.gate.set()
+
+    def _attach(self, task: asyncio.Task[DownloadResult]) -> None:
+        self._task = task
+
+    def _finish(self, result: DownloadResult) -> None:
+        if not self._result.done():
+            self._result.set_result(result)
@@ -0,0 +1,105 @@
+"""批量下载的任务排序策略。
+
+每个策略接收歌曲列表与音质，返回下载顺序（输入列表的下标排列），
+调度器据此派发任务，但结果仍按输入顺序返回。
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Callable, Sequence
+
+from qqmusicdownloader.domain import SongRecord, expected_file_size
+
+OrderingPolicy = Callable[[Sequence[SongRecord], int], list[int]]
+
+# 缺少文件大小时按时长估算，单位为字节/秒
+_ESTIMATED_BYTES_PER_SECOND = {
+    1: 12_000,
+    2: 40_000,
+    3: 110_000,
+}
+
+
+def estimated_size(song: SongRecord, quality: int) -> int:
+    """返回歌曲在指定音质下的文件大小，未知时按时长估算。"""
+
+    size = expected_file_size(song, quality)
+    if size:
+        return size
+    interval = song.get("interval") or 0
+    return int(interval) * _ESTIMATED_BYTES_PER_SECOND.get(quality, 12_000)
+
+
+def fifo(songs: Sequence[SongRecord], quality: int) -> list[int]:
+    """保持输入顺序。"""
+
+    return list(range(len(songs)))
+
+
+def shortest_first(songs: Sequence[SongRecord], quality: int) -> list[int]:
+    """小文件优先，让用户更快拿到可用结果。"""
+
+    return sorted(range(len(songs)), key=lambda i: estimated_size(songs[i], quality))
+
+
+def largest_first(songs: Sequence[SongRecord], quality: int) -> list[int]:
+    """大文件优先，尽早占满带宽并缩短整体完成时间。"""
+
+    return sorted(
+        range(len(songs)), key=lambda i: estimated_size(songs[i], quality), reverse=True
+    )
+
+
+def round_robin_by_artist(songs: Sequence[SongRecord], quality: int) -> list[int]:
+    """按歌手轮转派发，避免同一歌手的歌曲扎堆。"""
+
+    buckets: OrderedDict[str, list[int]] = OrderedDict()
+    for index, song in enumerate(songs):
+        buckets.setdefault(song.get("singer", ""), []).append(index)
+
+    order: list[int] = []
+    queues = list(buckets.values())
+    while queues:
+        for queue in queues:
+            order.append(queue.pop(0))
+        queues = [queue for queue in queues if queue]
+    return order
+
+
+def mixed_packing(songs: Sequence[SongRecord], quality: int) -> list[int]:
+    """大小文件交替派发，使并发槽位同时承载长短任务、连接保持饱和。"""
+
+    ranked = largest_first(songs, quality)
+    order: list[int] = []
+    low, high = 0, len(ranked) - 1
+    while low <= high:
+        order.append(ranked[low])
+        if low != high:
+            order.append(ranked[high])
+        low += 1
+        high -= 1
+    return order
+
+
+ORDERING_POLICIES: dict[str, OrderingPolicy] = {
+    "fifo": fifo,
+    "shortest": shortest_first,
+    "largest": largest_first,
+    "artist": round_robin_by_artist,
+    "mixed": mixed_packing,
+}
+
+
+def resolve_ordering(policy: str | OrderingPolicy | None) -> OrderingPolicy:
+    """根据名称或可调用对象获取排序策略。"""
+
+    if policy is None:
+        return fifo
+    if callable(policy):
+        return policy
+    try:
+        return ORDERING_POLICIES[policy]
+    except KeyError:
+        choices = "、".join(ORDERING_POLICIES)
+        raise ValueError(f"未知的排序策略: {policy}（可选: {choices}）") from None
@@ -0,0 +1,188 @@
+"""将下载句柄的进度合并为快照，供界面按固定帧率刷新。"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable
+
+from qqmusicdownloader.domain import BatchProgress
+
+if TYPE_CHECKING:
+    from qqmusicdownloader.services.download_service import DownloadService
+    from qqmusicdownloader.services.handles import DownloadHandle
+
+
+@dataclass(slots=True)
+class TransferStat:
+    """单个进行中传输的快照。"""
+
+    name: str
+    host: str
+    bytes_done: int
+    bytes_total: int
+    rate: float
+    eta: float | None
+    paused: bool = False
+    stalled: bool = False
+
+    @property
+    def fraction(self) -> float | None:
+        """已完成比例，总大小未知时为 ``None``。"""
+
+        if self.bytes_total <= 0:
+            return None
+        return min(1.0, self.bytes_done / self.bytes_total)
+
+
+@dataclass(slots=True)
+class DashboardSnapshot:
+    """某一时刻的全部传输状态与汇总指标；``rate`` 单位为字节/秒。"""
+
+    transfers: tuple[TransferStat, ...] = ()
+    rate: float = 0.0
+    queued: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    bytes_downloaded: int = 0
+
+    @property
+    def active(self) -> int:
+        return len(self.transfers)
+
+
+@dataclass(slots=True)
+class _Sample:
+    bytes_done: int
+    at: float
+    rate: float
+    moved_at: float
+
+
+class TransferMonitor:
+    """按需采样 ``DownloadService`` 的传输状态。
+
+    下载循环只在句柄上记录已传输字节，不产生任何界面更新；调用方以固定
+    频率调用 ``sample``，由相邻两次采样的字节差计算速率，并做指数平滑以免
+    数字跳动。超过 ``stall_after`` 秒没有新数据且未暂停的传输标记为停滞。
+    汇总的成功、失败数与字节数跨批次累计（``run_jobs`` 会按音质拆分批次），
+    调用 ``reset`` 重新开始统计。
+    """
+
+    def __init__(
+        self,
+        service: "DownloadService",
+        *,
+        smoothing: float = 0.5,
+        stall_after: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._service = service
+        self.smoothing = smoothing
+        self.stall_after = stall_after
+        self._clock = clock
+        self._samples: dict["DownloadHandle", _Sample] = {}
+        self.reset()
+
+    def reset(self) -> None:
+        """清空历史采样与累计计数。"""
+
+        self._samples.clear()
+        # 重置前已存在的批次属于上一次统计，不计入汇总
+        self._stale = self._service.batch_progress
+        self._batch: BatchProgress | None = None
+        self._carried = BatchProgress(total=0)
+        self._last_bytes = 0
+        self._last_at: float | None = None
+        self._rate = 0.0
+
+    def sample(self) -> DashboardSnapshot:
+        """采集一帧快照。"""
+
+        now = self._clock()
+        transfers: list[TransferStat] = []
+        queued = 0
+        samples: dict["DownloadHandle", _Sample] = {}
+        for handle in self._service.active_handles():
+            if handle.started_at is None:
+                queued += 1
+                continue
+            sample = self._advance(self._samples.get(handle), handle, now)
+            samples[handle] = sample
+            transfers.append(self._describe(handle, sample, now))
+        self._samples = samples
+
+        progress = self._totals()
+        self._update_rate(progress.bytes_downloaded, now)
+        return DashboardSnapshot(
+            transfers=tuple(transfers),
+            rate=self._rate,
+            queued=queued,
+            succeeded=progress.succeeded,
+            failed=progress.failed,
+            bytes_downloaded=progress.bytes_downloaded,
+        )
+
+    def _advance(
+        self, previous: _Sample | None, handle: "DownloadHandle", now: float
+    ) -> _Sample:
+        done = handle.bytes_done
+        if previous is None:
+            started = handle.started_at if handle.started_at is not None else now
+            elapsed = now - started
+            rate = done / elapsed if elapsed > 0 else 0.0
+            return _Sample(done, now, rate, now if done else started)
+        elapsed = now - previous.at
+        if elapsed <= 0:
+            return previous
+        instant = (done - previous.bytes_done) / elapsed
+        rate = self.smoothing * instant + (1 - self.smoothing) * previous.rate
+        moved_at = now if done != previous.bytes_done else previous.moved_at
+        return _Sample(done, now, rate, moved_at)
+
+    def _describe(
+        self, handle: "DownloadHandle", sample: _Sample, now: float
+    ) -> TransferStat:
+        song = handle.song
+        paused = not handle.gate.is_set()
+        remaining = handle.bytes_total - handle.bytes_done
+        eta = remaining / sample.rate if sample.rate > 0 and remaining > 0 else None
+        return TransferStat(
+            name=f"{song.get('name', '未知歌曲')} - {song.get('singer', '未知歌手')}",
+            host=handle.host,
+            bytes_done=handle.bytes_done,
+            bytes_total=handle.bytes_total,
+            rate=sample.rate,
+            eta=eta,
+            paused=paused,
+            stalled=not paused and now - sample.moved_at >= self.stall_after,
+        )
+
+    def _totals(self) -> BatchProgress:
+        batch = self._service.batch_progress
+        if batch is self._stale:
+            batch = None
+        if batch is not self._batch:
+            if self._batch is not None:
+                self._carried.succeeded += self._batch.succeeded
+                self._carried.failed += self._batch.failed
+                self._carried.bytes_downloaded += self._batch.bytes_downloaded
+            self._batch = batch
+        totals = BatchProgress(
+            total=0,
+            succeeded=self._carried.succeeded,
+            failed=self._carried.failed,
+            bytes_downloaded=self._carried.bytes_downloaded,
+        )
+        if batch is not None:
+            totals.succeeded += batch.succeeded
+            totals.failed += batch.failed
+            totals.bytes_downloaded += batch.bytes_downloaded
+        return totals
+
+    def _update_rate(self, total_bytes: int, now: float) -> None:
+        if self._last_at is not None and now > self._last_at:
+            instant = max(0, total_bytes - self._last_bytes) / (now - self._last_at)
+            self._rate = self.smoothing * instant + (1 - self.smoothing) * self._rate
+        self._last_bytes = total_bytes
+        self._last_at = now
@@ -7,14 +7,25 @@ import asyncio
 import logging
 import re
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from textual.app import App, ComposeResult
 from textual.containers import Vertical
+from textual.timer import Timer
 from textual.widgets import Footer, Header
+from textual.worker import Worker
 
+from qqmusicdownloader.cli import configure_logging
 from qqmusicdownloader.domain import SongRecord
-from qqmusicdownloader.services import DownloadService
+from qqmusicdownloader.infrastructure import LoopLagMonitor
+from qqmusicdownloader.services import DownloadService, TransferMonitor
+from qqmusicdownloader.ui.diagnostics import DiagnosticsScreen
+from qqmusicdownloader.ui.messages import (
+    DownloadFinished,
+    DownloadStarted,
+    SongFinished,
+    SongStarted,
+)
 from qqmusicdownloader.ui.widgets import (
     ActionsPanel,
     CookiePanel,
@@ -24,10 +35,6 @@ from qqmusicdownloader.ui.widgets import (
     StatusPanel,
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
 LOGGER = logging.getLogger(__name__)
 
 QUALITY_OPTIONS = [
@@ -36,6 +43,9 @@ QUALITY_OPTIONS = [
     ("FLAC (无损)", "3"),
 ]
 
+# 仪表盘刷新帧率：下载循环不直接触发界面更新，由定时器按此频率采样
+DASHBOARD_FPS = 4
+
 
 class QQMusicApp(App[None]):
     """Textual 终端界面应用。"""
@@ -45,6 +55,8 @@ class QQMusicApp(App[None]):
     BINDINGS = [
         ("ctrl+c", "quit", "退出"),
         ("ctrl+q", "quit", "退出"),
+        ("r", "resume_jobs", "继续未完成任务"),
+        ("d", "toggle_diagnostics", "性能诊断"),
     ]
 
     def __init__(self) -> None:
@@ -52,8 +64,20 @@ class QQMusicApp(App[None]):
         self.service: Optional[DownloadService] = None
         self.current_songs: list[SongRecord] = []
         self.is_downloading = False
+        self._cancel_event = asyncio.Event()
         self._download_path = Path.home() / "Desktop" / "QQMusic"
         self._path_overridden = False
+        self._bandwidth_limit: int | None = None
+        self._library_scan: asyncio.Task[int] | None = None
+        self._download_total = 0
+        self._download_finished: set[str] = set()
+        self._monitor: TransferMonitor | None = None
+        self._dashboard_timer: Timer | None = None
+        self._search_generation = 0
+        self._search_keyword = ""
+        self._search_worker: Worker[None] | None = None
+        self._loop_lag = LoopLagMonitor()
+        self._loop_lag_task: asyncio.Task[None] | None = None
         self._unicode_pattern = re.compile(r"\\u[0-9a-fA-F]{4}")
 
         self.cookie_panel = CookiePanel()
@@ -79,6 +103,12 @@ class QQMusicApp(App[None]):
     async def on_mount(self) -> None:
         self.actions_panel.reset_quality("1")
         self._ensure_download_dirs(self._download_path)
+        # 常驻的轻量采样，诊断界面打开前的卡顿也能被记录下来
+        self._loop_lag_task = asyncio.create_task(self._loop_lag.run())
+
+    async def on_unmount(self) -> None:
+        if self._loop_lag_task is not None:
+            self._loop_lag_task.cancel()
 
     async def on_cookie_panel_save_requested(
         self, message: CookiePanel.SaveRequested
@@ -93,7 +123,22 @@ class QQMusicApp(App[None]):
     async def on_search_panel_search_requested(
         self, message: SearchPanel.SearchRequested
     ) -> None:
-        await self._search_songs(message.keyword)
+        keyword = message.keyword.strip()
+        if message.incremental and not (self.service and keyword):
+            return
+        running = self._search_worker is not None and self._search_worker.is_running
+        if keyword == self._search_keyword and (message.incremental or running):
+            # 同一关键词的搜索正在进行，或自动搜索已展示过该关键词的结果
+            return
+        self._search_keyword = keyword
+        # 分页结果在后台逐页追加；新的搜索会取消尚未完成的旧搜索，
+        # 旧搜索尚未发出的加解密与网络请求随之放弃
+        self._search_worker = self.run_worker(
+            self._search_songs(keyword),
+            name="search",
+            group="search",
+            exclusive=True,
+        )
 
     async def on_actions_panel_start_requested(
         self, _: ActionsPanel.StartRequested
@@ -105,6 +150,18 @@ class QQMusicApp(App[None]):
     ) -> None:
         await self._toggle_pause()
 
+    async def on_actions_panel_cancel_requested(
+        self, _: ActionsPanel.CancelRequested
+    ) -> None:
+        if self.is_downloading:
+            self._cancel_event.set()
+            self.set_status("正在取消下载...")
+
+    async def on_actions_panel_rate_limit_changed(
+        self, message: ActionsPanel.RateLimitChanged
+    ) -> None:
+        self._apply_bandwidth_limit(message.bytes_per_second)
+
     def normalize_text(self, text: str) -> str:
         if not isinstance(text, str):
             return str(text)
@@ -133,6 +190,21 @@ class QQMusicApp(App[None]):
         if self.service is not None:
             self.service.set_download_path(resolved)
             LOGGER.info("下载目录更新为: %s", resolved)
+            self._open_stores(self.service)
+
+    def _open_stores(self, service: DownloadService) -> None:
+        """打开当前下载目录下的任务队列与曲库索引，目录变化后重新打开。"""
+
+        try:
+            service.open_job_store()
+        except Exception:  # pragma: no cover - 磁盘异常
+            LOGGER.exception("打开任务队列失败")
+        try:
+            service.open_library()
+        except Exception:  # pragma: no cover - 磁盘异常
+            LOGGER.exception("打开曲库索引失败")
+            return
+        self._library_scan = asyncio.create_task(service.scan_library())
 
     async def _save_cookie(self, cookie: str) -> None:
         cookie = cookie.strip()
@@ -150,11 +222,17 @@ class QQMusicApp(App[None]):
                 return
 
             self.service = service
+            if self._bandwidth_limit is not None:
+                service.set_bandwidth_limit(self._bandwidth_limit)
             if not self._path_overridden:
                 self._download_path = Path(service.get_download_path())
             self._ensure_download_dirs(self._download_path)
             self.actions_panel.enable_start(True)
-            self.set_status("✅ Cookie 验证成功")
+            pending = service.pending_job_count()
+            if pending:
+                self.set_status(f"✅ Cookie 验证成功，发现 {pending} 个未完成任务，按 R 继续")
+            else:
+                self.set_status("✅ Cookie 验证成功")
         except Exception as exc:  # pragma: no cover - 兜底保护
             LOGGER.exception("保存 Cookie 失败")
             self.service = None
@@ -166,6 +244,10 @@ class QQMusicApp(App[None]):
         if not candidate:
             self.set_status("请输入有效的下载目录")
             return
+        if self.is_downloading:
+            # 任务队列与曲库随目录切换，进行中的批次仍在使用旧的数据库
+            self.set_status("下载进行中，请结束后再更改目录")
+            return
         candidate_path = Path(candidate)
         try:
             self._ensure_download_dirs(candidate_path)
@@ -175,6 +257,18 @@ class QQMusicApp(App[None]):
             LOGGER.exception("创建目录失败")
             self.set_status(f"❌ 无法创建目录: {exc}")
 
+    def _apply_bandwidth_limit(self, limit: int | None) -> None:
+        if limit == self._bandwidth_limit:
+            return
+        self._bandwidth_limit = limit
+        service = self.service
+        if service is not None:
+            service.set_bandwidth_limit(limit)
+        if limit:
+            self.set_status(f"全局限速: {limit // 1024} KB/s")
+        else:
+            self.set_status("已取消限速")
+
     async def _search_songs(self, keyword: str) -> None:
         service = self.service
         if not service:
@@ -186,31 +280,42 @@ class QQMusicApp(App[None]):
             self.set_status("请输入搜索关键词")
             return
 
+        # 每次搜索递增代号，只有最新一代的结果会被渲染
+        self._search_generation += 1
+        generation = self._search_generation
         self.set_status(f"正在搜索: {keyword}...")
+        self.current_songs = []
+        self.results_panel.clear()
         try:
-            songs = await service.search(keyword)
+            async for page in service.iter_search(keyword):
+                if generation != self._search_generation:
+                    return
+                start = len(self.current_songs)
+                self.current_songs.extend(page)
+                self.results_panel.append_rows(
+                    self._song_label(start + offset, song)
+                    for offset, song in enumerate(page)
+                )
+                self.set_status(f"已加载 {len(self.current_songs)} 首，继续搜索...")
         except Exception as exc:  # pragma: no cover - 网络异常
             LOGGER.exception("搜索失败")
-            self.set_status(f"搜索失败: {exc}")
+            if generation == self._search_generation:
+                self.set_status(f"搜索失败: {exc}")
             return
 
-        if not songs:
-            self.current_songs = []
-            self.results_panel.clear()
+        if generation != self._search_generation:
+            return
+        if not self.current_songs:
             self.set_status("未找到相关歌曲")
             return
-
-        self.current_songs = songs[:20]
-        options: list[tuple[str, int]] = []
-        for index, song in enumerate(self.current_songs):
-            name = self.normalize_text(song.get("name", "未知歌曲"))
-            singer = self.normalize_text(song.get("singer", "未知歌手"))
-            album = self.normalize_text(song.get("album", "未知专辑"))
-            label = f"{index + 1}. {name} - {singer} ({album})"
-            options.append((label, index))
-        self.results_panel.set_options(options)
         self.set_status(f"找到 {len(self.current_songs)} 首歌曲")
 
+    def _song_label(self, index: int, song: SongRecord) -> str:
+        name = self.normalize_text(song.get("name", "未知歌曲"))
+        singer = self.normalize_text(song.get("singer", "未知歌手"))
+        album = self.normalize_text(song.get("album", "未知专辑"))
+        return f"{index + 1}. {name} - {singer} ({album})"
+
     async def _start_download(self) -> None:
         if self.is_downloading:
             self.set_status("已有下载任务进行中")
@@ -228,65 +333,180 @@ class QQMusicApp(App[None]):
 
         quality = self.actions_panel.get_quality()
 
+        songs: list[SongRecord] = []
+        for idx in indices:
+            if idx >= len(self.current_songs):
+                LOGGER.warning("歌曲索引越界: %s", idx)
+                continue
+            songs.append(self.current_songs[idx])
+
+        try:
+            job_ids = service.enqueue_jobs(songs, quality)
+        except Exception as exc:  # pragma: no cover - 磁盘异常
+            LOGGER.exception("写入任务队列失败")
+            self.set_status(f"❌ 无法写入任务队列: {exc}")
+            return
+
+        # 同一歌曲可能已在其他批次中运行，进度只统计本次真正待处理的任务
+        total = service.pending_job_count(job_ids)
+        if not total:
+            self.set_status("所选歌曲已在下载队列中")
+            return
+
+        self._run_jobs(service, job_ids, total)
+
+    def action_toggle_diagnostics(self) -> None:
+        """打开或关闭性能诊断界面。"""
+
+        if isinstance(self.screen, DiagnosticsScreen):
+            self.screen.dismiss()
+        else:
+            self.push_screen(DiagnosticsScreen(self._collect_diagnostics))
+
+    def _collect_diagnostics(self) -> dict[str, Any]:
+        report: dict[str, Any] = {"loop_lag": self._loop_lag.snapshot()}
+        service = self.service
+        if service is not None:
+            report.update(service.diagnostics())
+        # 当前速率取自仪表盘最近一帧，避免额外采样干扰速率计算
+        host_rates: dict[str, float] = {}
+        for stat in self.status_panel.dashboard.snapshot.transfers:
+            host_rates[stat.host] = host_rates.get(stat.host, 0.0) + stat.rate
+        report["host_rates"] = host_rates
+        return report
+
+    async def action_resume_jobs(self) -> None:
+        """继续执行上次未完成的持久化任务。"""
+
+        if self.is_downloading:
+            self.set_status("已有下载任务进行中")
+            return
+
+        service = self.service
+        if not service:
+            self.set_status("请先配置 Cookie")
+            return
+
+        total = service.pending_job_count()
+        if not total:
+            self.set_status("没有未完成的任务")
+            return
+
+        self._run_jobs(service, None, total)
+
+    def _run_jobs(
+        self, service: DownloadService, job_ids: list[int] | None, total: int
+    ) -> None:
+        """在后台 worker 中执行任务，进度通过消息回报，界面始终保持响应。"""
+
         self.is_downloading = True
+        self._cancel_event = asyncio.Event()
+        self._download_total = total
+        self._download_finished = set()
         self.actions_panel.enable_start(False)
         self.actions_panel.enable_pause(True)
-
-        total = len(indices)
+        self.actions_panel.enable_cancel(True)
         self.status_panel.set_progress(total, 0)
+        # 在 worker 启动前创建，确保本次批次的进度计入汇总
+        self._monitor = TransferMonitor(service)
+        if self._dashboard_timer is not None:
+            self._dashboard_timer.stop()
+        self._dashboard_timer = self.set_interval(
+            1 / DASHBOARD_FPS, self._refresh_dashboard
+        )
+        self.run_worker(
+            self._download_worker(service, job_ids, total),
+            name="download",
+            group="download",
+            exclusive=True,
+        )
 
+    async def _download_worker(
+        self, service: DownloadService, job_ids: list[int] | None, total: int
+    ) -> None:
+        self.post_message(DownloadStarted(total))
         try:
-            for position, idx in enumerate(indices, start=1):
-                if idx >= len(self.current_songs):
-                    LOGGER.warning("歌曲索引越界: %s", idx)
-                    continue
-                song = self.current_songs[idx]
-                song_name = self.normalize_text(song.get("name", "未知歌曲"))
-                singer = self.normalize_text(song.get("singer", "未知歌手"))
-                self.set_status(f"下载中 ({position}/{total}): {song_name} - {singer}")
-                success = await self._download_song(song, quality)
-                if not success:
-                    self.set_status(f"❌ 下载失败: {song_name} - {singer}")
-                    break
-                self.status_panel.set_progress(total, position)
-            else:
-                self.set_status(f"✅ 已完成 {total} 首歌曲下载")
+            results = await service.run_jobs(
+                job_ids,
+                cancel_event=self._cancel_event,
+                on_song_start=lambda _, song: self.post_message(SongStarted(song)),
+                on_song_done=lambda _, song, result: self.post_message(
+                    SongFinished(song, result)
+                ),
+            )
         except Exception as exc:  # pragma: no cover - 极端异常
             LOGGER.exception("下载任务失败")
-            self.set_status(f"❌ 下载失败: {exc}")
-        finally:
-            self.is_downloading = False
-            self.actions_panel.enable_pause(False)
-            self.actions_panel.enable_start(True)
-            await asyncio.sleep(1)
-            self.status_panel.set_progress(0, 0)
+            self.post_message(DownloadFinished([], error=str(exc)))
+            return
+        self.post_message(
+            DownloadFinished(results, cancelled=self._cancel_event.is_set())
+        )
 
-    async def _download_song(self, song: SongRecord, quality: int) -> bool:
-        service = self.service
-        if service is None:
-            return False
+    def _refresh_dashboard(self) -> None:
+        if self._monitor is not None:
+            self.status_panel.show_dashboard(self._monitor.sample())
 
-        try:
-            return await service.download_song(song, quality)
-        except ValueError as exc:
-            LOGGER.error("歌曲信息不完整: %s", exc)
-            return False
-        except Exception:  # pragma: no cover - 外部依赖
-            LOGGER.exception("下载失败: %s", song)
-            return False
+    def _describe(self, song: SongRecord) -> str:
+        song_name = self.normalize_text(song.get("name", "未知歌曲"))
+        singer = self.normalize_text(song.get("singer", "未知歌手"))
+        return f"{song_name} - {singer}"
+
+    def on_download_started(self, message: DownloadStarted) -> None:
+        self.set_status(f"开始下载 {message.total} 首歌曲")
+
+    def on_song_started(self, message: SongStarted) -> None:
+        position = len(self._download_finished) + 1
+        self.set_status(
+            f"下载中 ({position}/{self._download_total}): {self._describe(message.song)}"
+        )
+
+    def on_song_finished(self, message: SongFinished) -> None:
+        if message.result.cancelled:
+            return
+        self._download_finished.add(message.song.get("songmid", ""))
+        if not message.result.success:
+            self.set_status(f"❌ 下载失败: {self._describe(message.song)}")
+        total = self._download_total
+        self.status_panel.set_progress(total, min(total, len(self._download_finished)))
+
+    def on_download_finished(self, message: DownloadFinished) -> None:
+        results = message.results
+        if message.error:
+            self.set_status(f"❌ 下载失败: {message.error}")
+        elif message.cancelled:
+            cancelled = sum(1 for result in results if result.cancelled)
+            self.set_status(f"⏹ 已取消，未完成任务已保存 ({cancelled} 首)，按 R 继续")
+        else:
+            failed = [self._describe(result.song) for result in results if not result.success]
+            if failed:
+                self.set_status(
+                    f"⚠️ 已完成 {len(results) - len(failed)}/{len(results)} 首，"
+                    f"失败: {'、'.join(failed)}"
+                )
+            else:
+                self.set_status(f"✅ 已完成 {len(results)} 首歌曲下载")
+
+        if self._dashboard_timer is not None:
+            self._dashboard_timer.stop()
+            self._dashboard_timer = None
+        self._refresh_dashboard()
+        self.is_downloading = False
+        self.actions_panel.enable_pause(False)
+        self.actions_panel.enable_cancel(False)
+        self.actions_panel.enable_start(True)
+        self.set_timer(1, lambda: self.status_panel.set_progress(0, 0))
 
     async def _toggle_pause(self) -> None:
         service = self.service
         if not service:
             return
 
-        pause_event = service.global_pause_event
-        if pause_event.is_set():
-            pause_event.clear()
-            self.set_status("⏸ 已暂停")
-        else:
-            pause_event.set()
+        if service.is_paused:
+            service.resume_all()
             self.set_status("▶ 已恢复")
+        else:
+            service.pause_all()
+            self.set_status("⏸ 已暂停")
 
     def action_quit(self) -> None:
         self.exit()
@@ -299,6 +519,7 @@ def main() -> QQMusicApp:
         QQMusicApp: Textual 应用实例。
     """
 
+    configure_logging()
     app = QQMusicApp()
     app.run()
     return app
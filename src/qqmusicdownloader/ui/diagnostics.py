@@ -0,0 +1,153 @@
+"""性能诊断界面：展示加解密桥接、HTTP 连接、缓存与事件循环等运行指标。"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Mapping
+
+from rich.text import Text
+from textual.app import ComposeResult
+from textual.containers import Vertical
+from textual.screen import ModalScreen
+from textual.widgets import Label, Static
+
+from qqmusicdownloader.ui.widgets.transfer_dashboard import format_rate
+
+
+def _latency(stats: Mapping[str, float]) -> str:
+    return (
+        f"p50 {stats.get('p50', 0):.1f}ms  p95 {stats.get('p95', 0):.1f}ms  "
+        f"p99 {stats.get('p99', 0):.1f}ms  最大 {stats.get('max', 0):.1f}ms"
+    )
+
+
+def _ratio(hits: int, misses: int) -> str:
+    total = hits + misses
+    if not total:
+        return "暂无请求"
+    return f"{hits / total:.0%} ({hits}/{total})"
+
+
+def _connections(stats: Mapping[str, int]) -> str:
+    if not stats:
+        return "暂无数据"
+    return (
+        f"进行中 {stats.get('in_flight', 0)}  峰值 {stats.get('peak', 0)}  "
+        f"请求 {stats.get('requests', 0)}  失败 {stats.get('failures', 0)}"
+    )
+
+
+def _size(num_bytes: int) -> str:
+    return f"{num_bytes / (1024 * 1024):.1f} MB"
+
+
+def render_diagnostics(report: Mapping[str, Any]) -> Text:
+    """将诊断数据渲染为分节文本，缺失的部分显示为暂无数据。"""
+
+    text = Text()
+
+    def section(title: str) -> None:
+        if text:
+            text.append("\n")
+        text.append(f"{title}\n", style="bold")
+
+    section("加解密桥接")
+    bridge = report.get("bridge")
+    if bridge:
+        latency = bridge.get("latency", {})
+        text.append(
+            f"  排队 {bridge.get('waiting', 0)}  执行中 {'是' if bridge.get('busy') else '否'}  "
+            f"调用 {latency.get('count', 0)}  错误 {bridge.get('errors', 0)}\n"
+        )
+        text.append(f"  往返 {_latency(latency)}\n")
+        text.append(f"  排队等待 {_latency(bridge.get('wait', {}))}\n")
+    else:
+        text.append("  暂无数据（尚未配置 Cookie）\n")
+
+    section("事件循环延迟")
+    text.append(f"  {_latency(report.get('loop_lag', {}))}\n")
+
+    section("HTTP 连接")
+    text.append(f"  接口 {_connections(report.get('api_http', {}))}\n")
+    text.append(f"  CDN  {_connections(report.get('cdn_http', {}))}\n")
+
+    section("缓存命中")
+    search = report.get("search_cache", {})
+    library = report.get("library", {})
+    text.append(
+        f"  搜索 {_ratio(search.get('hits', 0), search.get('misses', 0))}  "
+        f"已缓存 {search.get('size', 0)}/{search.get('capacity', 0)} 页\n"
+    )
+    text.append(
+        f"  曲库 {_ratio(library.get('hits', 0), library.get('misses', 0))}  "
+        f"索引 {library.get('entries', 0)} 首\n"
+    )
+
+    section("CDN 主机吞吐")
+    hosts: Mapping[str, int] = report.get("hosts", {})
+    rates: Mapping[str, float] = report.get("host_rates", {})
+    if hosts or rates:
+        for host in sorted(set(hosts) | set(rates), key=lambda name: -hosts.get(name, 0)):
+            text.append(
+                f"  {host or '-'}  当前 {format_rate(rates.get(host, 0.0))}  "
+                f"累计 {_size(hosts.get(host, 0))}\n"
+            )
+    else:
+        text.append("  暂无下载\n")
+
+    accounts = report.get("accounts") or []
+    if accounts:
+        section("账号池")
+        for account in accounts:
+            text.append(
+                f"  {account['name']}  {account['state']}  请求 {account['requests']}  "
+                f"限流 {account['rate_limited']}\n"
+            )
+    text.rstrip()
+    return text
+
+
+class DiagnosticsScreen(ModalScreen[None]):
+    """每秒刷新一次的诊断浮层。"""
+
+    BINDINGS = [
+        ("escape", "dismiss", "关闭"),
+        ("d", "dismiss", "关闭"),
+    ]
+
+    DEFAULT_CSS = """
+    DiagnosticsScreen {
+        align: center middle;
+    }
+
+    #diagnostics {
+        width: 90%;
+        height: auto;
+        max-height: 90%;
+        border: solid $accent;
+        background: $surface;
+        padding: 1 2;
+    }
+    """
+
+    def __init__(
+        self, collect: Callable[[], Mapping[str, Any]], *, interval: float = 1.0
+    ) -> None:
+        super().__init__()
+        self._collect = collect
+        self._interval = interval
+        self._body = Static(id="diagnostics-body")
+
+    def compose(self) -> ComposeResult:
+        yield Vertical(
+            Label("性能诊断", classes="section-title"),
+            self._body,
+            Label("按 D 或 Esc 关闭", classes="hint"),
+            id="diagnostics",
+        )
+
+    def on_mount(self) -> None:
+        self.refresh_report()
+        self.set_interval(self._interval, self.refresh_report)
+
+    def refresh_report(self) -> None:
+        self._body.update(render_diagnostics(self._collect()))
@@ -0,0 +1,48 @@
+"""后台下载任务向界面回报状态所用的消息。"""
+
+from __future__ import annotations
+
+from textual.message import Message
+
+from qqmusicdownloader.domain import DownloadResult, SongRecord
+
+
+class DownloadStarted(Message):
+    """批量下载开始。"""
+
+    def __init__(self, total: int) -> None:
+        super().__init__()
+        self.total = total
+
+
+class SongStarted(Message):
+    """单首歌曲开始下载。"""
+
+    def __init__(self, song: SongRecord) -> None:
+        super().__init__()
+        self.song = song
+
+
+class SongFinished(Message):
+    """单首歌曲下载结束（成功、失败或取消）。"""
+
+    def __init__(self, song: SongRecord, result: DownloadResult) -> None:
+        super().__init__()
+        self.song = song
+        self.result = result
+
+
+class DownloadFinished(Message):
+    """批量下载结束；``error`` 非空表示任务异常中止。"""
+
+    def __init__(
+        self,
+        results: list[DownloadResult],
+        *,
+        cancelled: bool = False,
+        error: str = "",
+    ) -> None:
+        super().__init__()
+        self.results = results
+        self.cancelled = cancelled
+        self.error = error
@@ -5,7 +5,9 @@ from .cookie_panel import CookiePanel
 from .path_panel import PathPanel
 from .results_panel import ResultsPanel
 from .search_panel import SearchPanel
+from .song_list import SongList
 from .status_panel import StatusPanel
+from .transfer_dashboard import TransferDashboard
 
 __all__ = [
     "ActionsPanel",
@@ -13,6 +15,8 @@ __all__ = [
     "PathPanel",
     "ResultsPanel",
     "SearchPanel",
+    "SongList",
     "StatusPanel",
+    "TransferDashboard",
 ]
 
@@ -17,16 +17,40 @@ class ActionsPanel(Container):
     class TogglePauseRequested(Message):
         """请求切换暂停状态。"""
 
+    class CancelRequested(Message):
+        """请求取消当前批量下载。"""
+
+    class RateLimitChanged(Message):
+        """请求调整全局限速。"""
+
+        def __init__(self, bytes_per_second: int | None) -> None:
+            super().__init__()
+            self.bytes_per_second = bytes_per_second
+
+    RATE_LIMIT_OPTIONS: Sequence[tuple[str, str]] = (
+        ("不限速", "0"),
+        ("512 KB/s", str(512 * 1024)),
+        ("1 MB/s", str(1024 * 1024)),
+        ("2 MB/s", str(2 * 1024 * 1024)),
+        ("5 MB/s", str(5 * 1024 * 1024)),
+    )
+
     def __init__(self, quality_options: Sequence[tuple[str, str]], default: str = "1") -> None:
         super().__init__(id="actions")
         self._quality = Select(quality_options, prompt="选择音质", id="quality", value=default)
+        self._rate_limit = Select(
+            self.RATE_LIMIT_OPTIONS, prompt="限速", id="rate-limit", value="0"
+        )
         self._start = Button("开始下载", id="start-download", disabled=True)
         self._toggle = Button("暂停/恢复", id="toggle-pause", disabled=True)
+        self._cancel = Button("取消下载", id="cancel-download", disabled=True)
 
     def compose(self) -> ComposeResult:
         yield self._quality
+        yield self._rate_limit
         yield self._start
         yield self._toggle
+        yield self._cancel
 
     def get_quality(self) -> int:
         """返回当前选择的音质编号。"""
@@ -41,12 +65,25 @@ class ActionsPanel(Container):
         except (TypeError, ValueError):
             return 1
 
+    def get_rate_limit(self) -> int | None:
+        """返回当前选择的限速（字节/秒），``None`` 表示不限速。"""
+
+        value = self._rate_limit.value
+        try:
+            limit = int(str(value))
+        except (TypeError, ValueError):
+            return None
+        return limit or None
+
     def enable_start(self, enabled: bool) -> None:
         self._start.disabled = not enabled
 
     def enable_pause(self, enabled: bool) -> None:
         self._toggle.disabled = not enabled
 
+    def enable_cancel(self, enabled: bool) -> None:
+        self._cancel.disabled = not enabled
+
     def reset_quality(self, value: str) -> None:
         self._quality.value = value
 
@@ -55,4 +92,9 @@ class ActionsPanel(Container):
             self.post_message(self.StartRequested())
         elif event.button is self._toggle:
             self.post_message(self.TogglePauseRequested())
+        elif event.button is self._cancel:
+            self.post_message(self.CancelRequested())
 
+    def on_select_changed(self, event: Select.Changed) -> None:
+        if event.select is self._rate_limit:
+            self.post_message(self.RateLimitChanged(self.get_rate_limit()))
@@ -4,7 +4,9 @@ from typing import Iterable, Sequence
 
 from textual.app import ComposeResult
 from textual.containers import Container
-from textual.widgets import Label, SelectionList
+from textual.widgets import Label
+
+from .song_list import SongList
 
 
 class ResultsPanel(Container):
@@ -12,7 +14,7 @@ class ResultsPanel(Container):
 
     def __init__(self) -> None:
         super().__init__(classes="section")
-        self._selection = SelectionList[int](id="results")
+        self._selection = SongList(id="results")
         self._label = Label("已选 0 首", id="selection-label")
 
     def compose(self) -> ComposeResult:
@@ -20,34 +22,37 @@ class ResultsPanel(Container):
         yield self._selection
         yield self._label
 
-    def set_options(self, options: Iterable[tuple[str, int]]) -> None:
-        """用搜索结果填充列表。"""
+    def set_rows(self, rows: Iterable[str]) -> None:
+        """用新的搜索结果替换列表。"""
+
+        self._selection.set_rows(rows)
+        self._update_selection_label()
+
+    def append_rows(self, rows: Iterable[str]) -> None:
+        """追加一页搜索结果，已有的选中状态保持不变。"""
 
-        self._selection.clear_options()
-        for label, value in options:
-            self._selection.add_option((label, value))
-        self._selection.refresh()
+        self._selection.append_rows(rows)
         self._update_selection_label()
 
     def clear(self) -> None:
         """清空搜索结果。"""
 
-        self._selection.clear_options()
-        self._selection.refresh()
+        self._selection.clear()
         self._update_selection_label()
 
     def selected_indices(self) -> Sequence[int]:
         """返回当前选中的歌曲索引。"""
 
-        return tuple(sorted(set(self._selection.selected)))
+        return tuple(self._selection.selected)
 
     def _update_selection_label(self) -> None:
         count = len(self._selection.selected)
-        self._label.update(f"已选 {count} 首")
-
-    def on_selection_list_selected_changed(
-        self, event: SelectionList.SelectedChanged
-    ) -> None:
-        if event.selection_list is self._selection:
+        total = self._selection.row_count
+        if total:
+            self._label.update(f"已选 {count} 首 / 共 {total} 首（空格选择，a 全选，Shift+方向键连选）")
+        else:
+            self._label.update(f"已选 {count} 首")
+
+    def on_song_list_selection_changed(self, event: SongList.SelectionChanged) -> None:
+        if event.song_list is self._selection:
             self._update_selection_label()
-
@@ -3,21 +3,30 @@ from __future__ import annotations
 from textual.app import ComposeResult
 from textual.containers import Container, Horizontal
 from textual.message import Message
+from textual.timer import Timer
 from textual.widgets import Button, Input, Label
 
 
 class SearchPanel(Container):
-    """歌曲搜索区域。"""
+    """歌曲搜索区域。
+
+    输入停顿 ``debounce`` 秒后自动发起搜索（至少 ``min_length`` 个字符），
+    回车或点击按钮立即搜索并取消尚未触发的自动搜索。
+    """
 
     class SearchRequested(Message):
-        """请求执行搜索。"""
+        """请求执行搜索；``incremental`` 表示由输入防抖自动触发。"""
 
-        def __init__(self, keyword: str) -> None:
+        def __init__(self, keyword: str, *, incremental: bool = False) -> None:
             super().__init__()
             self.keyword = keyword
+            self.incremental = incremental
 
-    def __init__(self) -> None:
+    def __init__(self, *, debounce: float = 0.35, min_length: int = 2) -> None:
         super().__init__(classes="section")
+        self.debounce = debounce
+        self.min_length = min_length
+        self._debounce_timer: Timer | None = None
         self._input = Input(
             placeholder="输入关键词后按回车或点击按钮",
             id="search-input",
@@ -46,5 +55,22 @@ class SearchPanel(Container):
         if event.input is self._input:
             self._emit_search_request()
 
-    def _emit_search_request(self) -> None:
-        self.post_message(self.SearchRequested(self.get_keyword()))
+    async def on_input_changed(self, event: Input.Changed) -> None:
+        if event.input is not self._input:
+            return
+        self._cancel_debounce()
+        if len(event.value.strip()) >= self.min_length:
+            self._debounce_timer = self.set_timer(
+                self.debounce, lambda: self._emit_search_request(incremental=True)
+            )
+
+    def _cancel_debounce(self) -> None:
+        if self._debounce_timer is not None:
+            self._debounce_timer.stop()
+            self._debounce_timer = None
+
+    def _emit_search_request(self, *, incremental: bool = False) -> None:
+        self._cancel_debounce()
+        self.post_message(
+            self.SearchRequested(self.get_keyword(), incremental=incremental)
+        )
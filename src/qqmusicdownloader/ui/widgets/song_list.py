@@ -0,0 +1,257 @@
+"""按需渲染可见行的多选歌曲列表。"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from rich.cells import cell_len
+from rich.segment import Segment
+from textual import events
+from textual.binding import Binding
+from textual.geometry import Size
+from textual.message import Message
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+_MARK_SELECTED = "[x] "
+_MARK_EMPTY = "[ ] "
+
+
+class SongList(ScrollView, can_focus=True):
+    """虚拟化的歌曲列表。
+
+    行文本保存在普通列表中，选中状态只记录行号集合；每次重绘只生成可见区域
+    内的行，追加上千条结果也不会创建额外组件或触发整体重排。
+    """
+
+    BINDINGS = [
+        Binding("up", "cursor_up", "上移", show=False),
+        Binding("down", "cursor_down", "下移", show=False),
+        Binding("shift+up", "extend_up", "向上扩选", show=False),
+        Binding("shift+down", "extend_down", "向下扩选", show=False),
+        Binding("pageup", "cursor_page_up", "上一页", show=False),
+        Binding("pagedown", "cursor_page_down", "下一页", show=False),
+        Binding("home", "cursor_first", "首行", show=False),
+        Binding("end", "cursor_last", "末行", show=False),
+        Binding("space,enter", "toggle", "选择"),
+        Binding("a", "toggle_all", "全选/全不选"),
+    ]
+
+    COMPONENT_CLASSES = {"song-list--cursor", "song-list--selected"}
+
+    DEFAULT_CSS = """
+    SongList {
+        height: 10;
+    }
+
+    SongList > .song-list--selected {
+        color: $success;
+        text-style: bold;
+    }
+
+    SongList > .song-list--cursor {
+        background: $boost;
+    }
+
+    SongList:focus > .song-list--cursor {
+        background: $accent 40%;
+    }
+    """
+
+    class SelectionChanged(Message):
+        """选中集合发生变化。"""
+
+        def __init__(self, song_list: "SongList") -> None:
+            super().__init__()
+            self.song_list = song_list
+
+        @property
+        def control(self) -> "SongList":
+            return self.song_list
+
+    def __init__(self, *, id: str | None = None, classes: str | None = None) -> None:
+        super().__init__(id=id, classes=classes)
+        self._rows: list[str] = []
+        self._selected: set[int] = set()
+        self._cursor = 0
+        self._anchor = 0
+        self._max_width = 0
+
+    @property
+    def row_count(self) -> int:
+        """当前行数。"""
+
+        return len(self._rows)
+
+    @property
+    def cursor(self) -> int:
+        """光标所在行号。"""
+
+        return self._cursor
+
+    @property
+    def selected(self) -> list[int]:
+        """按行号排序的选中行。"""
+
+        return sorted(self._selected)
+
+    # ---- 数据 ----
+
+    def set_rows(self, rows: Iterable[str]) -> None:
+        """替换全部行并清空选中状态。"""
+
+        self._rows = []
+        self._max_width = 0
+        self._cursor = self._anchor = 0
+        had_selection = bool(self._selected)
+        self._selected.clear()
+        self.scroll_to(0, 0, animate=False)
+        self.append_rows(rows)
+        if had_selection:
+            self._selection_changed()
+
+    def append_rows(self, rows: Iterable[str]) -> None:
+        """在末尾追加行，已有的选中状态与滚动位置保持不变。"""
+
+        start = len(self._rows)
+        self._rows.extend(rows)
+        for row in self._rows[start:]:
+            self._max_width = max(self._max_width, cell_len(row))
+        self.virtual_size = Size(self._max_width + len(_MARK_EMPTY), len(self._rows))
+        self.refresh()
+
+    def clear(self) -> None:
+        """清空列表。"""
+
+        self.set_rows(())
+
+    # ---- 选择 ----
+
+    def select(self, index: int) -> None:
+        if 0 <= index < len(self._rows) and index not in self._selected:
+            self._selected.add(index)
+            self._selection_changed()
+
+    def deselect(self, index: int) -> None:
+        if index in self._selected:
+            self._selected.discard(index)
+            self._selection_changed()
+
+    def toggle(self, index: int) -> None:
+        if index in self._selected:
+            self.deselect(index)
+        else:
+            self.select(index)
+
+    def select_range(self, start: int, end: int) -> None:
+        """选中 ``start`` 与 ``end`` 之间（含两端）的所有行。"""
+
+        if not self._rows:
+            return
+        low, high = sorted((start, end))
+        low = max(low, 0)
+        high = min(high, len(self._rows) - 1)
+        self._selected.update(range(low, high + 1))
+        self._selection_changed()
+
+    def select_all(self) -> None:
+        self._selected = set(range(len(self._rows)))
+        self._selection_changed()
+
+    def deselect_all(self) -> None:
+        self._selected.clear()
+        self._selection_changed()
+
+    def _selection_changed(self) -> None:
+        self.refresh()
+        self.post_message(self.SelectionChanged(self))
+
+    # ---- 光标 ----
+
+    def move_cursor(self, index: int, *, extend: bool = False) -> None:
+        """移动光标；``extend`` 为真时选中锚点到光标之间的所有行。"""
+
+        if not self._rows:
+            return
+        self._cursor = max(0, min(index, len(self._rows) - 1))
+        if extend:
+            self.select_range(self._anchor, self._cursor)
+        else:
+            self._anchor = self._cursor
+        self._scroll_to_cursor()
+        self.refresh()
+
+    def _scroll_to_cursor(self) -> None:
+        height = max(1, self.scrollable_content_region.height)
+        top = self.scroll_offset.y
+        if self._cursor < top:
+            self.scroll_to(y=self._cursor, animate=False)
+        elif self._cursor >= top + height:
+            self.scroll_to(y=self._cursor - height + 1, animate=False)
+
+    def action_cursor_up(self) -> None:
+        self.move_cursor(self._cursor - 1)
+
+    def action_cursor_down(self) -> None:
+        self.move_cursor(self._cursor + 1)
+
+    def action_extend_up(self) -> None:
+        self.move_cursor(self._cursor - 1, extend=True)
+
+    def action_extend_down(self) -> None:
+        self.move_cursor(self._cursor + 1, extend=True)
+
+    def action_cursor_page_up(self) -> None:
+        self.move_cursor(self._cursor - self.scrollable_content_region.height)
+
+    def action_cursor_page_down(self) -> None:
+        self.move_cursor(self._cursor + self.scrollable_content_region.height)
+
+    def action_cursor_first(self) -> None:
+        self.move_cursor(0)
+
+    def action_cursor_last(self) -> None:
+        self.move_cursor(len(self._rows) - 1)
+
+    def action_toggle(self) -> None:
+        if self._rows:
+            self._anchor = self._cursor
+            self.toggle(self._cursor)
+
+    def action_toggle_all(self) -> None:
+        if self._rows and len(self._selected) == len(self._rows):
+            self.deselect_all()
+        else:
+            self.select_all()
+
+    def on_click(self, event: events.Click) -> None:
+        offset = event.get_content_offset(self)
+        if offset is None:
+            return
+        index = self.scroll_offset.y + offset.y
+        if index >= len(self._rows):
+            return
+        if event.shift:
+            self.move_cursor(index, extend=True)
+        else:
+            self.move_cursor(index)
+            self.toggle(index)
+
+    # ---- 渲染 ----
+
+    def render_line(self, y: int) -> Strip:
+        scroll_x, scroll_y = self.scroll_offset
+        index = scroll_y + y
+        width = self.scrollable_content_region.width
+        style = self.rich_style
+        if index >= len(self._rows):
+            return Strip.blank(width, style)
+
+        selected = index in self._selected
+        if selected:
+            style += self.get_component_rich_style("song-list--selected")
+        if index == self._cursor:
+            style += self.get_component_rich_style("song-list--cursor")
+        mark = _MARK_SELECTED if selected else _MARK_EMPTY
+        strip = Strip([Segment(mark + self._rows[index], style)])
+        return strip.crop_extend(scroll_x, scroll_x + width, style)
@@ -4,6 +4,10 @@ from textual.app import ComposeResult
 from textual.containers import Container
 from textual.widgets import Label, ProgressBar
 
+from qqmusicdownloader.services.transfer_monitor import DashboardSnapshot
+
+from .transfer_dashboard import TransferDashboard
+
 
 class StatusPanel(Container):
     """展示下载进度与状态消息。"""
@@ -12,10 +16,12 @@ class StatusPanel(Container):
         super().__init__(id="status-block", classes="section")
         self._progress = ProgressBar(id="progress")
         self._label = Label("准备就绪", id="status-label")
+        self.dashboard = TransferDashboard(id="dashboard")
 
     def compose(self) -> ComposeResult:
         yield self._progress
         yield self._label
+        yield self.dashboard
 
     def set_status(self, message: str) -> None:
         self._label.update(message)
@@ -23,3 +29,5 @@ class StatusPanel(Container):
     def set_progress(self, total: int, progress: int) -> None:
         self._progress.update(total=total or None, progress=progress)
 
+    def show_dashboard(self, snapshot: DashboardSnapshot) -> None:
+        self.dashboard.show(snapshot)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from rich.cells import set_cell_size
+from rich.text import Text
+from textual.widgets import Static
+
+from qqmusicdownloader.services.transfer_monitor import DashboardSnapshot, TransferStat
+
+_NAME_WIDTH = 28
+_HOST_WIDTH = 20
+
+
+def format_rate(bytes_per_second: float) -> str:
+    """格式化传输速率。"""
+
+    if bytes_per_second >= 1024 * 1024:
+        return f"{bytes_per_second / (1024 * 1024):.2f} MB/s"
+    return f"{bytes_per_second / 1024:.0f} KB/s"
+
+
+def format_eta(seconds: float | None) -> str:
+    """格式化剩余时间，未知时显示 ``--:--``。"""
+
+    if seconds is None:
+        return "--:--"
+    minutes, secs = divmod(int(seconds + 0.5), 60)
+    if minutes >= 60:
+        return f"{minutes // 60}:{minutes % 60:02d}:{secs:02d}"
+    return f"{minutes:02d}:{secs:02d}"
+
+
+def render_dashboard(snapshot: DashboardSnapshot, *, max_rows: int = 8) -> Text:
+    """将快照渲染为汇总行加每个传输一行的紧凑文本。"""
+
+    text = Text()
+    text.append(f"总速率 {format_rate(snapshot.rate)}", style="bold")
+    text.append(
+        f"  进行中 {snapshot.active}  排队 {snapshot.queued}  完成 {snapshot.succeeded}  "
+    )
+    text.append(f"失败 {snapshot.failed}", style="bold red" if snapshot.failed else "")
+    # 停滞的传输排在最前，其余按速率从低到高，慢的传输一眼可见
+    transfers = sorted(snapshot.transfers, key=lambda stat: (not stat.stalled, stat.rate))
+    for stat in transfers[:max_rows]:
+        text.append("\n")
+        text.append_text(_render_row(stat))
+    hidden = len(transfers) - max_rows
+    if hidden > 0:
+        text.append(f"\n… 另有 {hidden} 个传输", style="dim")
+    return text
+
+
+def _render_row(stat: TransferStat) -> Text:
+    fraction = stat.fraction
+    percent = f"{fraction * 100:3.0f}%" if fraction is not None else "  ?%"
+    if stat.stalled:
+        state, style = "停滞", "bold red"
+    elif stat.paused:
+        state, style = "暂停", "yellow"
+    else:
+        state, style = format_eta(stat.eta), ""
+    return Text.assemble(
+        set_cell_size(stat.name, _NAME_WIDTH),
+        " ",
+        (set_cell_size(stat.host or "-", _HOST_WIDTH), "dim"),
+        f" {percent} {format_rate(stat.rate):>11} ",
+        (state, style),
+    )
+
+
+class TransferDashboard(Static):
+    """并发下载仪表盘：每个进行中的传输一行，附带汇总吞吐与队列状态。"""
+
+    DEFAULT_CSS = """
+    TransferDashboard {
+        height: auto;
+        max-height: 11;
+    }
+    """
+
+    def __init__(self, *, max_rows: int = 8, id: str | None = None) -> None:
+        super().__init__("", id=id)
+        self.max_rows = max_rows
+        self.snapshot = DashboardSnapshot()
+
+    def show(self, snapshot: DashboardSnapshot) -> None:
+        """显示一帧快照。"""
+
+        self.snapshot = snapshot
+        self.update(render_dashboard(snapshot, max_rows=self.max_rows))
+
+    def clear(self) -> None:
+        self.snapshot = DashboardSnapshot()
+        self.update("")
@@ -52,6 +52,11 @@ class StubDownloadAPI:
         progress_bar: object | None = None,
         progress_label: object | None = None,
         pause_events: Iterable[asyncio.Event] | None = None,
+        task_limiter: object | None = None,
+        expected_size: int = 0,
+        lyrics: str | None = None,
+        with_lyrics: bool = True,
+        on_progress: object | None = None,
     ) -> bool:
         self.download_requests.append((songmid, quality))
         # 确认暂停事件全部已 set
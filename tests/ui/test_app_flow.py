@@ -3,6 +3,7 @@ from pathlib import Path
 from typing import Any
 
 import pytest
+from qqmusicdownloader.domain import DownloadResult
 from qqmusicdownloader.services import DownloadService
 from qqmusicdownloader.ui.app import QQMusicApp
 
@@ -13,10 +14,24 @@ class FakeDownloadService:
         self.global_pause_event = asyncio.Event()
         self.global_pause_event.set()
         self.current_songs: list[dict[str, Any]] = []
+        self.batch_progress = None
         self.search_calls: list[str] = []
         self.download_calls: list[tuple[str, int]] = []
         self.set_path_calls: list[Path] = []
         self.validate_called = False
+        self.job_store_opened = False
+        self.store_paths: list[Path] = []
+        self.jobs: list[tuple[dict[str, Any], int]] = []
+
+    @property
+    def is_paused(self) -> bool:
+        return not self.global_pause_event.is_set()
+
+    def pause_all(self) -> None:
+        self.global_pause_event.clear()
+
+    def resume_all(self) -> None:
+        self.global_pause_event.set()
 
     async def validate_cookie(self) -> bool:
         self.validate_called = True
@@ -47,6 +62,9 @@ class FakeDownloadService:
         self.current_songs = songs
         return songs
 
+    async def iter_search(self, keyword: str, **_: Any):
+        yield await self.search(keyword)
+
     def get_download_path(self) -> str:
         return str(self._path)
 
@@ -58,6 +76,47 @@ class FakeDownloadService:
         self.download_calls.append((song["songmid"], quality))
         return True
 
+    def open_job_store(self, path: Path | None = None) -> None:
+        self.job_store_opened = True
+        self.store_paths.append(self._path)
+
+    def open_library(self, path: Path | None = None) -> None:
+        self.library_opened = True
+
+    async def scan_library(self) -> int:
+        return 0
+
+    def active_handles(self) -> list[Any]:
+        return []
+
+    def pending_job_count(self, job_ids: list[int] | None = None) -> int:
+        return len(self.jobs) if job_ids is None else len(job_ids)
+
+    def enqueue_jobs(self, songs: list[dict[str, Any]], quality: int) -> list[int]:
+        start = len(self.jobs)
+        self.jobs.extend((song, quality) for song in songs)
+        return list(range(start, len(self.jobs)))
+
+    async def run_jobs(
+        self,
+        job_ids: list[int] | None = None,
+        *,
+        on_song_start: Any = None,
+        on_song_done: Any = None,
+        **_: Any,
+    ) -> list[DownloadResult]:
+        results = []
+        for index in job_ids if job_ids is not None else range(len(self.jobs)):
+            song, quality = self.jobs[index]
+            if on_song_start:
+                on_song_start(index, song)
+            result = DownloadResult(song=song, success=await self.download_song(song, quality))
+            if on_song_done:
+                on_song_done(index, song, result)
+            results.append(result)
+        self.jobs = []
+        return results
+
 
 @pytest.mark.asyncio
 async def test_app_flow_save_search_and_download(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
@@ -72,6 +131,7 @@ async def test_app_flow_save_search_and_download(tmp_path: Path, monkeypatch: py
         await pilot.app._save_cookie("test_cookie")
 
         assert fake_service.validate_called is True
+        assert fake_service.job_store_opened is True
         assert fake_service.set_path_calls  # 路径被同步至服务层
         assert pilot.app.actions_panel._start.disabled is False
 
@@ -83,7 +143,66 @@ async def test_app_flow_save_search_and_download(tmp_path: Path, monkeypatch: py
         results_selection.select(0)
 
         await pilot.app._start_download()
+        # 下载在后台 worker 中执行，等待其结束并处理回报消息
+        await pilot.app.workers.wait_for_complete()
+        await pilot.pause()
         assert fake_service.download_calls == [("mid123", 1)]
 
         status_content = pilot.app.status_panel._label.render()
         assert "完成" in status_content.plain
+
+
+class SlowDownloadService(FakeDownloadService):
+    def __init__(self, base_dir: Path) -> None:
+        super().__init__(base_dir)
+        self.release = asyncio.Event()
+
+    async def download_song(self, song: dict[str, Any], quality: int, **_: Any) -> bool:
+        await self.release.wait()
+        return await super().download_song(song, quality)
+
+
+@pytest.mark.asyncio
+async def test_ui_stays_responsive_during_download(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    fake_service = SlowDownloadService(tmp_path)
+    monkeypatch.setattr(DownloadService, "from_cookie", classmethod(lambda cls, cookie: fake_service))
+
+    async with QQMusicApp().run_test() as pilot:
+        app = pilot.app
+        await app._save_cookie("test_cookie")
+        await app._search_songs("爱错")
+        app.results_panel._selection.select(0)
+
+        await app._start_download()
+        await pilot.pause()
+        assert app.is_downloading is True
+        assert app.actions_panel._start.disabled is True
+
+        # 下载进行中仍可继续搜索
+        await app._search_songs("晴天")
+        assert fake_service.search_calls == ["爱错", "晴天"]
+
+        fake_service.release.set()
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+        assert app.is_downloading is False
+        assert app.actions_panel._start.disabled is False
+        assert fake_service.download_calls == [("mid123", 1)]
+
+
+@pytest.mark.asyncio
+async def test_changing_path_reopens_job_store_and_library(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    fake_service = FakeDownloadService(tmp_path)
+    monkeypatch.setattr(
+        DownloadService, "from_cookie", classmethod(lambda cls, cookie: fake_service)
+    )
+
+    async with QQMusicApp().run_test() as pilot:
+        await pilot.app._save_cookie("test_cookie")
+        other = tmp_path / "other"
+        await pilot.app._apply_path(str(other))
+
+        assert fake_service.store_paths[-1] == other
+        assert len(fake_service.store_paths) >= 2
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import pytest
+
+from qqmusicdownloader.services import DownloadService
+from qqmusicdownloader.ui.app import QQMusicApp
+from qqmusicdownloader.ui.diagnostics import DiagnosticsScreen, render_diagnostics
+
+
+class DiagnosticsService:
+    def __init__(self, base_dir: Path) -> None:
+        self._path = base_dir
+
+    async def validate_cookie(self) -> bool:
+        return True
+
+    def get_download_path(self) -> str:
+        return str(self._path)
+
+    def set_download_path(self, base_dir: Path) -> None:
+        self._path = base_dir
+
+    def open_job_store(self, path: Path | None = None) -> None:
+        pass
+
+    def open_library(self, path: Path | None = None) -> None:
+        pass
+
+    async def scan_library(self) -> int:
+        return 0
+
+    def pending_job_count(self) -> int:
+        return 0
+
+    def diagnostics(self) -> dict:
+        return {
+            "api_http": {"in_flight": 1, "peak": 4, "requests": 20, "failures": 2},
+            "search_cache": {"hits": 3, "misses": 1, "size": 4, "capacity": 128},
+            "hosts": {"isure.stream.qqmusic.qq.com": 5 * 1024 * 1024},
+        }
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_screen_toggles_with_key(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    service = DiagnosticsService(tmp_path)
+    monkeypatch.setattr(DownloadService, "from_cookie", classmethod(lambda cls, cookie: service))
+
+    async with QQMusicApp().run_test() as pilot:
+        app = pilot.app
+        await app._save_cookie("test_cookie")
+        app.set_focus(None)
+
+        await pilot.press("d")
+        await pilot.pause()
+        assert isinstance(app.screen, DiagnosticsScreen)
+        body = app.screen.query_one("#diagnostics-body").render()
+        assert "进行中 1  峰值 4  请求 20  失败 2" in str(body)
+        assert "75% (3/4)" in str(body)
+
+        await pilot.press("d")
+        await pilot.pause()
+        assert not isinstance(app.screen, DiagnosticsScreen)
+
+
+@pytest.mark.asyncio
+async def test_typing_d_in_search_box_does_not_open_diagnostics() -> None:
+    async with QQMusicApp().run_test() as pilot:
+        app = pilot.app
+        app.search_panel._input.focus()
+        await pilot.press("d")
+        await pilot.pause()
+
+        assert app.search_panel._input.value == "d"
+        assert not isinstance(app.screen, DiagnosticsScreen)
+
+
+def test_render_diagnostics_handles_missing_sections() -> None:
+    text = render_diagnostics(
+        {
+            "loop_lag": {"count": 3, "p50": 0.5, "p95": 2.0, "p99": 2.0, "max": 2.0},
+            "hosts": {"cdn-a": 3 * 1024 * 1024},
+            "host_rates": {"cdn-a": 1024 * 1024, "cdn-b": 512 * 1024},
+        }
+    ).plain
+
+    assert "暂无数据（尚未配置 Cookie）" in text
+    assert "p95 2.0ms" in text
+    assert "cdn-a  当前 1.00 MB/s  累计 3.0 MB" in text
+    assert "cdn-b  当前 512 KB/s  累计 0.0 MB" in text
@@ -0,0 +1,84 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from qqmusicdownloader.ui.app import QQMusicApp
+
+
+class RecordingSearchService:
+    def __init__(self) -> None:
+        self.queries: list[str] = []
+        self.cancelled: list[str] = []
+        self.gates: dict[str, asyncio.Event] = {}
+
+    async def iter_search(self, keyword: str, **_: Any):
+        self.queries.append(keyword)
+        gate = self.gates.get(keyword)
+        try:
+            if gate is not None:
+                await gate.wait()
+        except asyncio.CancelledError:
+            self.cancelled.append(keyword)
+            raise
+        yield [{"name": f"{keyword}-结果", "singer": "歌手", "songmid": keyword}]
+
+
+@pytest.mark.asyncio
+async def test_typing_debounces_into_one_search() -> None:
+    app = QQMusicApp()
+    async with app.run_test() as pilot:
+        service = RecordingSearchService()
+        app.service = service  # type: ignore[assignment]
+        app.search_panel.debounce = 0.3
+
+        app.search_panel._input.focus()
+        await pilot.press(*"qing")
+        await pilot.pause(0.5)
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+
+        assert service.queries == ["qing"]
+        assert [song["songmid"] for song in app.current_songs] == ["qing"]
+
+        # 回车总会立即重新搜索，重复的分页由服务层缓存响应
+        await pilot.press("enter")
+        await pilot.pause()
+        await app.workers.wait_for_complete()
+        assert service.queries == ["qing", "qing"]
+
+
+@pytest.mark.asyncio
+async def test_newer_search_cancels_stale_one() -> None:
+    app = QQMusicApp()
+    async with app.run_test() as pilot:
+        service = RecordingSearchService()
+        service.gates["慢"] = asyncio.Event()
+        app.service = service  # type: ignore[assignment]
+
+        app.post_message(app.search_panel.SearchRequested("慢", incremental=True))
+        await pilot.pause()
+        app.post_message(app.search_panel.SearchRequested("快", incremental=True))
+        await pilot.pause()
+        await app.workers.wait_for_complete()
+        await pilot.pause()
+
+        assert service.cancelled == ["慢"]
+        assert [song["songmid"] for song in app.current_songs] == ["快"]
+
+
+@pytest.mark.asyncio
+async def test_stale_generation_is_not_rendered() -> None:
+    app = QQMusicApp()
+    async with app.run_test():
+        service = RecordingSearchService()
+        service.gates["旧"] = asyncio.Event()
+        app.service = service  # type: ignore[assignment]
+
+        stale = asyncio.create_task(app._search_songs("旧"))
+        await asyncio.sleep(0)
+        await app._search_songs("新")
+        service.gates["旧"].set()
+        await stale
+
+        assert [song["songmid"] for song in app.current_songs] == ["新"]
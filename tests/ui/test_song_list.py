@@ -0,0 +1,90 @@
+from typing import Any
+
+import pytest
+from textual.app import App, ComposeResult
+
+from qqmusicdownloader.ui.app import QQMusicApp
+from qqmusicdownloader.ui.widgets import SongList
+
+
+class SongListApp(App[None]):
+    def compose(self) -> ComposeResult:
+        yield SongList(id="songs")
+
+
+def _rows(start: int, count: int) -> list[str]:
+    return [f"{index + 1}. 歌曲{index}" for index in range(start, start + count)]
+
+
+@pytest.mark.asyncio
+async def test_song_list_renders_only_visible_rows() -> None:
+    async with SongListApp().run_test(size=(60, 20)) as pilot:
+        songs = pilot.app.query_one(SongList)
+        songs.set_rows(_rows(0, 5000))
+        await pilot.pause()
+
+        rendered: list[int] = []
+        original = songs.render_line
+
+        def tracking(y: int):
+            rendered.append(y)
+            return original(y)
+
+        songs.render_line = tracking  # type: ignore[method-assign]
+        songs.action_cursor_last()
+        await pilot.pause()
+
+        assert songs.cursor == 4999
+        assert songs.virtual_size.height == 5000
+        assert rendered and max(rendered) < songs.size.height
+        assert "5000. 歌曲4999" in original(songs.size.height - 1).text
+
+
+@pytest.mark.asyncio
+async def test_song_list_selection_survives_appends() -> None:
+    async with SongListApp().run_test(size=(60, 20)) as pilot:
+        songs = pilot.app.query_one(SongList)
+        songs.set_rows(_rows(0, 50))
+        songs.focus()
+        await pilot.press("down", "space", "shift+down", "shift+down")
+        assert songs.selected == [1, 2, 3]
+
+        songs.append_rows(_rows(50, 50))
+        assert songs.row_count == 100
+        assert songs.selected == [1, 2, 3]
+
+        await pilot.press("a")
+        assert len(songs.selected) == 100
+        await pilot.press("a")
+        assert songs.selected == []
+
+        songs.select_range(98, 120)
+        assert songs.selected == [98, 99]
+        songs.set_rows(_rows(0, 3))
+        assert songs.selected == []
+
+
+class PagedSearchService:
+    def __init__(self) -> None:
+        self.pages = [
+            [{"name": f"歌曲{index}", "singer": "歌手", "songmid": f"mid{index}"} for index in range(page * 50, page * 50 + 50)]
+            for page in range(3)
+        ]
+
+    async def iter_search(self, keyword: str, **_: Any):
+        for page in self.pages:
+            yield page
+
+
+@pytest.mark.asyncio
+async def test_app_appends_search_pages_without_cap() -> None:
+    async with QQMusicApp().run_test() as pilot:
+        app = pilot.app
+        app.service = PagedSearchService()  # type: ignore[assignment]
+
+        await app._search_songs("晴天")
+        app.results_panel._selection.select(120)
+
+        assert len(app.current_songs) == 150
+        assert app.results_panel._selection.row_count == 150
+        assert app.results_panel.selected_indices() == (120,)
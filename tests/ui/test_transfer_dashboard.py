@@ -0,0 +1,36 @@
+from qqmusicdownloader.services import DashboardSnapshot, TransferStat
+from qqmusicdownloader.ui.widgets.transfer_dashboard import format_eta, format_rate, render_dashboard
+
+
+def _stat(name: str, rate: float, **fields: object) -> TransferStat:
+    values = {"host": "cdn.example", "bytes_done": 500, "bytes_total": 1000, "eta": 30.0}
+    values.update(fields)
+    return TransferStat(name=name, rate=rate, **values)  # type: ignore[arg-type]
+
+
+def test_render_dashboard_puts_stalled_and_slow_rows_first() -> None:
+    snapshot = DashboardSnapshot(
+        transfers=(
+            _stat("快歌", 3 * 1024 * 1024),
+            _stat("慢歌", 20 * 1024),
+            _stat("卡住", 0, eta=None, stalled=True),
+        ),
+        rate=3.5 * 1024 * 1024,
+        queued=4,
+        failed=1,
+    )
+
+    lines = render_dashboard(snapshot, max_rows=2).plain.splitlines()
+
+    assert lines[0].startswith("总速率 3.50 MB/s")
+    assert "排队 4" in lines[0] and "失败 1" in lines[0]
+    assert lines[1].startswith("卡住") and lines[1].endswith("停滞")
+    assert lines[2].startswith("慢歌") and "20 KB/s" in lines[2] and " 50%" in lines[2]
+    assert lines[3] == "… 另有 1 个传输"
+
+
+def test_formatters() -> None:
+    assert format_rate(1536 * 1024) == "1.50 MB/s"
+    assert format_eta(None) == "--:--"
+    assert format_eta(65) == "01:05"
+    assert format_eta(3725) == "1:02:05"
@@ -5,6 +5,10 @@ def test_download_config_defaults() -> None:
     config = DownloadConfig()
     assert config.max_concurrent == 3
     assert config.default_quality == 1
+    assert config.lookahead == 2
+    assert config.download_lyrics is True
+    assert config.max_attempts == 3
+    assert config.order_policy == "fifo"
 
 
 def test_download_config_custom_values() -> None:
@@ -2,7 +2,7 @@ from typing import cast
 
 import pytest
 
-from qqmusicdownloader.domain import FileSizeMap, SongRecord
+from qqmusicdownloader.domain import FileSizeMap, SongRecord, expected_file_size
 
 
 def test_song_record_minimal_fields() -> None:
@@ -36,3 +36,17 @@ def test_file_size_map_accepts_partial_keys(quality: str) -> None:
 def test_song_record_rejects_missing_songmid() -> None:
     with pytest.raises(KeyError):
         cast(SongRecord, {"name": "无 id"})["songmid"]
+
+
+def test_expected_file_size_by_quality() -> None:
+    record = SongRecord(songmid="mid", size={"96aac": 4, "128": 1, "320": 2, "flac": 3})
+    assert expected_file_size(record, 1) == 4
+    assert expected_file_size(record, 2) == 2
+    assert expected_file_size(record, 3) == 3
+    assert expected_file_size(record, 9) == 0
+    assert expected_file_size(SongRecord(songmid="mid"), 2) == 0
+
+
+def test_expected_file_size_ignores_other_formats() -> None:
+    record = SongRecord(songmid="mid", size={"128": 1})
+    assert expected_file_size(record, 1) == 0
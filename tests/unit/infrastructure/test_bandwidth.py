@@ -0,0 +1,68 @@
+import asyncio
+import time
+
+import pytest
+
+from qqmusicdownloader.infrastructure import BandwidthLimiter, TokenBucket
+
+
+@pytest.mark.asyncio
+async def test_unlimited_bucket_never_waits() -> None:
+    bucket = TokenBucket()
+
+    start = time.monotonic()
+    for _ in range(100):
+        await bucket.consume(1024 * 1024)
+    assert time.monotonic() - start < 0.05
+
+
+@pytest.mark.asyncio
+async def test_bucket_throttles_after_burst() -> None:
+    bucket = TokenBucket(100_000, burst=10_000)
+    await asyncio.sleep(0.1)  # 让桶填满突发容量
+
+    start = time.monotonic()
+    await bucket.consume(10_000)
+    await bucket.consume(20_000)
+    elapsed = time.monotonic() - start
+
+    assert 0.15 <= elapsed < 0.5
+
+
+@pytest.mark.asyncio
+async def test_set_rate_takes_effect_at_runtime() -> None:
+    bucket = TokenBucket(1_000)
+    bucket.set_rate(None)
+    assert bucket.rate is None
+
+    start = time.monotonic()
+    await bucket.consume(50_000)
+    assert time.monotonic() - start < 0.05
+
+
+@pytest.mark.asyncio
+async def test_global_limit_shared_fairly_between_streams() -> None:
+    limiter = BandwidthLimiter(200_000)
+    order: list[str] = []
+
+    async def stream(name: str) -> None:
+        for _ in range(10):
+            await limiter.throttle(4_000)
+            order.append(name)
+
+    await asyncio.wait_for(asyncio.gather(stream("a"), stream("b")), timeout=2)
+    # 两个数据流交替获得令牌，任何一方都不会独占带宽
+    assert order.count("a") == order.count("b") == 10
+    assert {"a", "b"} <= set(order[:4])
+    assert limiter.global_rate == 200_000
+
+
+@pytest.mark.asyncio
+async def test_task_bucket_limits_single_stream() -> None:
+    limiter = BandwidthLimiter()
+    task_bucket = TokenBucket(50_000, burst=5_000)
+
+    start = time.monotonic()
+    await limiter.throttle(5_000, task_bucket)
+    await limiter.throttle(5_000, task_bucket)
+    assert time.monotonic() - start >= 0.15
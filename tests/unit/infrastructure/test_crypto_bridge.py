@@ -2,8 +2,10 @@ import base64
 
 import pytest
 
+from qqmusicdownloader.infrastructure.crypto import NodeCryptoBackend
 from qqmusicdownloader.infrastructure.crypto.bridge import (
     NodeCryptoError,
+    bridge_stats,
     decrypt_response,
     encrypt_payload,
 )
@@ -32,3 +34,27 @@ def test_encrypt_payload_propagates_node_error(monkeypatch: pytest.MonkeyPatch)
 
     with pytest.raises(NodeCryptoError):
         encrypt_payload("{}")
+
+
+def test_bridge_stats_record_round_trips() -> None:
+    before = bridge_stats()["latency"]["count"]
+
+    encrypt_payload("{}")
+
+    stats = bridge_stats()
+    assert stats["latency"]["count"] == before + 1
+    assert stats["waiting"] == 0
+    assert stats["latency"]["max"] > 0
+
+
+def test_dedicated_backend_uses_its_own_process() -> None:
+    shared_before = bridge_stats()["latency"]["count"]
+    backend = NodeCryptoBackend(dedicated=True)
+    try:
+        backend.start()
+        backend.encrypt_payload("{}")
+        assert backend.stats()["latency"]["count"] == 1
+    finally:
+        backend.close()
+
+    assert bridge_stats()["latency"]["count"] == shared_before
@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import pytest
+
+from qqmusicdownloader.infrastructure import ConnectionStats, LatencyRecorder, LoopLagMonitor
+
+
+def test_latency_recorder_reports_nearest_rank_percentiles() -> None:
+    recorder = LatencyRecorder(size=100)
+    for millis in range(1, 201):
+        recorder.record(millis / 1000)
+
+    snapshot = recorder.snapshot()
+
+    assert snapshot["count"] == 200  # 只保留最近 100 个样本
+    assert snapshot["p50"] == pytest.approx(150)
+    assert snapshot["p95"] == pytest.approx(195)
+    assert snapshot["max"] == pytest.approx(200)
+    assert LatencyRecorder().snapshot()["p99"] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_connection_stats_tracks_in_flight_and_failures() -> None:
+    stats = ConnectionStats()
+    release = asyncio.Event()
+
+    async def request(fail: bool = False) -> None:
+        with stats.track():
+            await release.wait()
+            if fail:
+                raise RuntimeError("boom")
+
+    tasks = [asyncio.create_task(request()), asyncio.create_task(request(fail=True))]
+    cancelled = asyncio.create_task(request())
+    await asyncio.sleep(0)
+    assert stats.snapshot()["in_flight"] == 3
+
+    cancelled.cancel()
+    release.set()
+    await asyncio.gather(*tasks, cancelled, return_exceptions=True)
+
+    assert stats.snapshot() == {"in_flight": 0, "peak": 3, "requests": 3, "failures": 1}
+
+
+@pytest.mark.asyncio
+async def test_loop_lag_monitor_detects_blocking_call() -> None:
+    monitor = LoopLagMonitor(interval=0.01)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.02)
+    time.sleep(0.1)  # 阻塞事件循环
+    await asyncio.sleep(0.03)
+    task.cancel()
+
+    assert monitor.snapshot()["max"] >= 80
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from qqmusicdownloader.domain import SongRecord
+from qqmusicdownloader.infrastructure import JobStore
+from qqmusicdownloader.infrastructure.job_store import JOB_DONE, JOB_FAILED, JOB_PENDING
+
+
+def _song(songmid: str) -> SongRecord:
+    return {"name": f"歌曲{songmid}", "singer": "歌手", "songmid": songmid}
+
+
+def test_enqueue_deduplicates_and_skips_missing_songmid(tmp_path: Path) -> None:
+    store = JobStore(tmp_path / "jobs.sqlite3")
+
+    first = store.enqueue([_song("a"), _song("b"), {"name": "无编号"}], quality=2)
+    second = store.enqueue([_song("a")], quality=2)
+
+    assert len(first) == 2
+    assert second == first[:1]
+    assert [job.song["songmid"] for job in store.pending()] == ["a", "b"]
+    assert store.enqueue([_song("a")], quality=3) != first[:1]
+
+
+def test_running_jobs_recovered_after_restart(tmp_path: Path) -> None:
+    path = tmp_path / "jobs.sqlite3"
+    store = JobStore(path)
+    job_id = store.enqueue([_song("a")], quality=1)[0]
+    store.mark_running(job_id)
+    store.close()  # 模拟进程在下载途中退出
+
+    reopened = JobStore(path)
+    assert reopened.pending() == []
+    assert reopened.recover() == 1
+
+    job = reopened.pending()[0]
+    assert job.id == job_id
+    assert job.attempts == 1
+    assert job.song["name"] == "歌曲a"
+
+
+def test_failed_job_requeued_on_enqueue(tmp_path: Path) -> None:
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.enqueue([_song("a")], quality=1)[0]
+    store.mark_running(job_id)
+    store.mark_failed(job_id, "boom", bytes_done=10)
+
+    job = store.get(job_id)
+    assert job is not None
+    assert (job.state, job.error, job.bytes_done) == (JOB_FAILED, "boom", 10)
+
+    store.enqueue([_song("a")], quality=1)
+    job = store.get(job_id)
+    assert job is not None and job.state == JOB_PENDING and job.attempts == 0
+
+    store.mark_done(job_id, 100)
+    assert store.counts() == {JOB_DONE: 1}
+
+
+def test_done_job_requeued_on_explicit_enqueue(tmp_path: Path) -> None:
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.enqueue([_song("a")], quality=1)[0]
+    store.mark_running(job_id)
+    store.mark_done(job_id, 100)
+
+    assert store.enqueue([_song("a")], quality=1) == [job_id]
+    job = store.get(job_id)
+    assert job is not None
+    assert (job.state, job.attempts, job.bytes_done) == (JOB_PENDING, 0, 0)
+    assert [job.id for job in store.pending([job_id])] == [job_id]
+
+
+def test_running_job_not_reset_on_enqueue(tmp_path: Path) -> None:
+    store = JobStore(tmp_path / "jobs.sqlite3")
+    job_id = store.enqueue([_song("a")], quality=1)[0]
+    store.mark_running(job_id)
+
+    store.enqueue([_song("a")], quality=1)
+
+    assert store.pending([job_id]) == []
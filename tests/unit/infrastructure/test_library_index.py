@@ -0,0 +1,115 @@
+import hashlib
+import json
+from pathlib import Path
+
+from qqmusicdownloader.infrastructure import LibraryIndex
+
+
+def _download(base: Path, name: str, songmid: str, quality: int, data: bytes) -> Path:
+    """模拟一次下载：写入音频文件并追加清单记录。"""
+
+    music_dir = base / "Music"
+    music_dir.mkdir(parents=True, exist_ok=True)
+    path = music_dir / name
+    path.write_bytes(data)
+    entry = {
+        "songmid": songmid,
+        "quality": quality,
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "path": str(path),
+    }
+    with (base / "manifest.jsonl").open("a", encoding="utf-8") as f:
+        f.write(json.dumps(entry) + "\n")
+    return path
+
+
+def _index(base: Path) -> LibraryIndex:
+    return LibraryIndex(
+        base / "library.sqlite3",
+        music_dir=base / "Music",
+        manifest_path=base / "manifest.jsonl",
+    )
+
+
+def test_sync_manifest_reads_only_new_records(tmp_path: Path) -> None:
+    index = _index(tmp_path)
+    _download(tmp_path, "a.m4a", "a", 1, b"aaaa")
+
+    assert index.sync_manifest() == 1
+    assert index.sync_manifest() == 0
+
+    _download(tmp_path, "b.flac", "b", 3, b"bbbbbb")
+    assert index.sync_manifest() == 1
+    assert index.lookup("b", 3).size == 6
+    assert index.lookup("b", 1) is None
+    assert index.lookup_any("b", (1, 3)).quality == 3
+
+
+def test_lookup_any_skips_and_drops_deleted_files(tmp_path: Path) -> None:
+    _download(tmp_path, "a.m4a", "a", 1, b"aaaa")
+    flac = _download(tmp_path, "a.flac", "a", 3, b"aaaaaa")
+    index = _index(tmp_path)
+    index.sync_manifest()
+
+    flac.unlink()
+
+    assert index.lookup_any("a", (3, 1)).quality == 1
+    assert index.lookup("a", 3) is None
+
+
+def test_index_survives_restart(tmp_path: Path) -> None:
+    _download(tmp_path, "a.m4a", "a", 1, b"aaaa")
+    index = _index(tmp_path)
+    index.scan()
+    index.close()
+
+    reopened = _index(tmp_path)
+    assert reopened.lookup("a", 1) is not None
+    assert reopened.sync_manifest() == 0
+
+
+def test_scan_follows_renamed_file_and_drops_deleted(tmp_path: Path) -> None:
+    renamed = _download(tmp_path, "a.m4a", "a", 1, b"aaaa")
+    deleted = _download(tmp_path, "b.m4a", "b", 1, b"bbbb")
+    index = _index(tmp_path)
+    index.scan()
+    assert len(index) == 2
+
+    renamed.rename(tmp_path / "Music" / "renamed.m4a")
+    deleted.unlink()
+
+    assert index.scan() == 2
+    assert index.lookup("a", 1).path == str(tmp_path / "Music" / "renamed.m4a")
+    assert index.lookup("b", 1) is None
+
+
+def test_scan_drops_modified_file(tmp_path: Path) -> None:
+    path = _download(tmp_path, "a.m4a", "a", 1, b"aaaa")
+    index = _index(tmp_path)
+    index.scan()
+
+    path.write_bytes(b"truncated-and-rewritten")
+
+    index.scan()
+    assert index.lookup("a", 1) is None
+
+
+def test_scan_indexes_files_outside_manifest_by_name(tmp_path: Path) -> None:
+    _download(tmp_path, "晴天 - 周杰伦.flac", "a", 3, b"aaaa")
+    manual = tmp_path / "Music" / "稻香 - 周杰伦.mp3"
+    manual.write_bytes(b"bbbb")
+    (tmp_path / "Music" / "稻香 - 周杰伦.mp3.tmp").write_bytes(b"b")
+    index = _index(tmp_path)
+
+    assert index.scan() == 2
+    assert index.scan() == 0
+    assert index.lookup_name("稻香 - 周杰伦", (3, 2)).path == str(manual)
+    assert index.lookup_name("稻香 - 周杰伦", (1,)) is None
+    # 清单中已有的文件只按 songmid 索引
+    assert index.lookup_name("晴天 - 周杰伦", (3,)) is None
+
+    manual.unlink()
+    assert index.scan() == 1
+    assert index.lookup_name("稻香 - 周杰伦", (2,)) is None
+
@@ -0,0 +1,98 @@
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from qqmusicdownloader.infrastructure import metrics
+
+
+@pytest.fixture()
+def registry() -> metrics.MetricsRegistry:
+    return metrics.MetricsRegistry()
+
+
+def test_render_counters_and_gauges(registry: metrics.MetricsRegistry) -> None:
+    requests = registry.counter("api_total", "接口调用", ("module", "code"))
+    active = registry.gauge("active", "进行中")
+    requests.inc(module="search", code="0")
+    requests.inc(2, module="search", code="0")
+    requests.inc(module='a"b\n', code="2001")
+    active.inc()
+    active.inc()
+    active.dec()
+
+    assert registry.render().splitlines() == [
+        "# HELP active 进行中",
+        "# TYPE active gauge",
+        "active 1",
+        "# HELP api_total 接口调用",
+        "# TYPE api_total counter",
+        'api_total{module="a\\"b\\n",code="2001"} 1',
+        'api_total{module="search",code="0"} 3',
+    ]
+    assert registry.counter("api_total", "接口调用", ("module", "code")) is requests
+
+
+def test_histogram_buckets_are_cumulative(registry: metrics.MetricsRegistry) -> None:
+    latency = registry.histogram("latency_seconds", "耗时", ("action",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        latency.observe(value, action="encrypt")
+
+    lines = [line for line in registry.render().splitlines() if not line.startswith("#")]
+    assert lines == [
+        'latency_seconds_bucket{action="encrypt",le="0.1"} 1',
+        'latency_seconds_bucket{action="encrypt",le="1"} 3',
+        'latency_seconds_bucket{action="encrypt",le="+Inf"} 4',
+        'latency_seconds_sum{action="encrypt"} 4.05',
+        'latency_seconds_count{action="encrypt"} 4',
+    ]
+    assert latency.count(action="encrypt") == 4
+
+
+def test_labels_and_types_are_validated(registry: metrics.MetricsRegistry) -> None:
+    songs = registry.counter("songs_total", "歌曲", ("result",))
+
+    with pytest.raises(ValueError):
+        songs.inc(status="ok")
+    with pytest.raises(ValueError):
+        songs.inc(-1, result="failed")
+    with pytest.raises(ValueError):
+        registry.gauge("songs_total", "歌曲")
+
+
+def test_metric_base_class_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        metrics._Metric("base", "基类")  # type: ignore[abstract]
+
+
+def test_server_exposes_metrics_endpoint(registry: metrics.MetricsRegistry) -> None:
+    registry.counter("bytes_total", "字节").inc(1024)
+    server = metrics.MetricsServer(registry=registry).start()
+    try:
+        host, port = server.address
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+            content_type = resp.headers["Content-Type"]
+        with pytest.raises(urllib.error.HTTPError) as missing:
+            urllib.request.urlopen(f"http://{host}:{port}/", timeout=5)
+    finally:
+        server.close()
+
+    assert content_type == metrics.CONTENT_TYPE
+    assert "bytes_total 1024" in body.splitlines()
+    assert missing.value.code == 404
+
+
+def test_dumper_writes_final_snapshot(
+    registry: metrics.MetricsRegistry, tmp_path: Path
+) -> None:
+    songs = registry.counter("songs_total", "歌曲", ("result",))
+    target = tmp_path / "textfile" / "qqmusic.prom"
+    dumper = metrics.MetricsDumper(target, interval=60, registry=registry).start()
+    songs.inc(result="succeeded")
+
+    dumper.stop()
+
+    assert 'songs_total{result="succeeded"} 1' in target.read_text(encoding="utf-8")
+    assert list(target.parent.iterdir()) == [target]
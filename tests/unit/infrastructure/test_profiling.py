@@ -0,0 +1,62 @@
+import asyncio
+import pstats
+from pathlib import Path
+
+import pytest
+
+from qqmusicdownloader.infrastructure import profiling
+
+
+@pytest.fixture()
+def profiler(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> profiling.Profiler:
+    profiler = profiling.Profiler(tmp_path / "profiles", top=5)
+    monkeypatch.setattr(profiling, "PROFILER", profiler)
+    return profiler
+
+
+def _busy() -> int:
+    return sum(index * index for index in range(20_000))
+
+
+def test_disabled_profiler_writes_nothing(monkeypatch: pytest.MonkeyPatch) -> None:
+    profiler = profiling.Profiler()
+    monkeypatch.setattr(profiling, "PROFILER", profiler)
+
+    with profiling.profile("search", keyword="晴天"):
+        _busy()
+
+    assert not profiling.enabled()
+    assert profiler.written == []
+
+
+def test_each_operation_writes_profile_and_summary(profiler: profiling.Profiler) -> None:
+    with profiling.profile("batch", songs=2):
+        with profiling.profile("download"):  # 嵌套操作计入外层
+            _busy()
+
+    (target,) = profiler.written
+    assert target.name.endswith("-0001-batch.prof")
+    stats = pstats.Stats(str(target))
+    assert any(func == "_busy" for _, _, func in stats.stats)
+    summary = target.with_suffix(".txt").read_text(encoding="utf-8")
+    assert summary.startswith("操作: batch\nsongs: 2\n")
+    assert "按自身耗时排序（前 5 个函数）" in summary
+    assert "_busy" in summary
+
+    with profiling.profile("download"):
+        _busy()
+    assert len(profiler.written) == 2
+
+
+def test_profiled_coroutine_records_errors(profiler: profiling.Profiler) -> None:
+    @profiling.profiled("search")
+    async def search() -> None:
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(search())
+
+    (target,) = profiler.written
+    summary = target.with_suffix(".txt").read_text(encoding="utf-8")
+    assert "error: RuntimeError" in summary.splitlines()
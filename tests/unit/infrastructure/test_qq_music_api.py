@@ -1,10 +1,13 @@
 import asyncio
+import hashlib
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 import pytest
 
-from qqmusicdownloader.infrastructure import QQMusicAPI
+from qqmusicdownloader.domain import expected_file_size
+from qqmusicdownloader.infrastructure import QQMusicAPI, RateLimitedError, metrics
+from qqmusicdownloader.infrastructure.qq_music_api import parse_playlist_id
 
 
 class DummyContent:
@@ -98,6 +101,7 @@ async def test_search_song_decodes_unicode(monkeypatch: pytest.MonkeyPatch, api:
                                     "mid": "mid",
                                     "file": {
                                         "media_mid": "media",
+                                        "size_96aac": 4,
                                         "size_128mp3": 1,
                                         "size_320mp3": 2,
                                         "size_flac": 3,
@@ -118,6 +122,148 @@ async def test_search_song_decodes_unicode(monkeypatch: pytest.MonkeyPatch, api:
     assert songs[0]["name"] == "爱母"
     assert songs[0]["singer"] == "王力宏"
     assert songs[0]["album"] == "心中的日月"
+    assert songs[0]["size"]["96aac"] == 4
+
+
+@pytest.mark.parametrize(
+    ("quality", "filename", "field"),
+    [
+        (1, "C400fmid.m4a", "size_96aac"),
+        (2, "M500fmid.mp3", "size_320mp3"),
+        (3, "F000fmid.flac", "size_flac"),
+    ],
+)
+def test_expected_size_matches_requested_file(quality: int, filename: str, field: str) -> None:
+    fields = ("size_96aac", "size_128mp3", "size_320mp3", "size_flac")
+    file_info = {name: 100 + index for index, name in enumerate(fields)}
+    record = QQMusicAPI._to_song_record({"mid": "mid", "file": file_info})
+
+    assert QQMusicAPI._song_filename("fmid", quality) == filename
+    assert expected_file_size(record, quality) == file_info[field]  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("7843306137", "7843306137"),
+        ("https://y.qq.com/n/ryqq/playlist/7843306137", "7843306137"),
+        ("https://i.y.qq.com/n2/m/share/details/taoge.html?platform=11&id=8052190267&ADTAG=share", "8052190267"),
+        ("周杰伦", None),
+    ],
+)
+def test_parse_playlist_id(value: str, expected: Optional[str]) -> None:
+    assert parse_playlist_id(value) == expected
+
+
+@pytest.mark.asyncio
+async def test_iter_playlist_pages_until_total(monkeypatch: pytest.MonkeyPatch, api: QQMusicAPI) -> None:
+    begins: list[int] = []
+
+    async def fake_call(payload: Dict[str, Any], *, encoding: str = "ag-1") -> Dict[str, Any]:
+        param = payload["req_1"]["param"]
+        begins.append(param["song_begin"])
+        start = param["song_begin"]
+        count = min(param["song_num"], 5 - start)
+        return {
+            "req_1": {
+                "code": 0,
+                "data": {
+                    "total_song_num": 5,
+                    "songlist": [
+                        {"mid": f"mid{i}", "title": f"歌曲{i}", "singer": [{"name": "歌手"}]}
+                        for i in range(start, start + count)
+                    ],
+                },
+            }
+        }
+
+    monkeypatch.setattr(api, "_call_musics", fake_call)
+
+    pages = [page async for page in api.iter_playlist("https://y.qq.com/n/ryqq/playlist/42", page_size=2)]
+
+    assert begins == [0, 2, 4]
+    assert [[song["songmid"] for song in page] for page in pages] == [["mid0", "mid1"], ["mid2", "mid3"], ["mid4"]]
+    assert pages[0][0]["name"] == "歌曲0"
+
+
+@pytest.mark.asyncio
+async def test_iter_playlist_rejects_unknown_reference(api: QQMusicAPI) -> None:
+    with pytest.raises(ValueError):
+        async for _ in api.iter_playlist("不是歌单"):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_fallback_requests_all_candidates_in_one_call(
+    monkeypatch: pytest.MonkeyPatch, api: QQMusicAPI
+) -> None:
+    payloads: list[Dict[str, Any]] = []
+
+    async def fake_call(payload: Dict[str, Any], *, encoding: str = "ag-1") -> Dict[str, Any]:
+        payloads.append(payload)
+        return {
+            "req_0": {
+                "data": {
+                    "sip": ["https://cdn.example/"],
+                    "midurlinfo": [
+                        {"filename": "F000media.flac", "purl": ""},
+                        {"filename": "M500media.mp3", "purl": "M500media.mp3?vkey=1"},
+                        {"filename": "C400media.m4a", "purl": "C400media.m4a?vkey=1"},
+                    ],
+                }
+            }
+        }
+
+    monkeypatch.setattr(api, "_call_musics", fake_call)
+
+    picked = await api.get_song_url_with_fallback("mid", "media", (3, 2, 1))
+
+    assert picked == (2, "https://cdn.example/M500media.mp3?vkey=1")
+    assert len(payloads) == 1
+    param = payloads[0]["req_0"]["param"]
+    assert param["filename"] == ["F000media.flac", "M500media.mp3", "C400media.m4a"]
+    assert param["songmid"] == ["mid"] * 3
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_code_is_raised(monkeypatch: pytest.MonkeyPatch, api: QQMusicAPI) -> None:
+    async def fake_call(payload: Dict[str, Any], *, encoding: str = "ag-1") -> Dict[str, Any]:
+        return {"req_0": {"code": 2001, "data": {}}}
+
+    monkeypatch.setattr(api, "_call_musics", fake_call)
+
+    with pytest.raises(RateLimitedError):
+        await api.get_song_url("mid", "media", 1)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_calls_are_counted_with_their_code(
+    monkeypatch: pytest.MonkeyPatch, api: QQMusicAPI
+) -> None:
+    async def fake_exchange(payload: Dict[str, Any], *, encoding: str) -> Dict[str, Any]:
+        raise RateLimitedError(500001)
+
+    monkeypatch.setattr(api, "_exchange_musics", fake_exchange)
+    labels = {"module": "vkey.GetVkeyServer", "method": "CgiGetVkey", "code": "500001"}
+    before = metrics.API_REQUESTS.value(**labels)
+
+    with pytest.raises(RateLimitedError):
+        await api.get_song_url("mid", "media", 1)
+
+    assert metrics.API_REQUESTS.value(**labels) == before + 1
+    assert metrics.API_REQUESTS.value(**{**labels, "code": "429"}) == 0
+
+
+@pytest.mark.asyncio
+async def test_fallback_returns_none_when_nothing_available(
+    monkeypatch: pytest.MonkeyPatch, api: QQMusicAPI
+) -> None:
+    async def fake_call(payload: Dict[str, Any], *, encoding: str = "ag-1") -> Dict[str, Any]:
+        return {"req_0": {"data": {"midurlinfo": [{"purl": ""}, {"purl": ""}]}}}
+
+    monkeypatch.setattr(api, "_call_musics", fake_call)
+
+    assert await api.get_song_url_with_fallback("mid", "media", (2, 1)) is None
 
 
 @pytest.mark.asyncio
@@ -161,6 +307,39 @@ async def test_download_with_lyrics_writes_file(
     lyric_file = tmp_path / "Lyrics" / "测试歌曲.lrc"
     assert lyric_file.read_text(encoding="utf-8") == "歌词"
 
+    entry = api.manifest.lookup("mid123", 1)
+    assert entry is not None
+    assert entry.size == len(data)
+    assert entry.sha256 == hashlib.sha256(data).hexdigest()
+    assert entry.matches_file()
+
+
+@pytest.mark.asyncio
+async def test_download_with_lyrics_rejects_truncated_stream(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    api: QQMusicAPI,
+) -> None:
+    data = b"short"
+    dummy_response = DummyResponse(data, headers={"content-length": "1024"})
+
+    def fake_session(*_args: Any, **_kwargs: Any) -> DummySession:
+        return DummySession(dummy_response)
+
+    monkeypatch.setattr("qqmusicdownloader.infrastructure.qq_music_api.aiohttp.ClientSession", fake_session)
+
+    result = await api.download_with_lyrics(
+        url="https://example.com/song",
+        filename="截断",
+        quality=2,
+        songmid="mid123",
+    )
+
+    assert result is False
+    assert not (tmp_path / "Music" / "截断.mp3").exists()
+    assert list((tmp_path / "Music").glob("*.tmp")) == []
+    assert api.manifest.lookup("mid123", 2) is None
+
 
 @pytest.mark.asyncio
 async def test_download_with_lyrics_handles_http_error(
@@ -184,3 +363,216 @@ async def test_download_with_lyrics_handles_http_error(
 
     assert result is False
     assert not (tmp_path / "Music" / "失败.m4a").exists()
+
+
+@pytest.mark.asyncio
+async def test_download_fetches_lyrics_concurrently(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    api: QQMusicAPI,
+) -> None:
+    events: list[str] = []
+
+    class SlowContent(DummyContent):
+        async def iter_chunked(self, chunk_size: int):
+            await asyncio.sleep(0.02)
+            events.append("audio")
+            yield self._data
+
+    dummy_response = DummyResponse(b"audio")
+    dummy_response.content = SlowContent(b"audio")
+
+    def fake_session(*_args: Any, **_kwargs: Any) -> DummySession:
+        return DummySession(dummy_response)
+
+    monkeypatch.setattr("qqmusicdownloader.infrastructure.qq_music_api.aiohttp.ClientSession", fake_session)
+
+    async def fake_get_lyrics(_songmid: str) -> str:
+        events.append("lyrics")
+        return "歌词"
+
+    monkeypatch.setattr(api, "get_lyrics", fake_get_lyrics)
+
+    assert await api.download_with_lyrics("https://example.com/song", "并发", 1, "mid123") is True
+    assert events == ["lyrics", "audio"]
+    assert (tmp_path / "Lyrics" / "并发.lrc").read_text(encoding="utf-8") == "歌词"
+    assert list((tmp_path / "Lyrics").glob("*.tmp")) == []
+
+
+@pytest.mark.asyncio
+async def test_download_skips_lyrics_when_disabled(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    api: QQMusicAPI,
+) -> None:
+    dummy_response = DummyResponse(b"audio")
+
+    def fake_session(*_args: Any, **_kwargs: Any) -> DummySession:
+        return DummySession(dummy_response)
+
+    monkeypatch.setattr("qqmusicdownloader.infrastructure.qq_music_api.aiohttp.ClientSession", fake_session)
+
+    async def fail_get_lyrics(_songmid: str) -> str:  # pragma: no cover - 不应被调用
+        raise AssertionError("lyrics should be skipped")
+
+    monkeypatch.setattr(api, "get_lyrics", fail_get_lyrics)
+
+    result = await api.download_with_lyrics(
+        "https://example.com/song", "无歌词", 1, "mid123", with_lyrics=False
+    )
+
+    assert result is True
+    assert not (tmp_path / "Lyrics" / "无歌词.lrc").exists()
+
+
+@pytest.mark.asyncio
+async def test_failed_audio_discards_lyrics(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    api: QQMusicAPI,
+) -> None:
+    dummy_response = DummyResponse(b"", status=404)
+
+    def fake_session(*_args: Any, **_kwargs: Any) -> DummySession:
+        return DummySession(dummy_response)
+
+    monkeypatch.setattr("qqmusicdownloader.infrastructure.qq_music_api.aiohttp.ClientSession", fake_session)
+
+    async def fake_get_lyrics(_songmid: str) -> str:
+        return "歌词"
+
+    monkeypatch.setattr(api, "get_lyrics", fake_get_lyrics)
+
+    assert await api.download_with_lyrics("https://example.com/song", "失败", 1, "mid123") is False
+    assert not (tmp_path / "Lyrics" / "失败.lrc").exists()
+
+
+@pytest.mark.asyncio
+async def test_download_accepts_chunked_response_without_length(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    api: QQMusicAPI,
+) -> None:
+    data = b"chunked-audio"
+    dummy_response = DummyResponse(data, headers={"transfer-encoding": "chunked"})
+
+    def fake_session(*_args: Any, **_kwargs: Any) -> DummySession:
+        return DummySession(dummy_response)
+
+    monkeypatch.setattr("qqmusicdownloader.infrastructure.qq_music_api.aiohttp.ClientSession", fake_session)
+
+    result = await api.download_with_lyrics(
+        "https://example.com/song",
+        "分块",
+        2,
+        "mid123",
+        expected_size=len(data),
+        with_lyrics=False,
+    )
+
+    assert result is True
+    assert (tmp_path / "Music" / "分块.mp3").read_bytes() == data
+    entry = api.manifest.lookup("mid123", 2)
+    assert entry is not None and entry.size == len(data)
+
+
+@pytest.mark.asyncio
+async def test_download_rejects_empty_chunked_response(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    api: QQMusicAPI,
+) -> None:
+    dummy_response = DummyResponse(b"", headers={"transfer-encoding": "chunked"})
+
+    def fake_session(*_args: Any, **_kwargs: Any) -> DummySession:
+        return DummySession(dummy_response)
+
+    monkeypatch.setattr("qqmusicdownloader.infrastructure.qq_music_api.aiohttp.ClientSession", fake_session)
+
+    result = await api.download_with_lyrics(
+        "https://example.com/song", "空响应", 2, "mid123", with_lyrics=False
+    )
+
+    assert result is False
+    assert not (tmp_path / "Music" / "空响应.mp3").exists()
+    assert list((tmp_path / "Music").glob("*.tmp")) == []
+
+
+class SlowContent:
+    def __init__(self, data: bytes) -> None:
+        self._data = data
+
+    async def iter_chunked(self, chunk_size: int):  # pragma: no cover - generator
+        for start in range(0, len(self._data), 4):
+            await asyncio.sleep(0)
+            yield self._data[start : start + 4]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_downloads_to_same_path_do_not_interleave(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    api: QQMusicAPI,
+) -> None:
+    streams = {"first": b"A" * 64, "second": b"B" * 64}
+
+    def fake_session(*_args: Any, **_kwargs: Any) -> Any:
+        class Session(DummySession):
+            def get(self, url: str, **_kwargs: Any) -> DummyResponse:
+                response = DummyResponse(streams[url])
+                response.content = SlowContent(streams[url])
+                return response
+
+        return Session(DummyResponse(b""))
+
+    monkeypatch.setattr("qqmusicdownloader.infrastructure.qq_music_api.aiohttp.ClientSession", fake_session)
+
+    results = await asyncio.gather(
+        *(
+            api.download_with_lyrics(url, "同名", 2, f"mid-{url}", with_lyrics=False)
+            for url in streams
+        )
+    )
+
+    assert results == [True, True]
+    audio = tmp_path / "Music" / "同名.mp3"
+    assert audio.read_bytes() == streams["first"]
+    entry = api.manifest.lookup("mid-first", 2)
+    assert entry is not None and entry.matches_file()
+    assert api.manifest.lookup("mid-second", 2) is None
+    assert list((tmp_path / "Music").glob("*.tmp")) == []
+
+
+@pytest.mark.asyncio
+async def test_cancelled_download_removes_temp_file(
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    api: QQMusicAPI,
+) -> None:
+    gate = asyncio.Event()
+    started = asyncio.Event()
+
+    class StalledContent:
+        async def iter_chunked(self, chunk_size: int):  # pragma: no cover - generator
+            yield b"partial"
+            started.set()
+            await gate.wait()
+            yield b"never"
+
+    def fake_session(*_args: Any, **_kwargs: Any) -> DummySession:
+        response = DummyResponse(b"", headers={"content-length": "1024"})
+        response.content = StalledContent()
+        return DummySession(response)
+
+    monkeypatch.setattr("qqmusicdownloader.infrastructure.qq_music_api.aiohttp.ClientSession", fake_session)
+
+    task = asyncio.create_task(
+        api.download_with_lyrics("https://example.com/song", "取消", 2, "mid123", with_lyrics=False)
+    )
+    await asyncio.wait_for(started.wait(), timeout=1)
+    assert len(list((tmp_path / "Music").glob("*.tmp"))) == 1
+
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert list((tmp_path / "Music").glob("*.tmp")) == []
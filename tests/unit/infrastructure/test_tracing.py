@@ -0,0 +1,75 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from qqmusicdownloader.infrastructure import tracing
+
+
+@pytest.fixture()
+def tracer(monkeypatch: pytest.MonkeyPatch) -> tracing.Tracer:
+    tracer = tracing.Tracer()
+    tracer.enabled = True
+    monkeypatch.setattr(tracing, "TRACER", tracer)
+    return tracer
+
+
+def test_disabled_spans_record_nothing(monkeypatch: pytest.MonkeyPatch) -> None:
+    tracer = tracing.Tracer()
+    monkeypatch.setattr(tracing, "TRACER", tracer)
+
+    with tracing.span("idle", size=1) as current:
+        current.set(bytes=2)
+
+    assert tracer.events() == []
+    assert tracing.span("a") is tracing.span("b")  # 共享的空跨度
+
+
+def test_nested_spans_share_a_track_and_record_errors(tracer: tracing.Tracer) -> None:
+    with tracing.span("outer", song="晴天") as outer:
+        with pytest.raises(ValueError):
+            with tracing.span("inner"):
+                raise ValueError("boom")
+        outer.set(bytes=10)
+
+    inner, outer_event = tracer.events()
+    assert (inner["name"], outer_event["name"]) == ("inner", "outer")
+    assert inner["tid"] == outer_event["tid"]
+    assert inner["args"] == {"error": "ValueError"}
+    assert outer_event["args"] == {"song": "晴天", "bytes": 10}
+    assert outer_event["ts"] <= inner["ts"]
+    assert outer_event["dur"] >= inner["dur"]
+
+
+@pytest.mark.asyncio
+async def test_tasks_get_own_tracks_and_threads_inherit(tracer: tracing.Tracer) -> None:
+    def blocking() -> None:
+        with tracing.span("thread"):
+            pass
+
+    @tracing.traced("task")
+    async def work() -> None:
+        await asyncio.sleep(0)
+        await asyncio.to_thread(blocking)
+
+    await asyncio.gather(work(), work())
+
+    events = tracer.events()
+    tasks = [event for event in events if event["name"] == "task"]
+    threads = [event for event in events if event["name"] == "thread"]
+    assert len({event["tid"] for event in tasks}) == 2
+    assert {event["tid"] for event in threads} == {event["tid"] for event in tasks}
+
+
+def test_export_chrome_trace(tracer: tracing.Tracer, tmp_path: Path) -> None:
+    with tracing.span("musics.fcg"):
+        pass
+
+    path = tmp_path / "out" / "trace.json"
+    assert tracer.export_chrome(path) == 1
+
+    trace = json.loads(path.read_text(encoding="utf-8"))
+    metadata, event = trace["traceEvents"]
+    assert metadata["ph"] == "M" and metadata["tid"] == event["tid"]
+    assert event["ph"] == "X" and event["name"] == "musics.fcg"
@@ -0,0 +1,172 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from qqmusicdownloader.infrastructure import RateLimitedError
+from qqmusicdownloader.services import AccountPool, DownloadService
+from qqmusicdownloader.services.account_pool import (
+    ACCOUNT_ACTIVE,
+    ACCOUNT_COOLING,
+    ACCOUNT_INVALID,
+)
+
+
+class AccountStubAPI:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls: list[str] = []
+        self.limited = False
+        self.valid = True
+        self.validations = 0
+        self.configured: Path | None = None
+        self.downloads: list[str] = []
+        self.lyrics_calls: list[str] = []
+        self.download_options: list[dict[str, object]] = []
+
+    async def validate_cookie(self) -> bool:
+        self.validations += 1
+        return self.valid
+
+    async def get_song_url(self, songmid: str, media_mid: str, quality: int) -> str | None:
+        self.calls.append(songmid)
+        if self.limited:
+            raise RateLimitedError(2001)
+        return f"https://{self.name}.example/{songmid}"
+
+    async def get_lyrics(self, songmid: str) -> str | None:
+        self.lyrics_calls.append(songmid)
+        return f"[00:00.00]{self.name}"
+
+    def get_download_path(self) -> str:
+        return f"/tmp/{self.name}"
+
+    def configure_download_dirs(self, base_dir: Path) -> None:
+        self.configured = base_dir
+
+    def set_bandwidth_limit(self, bytes_per_second: int | None) -> None:
+        pass
+
+    async def download_with_lyrics(self, url: str, filename: str, quality: int, songmid: str, **options: object) -> bool:
+        self.downloads.append(url)
+        self.download_options.append(options)
+        return True
+
+
+@pytest.mark.asyncio
+async def test_round_robin_spreads_resolution() -> None:
+    apis = [AccountStubAPI("a"), AccountStubAPI("b"), AccountStubAPI("c")]
+    pool = AccountPool(apis)
+
+    urls = [await pool.get_song_url(f"mid{i}", "", 1) for i in range(6)]
+
+    assert [len(api.calls) for api in apis] == [2, 2, 2]
+    assert urls[:3] == ["https://a.example/mid0", "https://b.example/mid1", "https://c.example/mid2"]
+
+
+@pytest.mark.asyncio
+async def test_budget_policy_prefers_remaining_quota() -> None:
+    apis = [AccountStubAPI("a"), AccountStubAPI("b")]
+    pool = AccountPool(apis, policy="budget", budget=3, window=60)
+
+    for i in range(5):
+        await pool.get_song_url(f"mid{i}", "", 1)
+
+    assert sorted(len(api.calls) for api in apis) == [2, 3]
+    assert max(item["remaining_budget"] for item in pool.snapshot()) == 1
+
+
+@pytest.mark.asyncio
+async def test_snapshot_does_not_roll_budget_window() -> None:
+    now = [0.0]
+    pool = AccountPool([AccountStubAPI("a")], budget=2, window=10, clock=lambda: now[0])
+
+    await pool.get_song_url("mid0", "", 1)
+    now[0] = 15.0
+
+    assert pool.snapshot()[0]["remaining_budget"] == 2
+    assert (pool.accounts[0].window_started, pool.accounts[0].used_in_window) == (0.0, 1)
+    await pool.get_song_url("mid1", "", 1)
+    assert (pool.accounts[0].window_started, pool.accounts[0].used_in_window) == (15.0, 1)
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_account_cools_down_and_revalidates() -> None:
+    limited, healthy = AccountStubAPI("a"), AccountStubAPI("b")
+    limited.limited = True
+    pool = AccountPool([limited, healthy], cooldown=0.05)
+
+    url = await pool.get_song_url("mid0", "", 1)
+
+    assert url == "https://b.example/mid0"
+    assert pool.accounts[0].state == ACCOUNT_COOLING
+    await pool.get_song_url("mid1", "", 1)
+    assert limited.calls == ["mid0"]  # 冷却期间不再分配请求
+
+    limited.limited = False
+    await asyncio.sleep(0.1)
+    assert pool.accounts[0].state == ACCOUNT_ACTIVE
+    assert limited.validations == 1
+    pool.close()
+
+
+@pytest.mark.asyncio
+async def test_all_accounts_limited_raises() -> None:
+    apis = [AccountStubAPI("a"), AccountStubAPI("b")]
+    for api in apis:
+        api.limited = True
+    pool = AccountPool(apis, cooldown=60)
+
+    with pytest.raises(RateLimitedError):
+        await pool.get_song_url("mid0", "", 1)
+    assert [account.rate_limited for account in pool.accounts] == [1, 1]
+    pool.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_revalidation_retires_account() -> None:
+    bad, good = AccountStubAPI("a"), AccountStubAPI("b")
+    bad.limited = True
+    bad.valid = False
+    pool = AccountPool([bad, good], cooldown=0.01, max_revalidations=2)
+
+    await pool.get_song_url("mid0", "", 1)
+    await asyncio.sleep(0.1)
+
+    assert pool.accounts[0].state == ACCOUNT_INVALID
+    assert bad.validations == 2
+
+
+@pytest.mark.asyncio
+async def test_service_uses_pool_and_primary_for_transfers(tmp_path: Path) -> None:
+    apis = [AccountStubAPI("a"), AccountStubAPI("b")]
+    apis[1].valid = False
+    pool = AccountPool(apis)
+    service = DownloadService(pool)
+
+    assert await service.validate_cookie() is True
+    assert pool.accounts[1].state == ACCOUNT_INVALID
+    service.set_download_path(tmp_path)
+    songs = [{"name": f"歌曲{i}", "singer": "歌手", "songmid": f"mid{i}"} for i in range(2)]
+    results = await service.download_many(songs, quality=1)
+
+    assert all(result.success for result in results)
+    assert apis[1].calls == []
+    assert apis[0].downloads == ["https://a.example/mid0", "https://a.example/mid1"]
+    assert all(api.configured == tmp_path for api in apis)
+
+
+@pytest.mark.asyncio
+async def test_transfer_lyrics_are_fetched_through_rotation() -> None:
+    apis = [AccountStubAPI("a"), AccountStubAPI("b")]
+    pool = AccountPool(apis)
+    await pool.get_song_url("mid0", "", 1)
+
+    assert await pool.download_with_lyrics("https://cdn/x", "歌曲", 1, "mid0") is True
+    await pool.download_with_lyrics("https://cdn/y", "歌曲", 1, "mid1", lyrics="预取")
+
+    assert (apis[0].lyrics_calls, apis[1].lyrics_calls) == ([], ["mid0"])
+    assert apis[0].download_options == [
+        {"lyrics": "[00:00.00]b", "with_lyrics": False},
+        {"lyrics": "预取"},
+    ]
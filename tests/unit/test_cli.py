@@ -0,0 +1,286 @@
+import asyncio
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from qqmusicdownloader import cli
+from qqmusicdownloader.domain import BatchProgress, DownloadConfig, SongRecord
+from qqmusicdownloader.services import DownloadService
+
+
+class CliStubAPI:
+    def __init__(self, base_dir: Path) -> None:
+        self.base_dir = base_dir
+        self.valid = True
+        self.downloads: list[tuple[str, int]] = []
+
+    async def validate_cookie(self) -> bool:
+        return self.valid
+
+    async def search_song(self, keyword: str) -> list[SongRecord]:
+        if keyword == "不存在":
+            return []
+        return [{"name": keyword, "singer": "歌手", "songmid": f"mid-{keyword}"}]
+
+    async def iter_playlist(self, playlist: str, *, page_size: int = 100):
+        if playlist != "42":
+            raise ValueError(f"无法识别的歌单: {playlist}")
+        for page in range(2):
+            yield [{"name": f"歌单{page}", "singer": "歌手", "songmid": f"list-{page}"}]
+
+    def get_download_path(self) -> str:
+        return str(self.base_dir)
+
+    def configure_download_dirs(self, base_dir: Path) -> None:
+        self.base_dir = base_dir
+
+    def set_bandwidth_limit(self, bytes_per_second: int | None) -> None:
+        pass
+
+    async def get_song_url(self, songmid: str, media_mid: str, quality: int) -> str | None:
+        return f"https://example.com/{songmid}"
+
+    async def get_lyrics(self, songmid: str) -> str | None:
+        return None
+
+    async def download_with_lyrics(self, url: str, filename: str, quality: int, songmid: str, **_: Any) -> bool:
+        self.downloads.append((songmid, quality))
+        return songmid != "mid-坏歌"
+
+
+@pytest.fixture()
+def stub(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> CliStubAPI:
+    api = CliStubAPI(tmp_path / "out")
+    configs: list[DownloadConfig | None] = []
+
+    def from_cookie(cookie: str, *, config: DownloadConfig | None = None) -> DownloadService:
+        assert cookie == "uin=1; qqmusic_key=k"
+        configs.append(config)
+        return DownloadService(api, config=config)
+
+    monkeypatch.setattr(cli.DownloadService, "from_cookie", staticmethod(from_cookie))
+    api.configs = configs  # type: ignore[attr-defined]
+    return api
+
+
+def test_cli_import_does_not_load_textual() -> None:
+    code = "import sys, qqmusicdownloader.cli; print('textual' in sys.modules)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "False"
+
+
+def test_get_downloads_list_with_json_progress(
+    stub: CliStubAPI,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    song = json.dumps({"name": "指定", "singer": "歌手", "songmid": "exact"}, ensure_ascii=False)
+    list_file = tmp_path / "list.txt"
+    list_file.write_text(f"# 注释\n晴天\n\n{song}\n不存在\n", encoding="utf-8")
+    monkeypatch.setenv(cli.COOKIE_ENV, "uin=1; qqmusic_key=k")
+
+    code = cli.main(
+        ["get", "--input", str(list_file), "--quality", "3", "--jobs", "8", "--json-progress"]
+    )
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert code == cli.EXIT_FAILED  # 有一行未找到歌曲
+    assert sorted(stub.downloads) == [("exact", 3), ("mid-晴天", 3)]
+    assert stub.configs[0].max_concurrent == 8  # type: ignore[attr-defined]
+    assert [e["query"] for e in events if e["event"] == "unresolved"] == ["不存在"]
+    summary = events[-1]
+    assert summary["event"] == "summary"
+    assert summary["succeeded"] == 2 and summary["unresolved"] == 1
+    assert {e["songmid"] for e in events if e["event"] == "done"} == {"exact", "mid-晴天"}
+    final = [e for e in events if e["event"] == "progress"][-1]
+    assert final["succeeded"] + final["failed"] == final["total"] == 2
+
+
+def test_progress_reporter_flushes_throttled_progress() -> None:
+    stream = io.StringIO()
+    reporter = cli.ProgressReporter(json_mode=True, stream=stream, min_interval=60)
+
+    reporter.progress(BatchProgress(total=3, succeeded=1, active=2))
+    reporter.progress(BatchProgress(total=3, succeeded=2, active=1))
+    reporter.summary([])
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [e["event"] for e in events] == ["progress", "progress", "summary"]
+    assert events[1]["succeeded"] == 2
+
+
+def test_get_rejects_missing_cookie(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.delenv(cli.COOKIE_ENV, raising=False)
+    list_file = tmp_path / "list.txt"
+    list_file.write_text("晴天\n", encoding="utf-8")
+
+    assert cli.main(["get", "-i", str(list_file)]) == cli.EXIT_USAGE
+    assert "Cookie" in capsys.readouterr().err
+
+
+def test_get_reports_failures_in_exit_code(
+    stub: CliStubAPI, tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    list_file = tmp_path / "list.txt"
+    list_file.write_text("坏歌\n好歌\n", encoding="utf-8")
+
+    code = cli.main(
+        ["get", "-i", str(list_file), "--cookie", "uin=1; qqmusic_key=k", "-o", str(tmp_path / "dl")]
+    )
+
+    assert code == cli.EXIT_FAILED
+    assert stub.base_dir == tmp_path / "dl"
+    assert "失败 1" in capsys.readouterr().err
+
+
+def test_get_streams_playlist(stub: CliStubAPI, capsys: pytest.CaptureFixture[str]) -> None:
+    code = cli.main(["get", "--playlist", "42", "--cookie", "uin=1; qqmusic_key=k", "--json-progress"])
+
+    events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert code == cli.EXIT_OK
+    assert sorted(stub.downloads) == [("list-0", 1), ("list-1", 1)]
+    assert events[0] == {**events[0], "event": "playlist", "playlist": "42"}
+    assert events[-1]["succeeded"] == 2
+
+
+def test_get_reports_unknown_playlist(stub: CliStubAPI, capsys: pytest.CaptureFixture[str]) -> None:
+    code = cli.main(["get", "--playlist", "bogus", "--cookie", "uin=1; qqmusic_key=k"])
+
+    assert code == cli.EXIT_FAILED
+    assert "无法识别的歌单" in capsys.readouterr().err
+
+
+def test_get_exports_trace(
+    stub: CliStubAPI, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(cli.tracing, "TRACER", cli.tracing.Tracer())
+    trace_file = tmp_path / "trace.json"
+
+    code = cli.main(
+        ["get", "--playlist", "42", "--cookie", "uin=1; qqmusic_key=k", "--trace", str(trace_file)]
+    )
+
+    names = [event["name"] for event in json.loads(trace_file.read_text())["traceEvents"]]
+    assert code == cli.EXIT_OK
+    assert names.count("service.resolve") == 2
+    assert names.count("service.download") == 2
+
+
+def test_get_writes_metrics_file(stub: CliStubAPI, tmp_path: Path) -> None:
+    metrics_file = tmp_path / "qqmusic.prom"
+    before = cli.metrics.SONGS.value(result="succeeded")
+
+    code = cli.main(
+        [
+            "get",
+            "--playlist",
+            "42",
+            "--cookie",
+            "uin=1; qqmusic_key=k",
+            "--metrics-file",
+            str(metrics_file),
+        ]
+    )
+
+    assert code == cli.EXIT_OK
+    assert cli.metrics.SONGS.value(result="succeeded") == before + 2
+    assert cli.metrics.ACTIVE_DOWNLOADS.value() == 0
+    text = metrics_file.read_text(encoding="utf-8")
+    assert '# TYPE qqmusic_songs_total counter' in text
+    assert 'qqmusic_songs_total{result="succeeded"}' in text
+
+
+def test_get_profiles_each_operation(
+    stub: CliStubAPI, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(cli.profiling, "PROFILER", cli.profiling.Profiler())
+    profile_dir = tmp_path / "profiles"
+    monkeypatch.setenv(cli.PROFILE_ENV, str(profile_dir))
+
+    code = cli.main(["get", "--playlist", "42", "--cookie", "uin=1; qqmusic_key=k"])
+
+    assert code == cli.EXIT_OK
+    assert [path.name.split("-", 2)[-1] for path in sorted(profile_dir.glob("*.prof"))] == [
+        "0001-batch.prof"
+    ]
+    assert len(list(profile_dir.glob("*.txt"))) == 1
+
+
+def test_get_searches_concurrently_and_streams_downloads(
+    stub: CliStubAPI, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    events: list[str] = []
+    searching = 0
+    peak = 0
+    plain_search = stub.search_song
+    plain_download = stub.download_with_lyrics
+
+    async def search_song(keyword: str) -> list[SongRecord]:
+        nonlocal searching, peak
+        searching += 1
+        peak = max(peak, searching)
+        # 越靠后的关键词越慢，首首歌曲应在全部搜索完成前开始下载
+        await asyncio.sleep(0.01 * int(keyword[-1]))
+        searching -= 1
+        events.append(f"search:{keyword}")
+        return await plain_search(keyword)
+
+    async def download_with_lyrics(url: str, filename: str, quality: int, songmid: str, **kwargs: Any) -> bool:
+        events.append(f"download:{songmid}")
+        return await plain_download(url, filename, quality, songmid, **kwargs)
+
+    monkeypatch.setattr(stub, "search_song", search_song)
+    monkeypatch.setattr(stub, "download_with_lyrics", download_with_lyrics)
+    list_file = tmp_path / "list.txt"
+    list_file.write_text("\n".join(f"歌{i}" for i in range(1, 7)), encoding="utf-8")
+
+    code = cli.main(["get", "-i", str(list_file), "--cookie", "uin=1; qqmusic_key=k"])
+
+    assert code == cli.EXIT_OK
+    assert peak == cli.SEARCH_CONCURRENCY
+    assert len(stub.downloads) == 6
+    assert events.index("download:mid-歌1") < events.index("search:歌6")
+
+
+@pytest.mark.asyncio
+async def test_resolve_songs_keeps_a_bounded_window(tmp_path: Path) -> None:
+    api = CliStubAPI(tmp_path)
+    started: list[str] = []
+    plain_search = api.search_song
+
+    async def search_song(keyword: str) -> list[SongRecord]:
+        started.append(keyword)
+        return await plain_search(keyword)
+
+    api.search_song = search_song  # type: ignore[method-assign]
+    lines = [f"歌{i}" for i in range(20)]
+    songs = cli._resolve_songs(DownloadService(api), lines, cli.ProgressReporter(), [])
+
+    first = await songs.__anext__()
+    await asyncio.sleep(0.01)
+    await songs.aclose()
+
+    assert first["songmid"] == "mid-歌0"
+    assert len(started) == cli.SEARCH_CONCURRENCY + 1
+
+
+def test_get_reports_unreadable_cookie_file(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    list_file = tmp_path / "list.txt"
+    list_file.write_text("晴天\n", encoding="utf-8")
+
+    code = cli.main(["get", "-i", str(list_file), "--cookie-file", str(tmp_path / "missing.txt")])
+
+    assert code == cli.EXIT_USAGE
+    assert "无法读取 Cookie 文件" in capsys.readouterr().err
@@ -0,0 +1,74 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARKS = Path(__file__).resolve().parents[2] / "benchmarks"
+
+
+@pytest.fixture(scope="module")
+def bench():
+    sys.path.insert(0, str(BENCHMARKS))  # 按脚本方式导入同目录的模拟后端
+    spec = importlib.util.spec_from_file_location(
+        "crypto_bridge_benchmark", BENCHMARKS / "crypto_bridge.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # dataclass 需要能找到所在模块
+    spec.loader.exec_module(module)
+    yield module
+    sys.modules.pop(spec.name, None)
+    sys.path.remove(str(BENCHMARKS))
+
+
+@pytest.mark.parametrize("size", [256, 4096])
+def test_payload_matches_requested_size(bench, size: int) -> None:
+    assert len(bench.make_payload(size)) == size
+
+
+def test_plain_backend_covers_every_combination(bench) -> None:
+    cold, steady = bench.run_backend(
+        "plain", bench.BACKENDS["plain"], sizes=(256, 1024), concurrency=(1, 2), calls=8
+    )
+
+    assert cold.runs == 3
+    assert [report.key for report in steady] == [
+        f"plain/{op}/{size}/x{level}"
+        for op in ("encrypt", "decrypt")
+        for size in (256, 1024)
+        for level in (1, 2)
+    ]
+    assert all(report.calls == 8 and report.ops_per_second > 0 for report in steady)
+
+
+def test_node_backend_cold_start_and_round_trip(bench) -> None:
+    cold = bench.measure_cold_start("node", bench.BACKENDS["node"], runs=1)
+    backend = bench.BACKENDS["node"]()
+    try:
+        report = bench.measure_steady(
+            "node", backend, operation="decrypt", size=256, concurrency=2, calls=4, warmup=1
+        )
+    finally:
+        backend.close()
+
+    assert cold.first_call_ms > 0
+    assert report.calls == 4
+    assert report.p99_ms >= report.p50_ms > 0
+
+
+def test_compare_to_baseline_ignores_noise(bench) -> None:
+    def result(first_call: float, p50: float, tiny: float) -> dict:
+        steady = {"backend": "node", "operation": "encrypt", "size": 256, "concurrency": 1}
+        return {
+            "cold": [{"backend": "node", "first_call_ms": first_call}],
+            "steady": [
+                {**steady, "p50_ms": p50},
+                {**steady, "size": 16, "p50_ms": tiny},
+            ],
+        }
+
+    regressions = bench.compare_to_baseline(
+        result(210.0, 60.0, 0.08), result(200.0, 40.0, 0.02), tolerance=0.2
+    )
+
+    assert regressions == ["node/encrypt/256/x1 p50: 40.00ms -> 60.00ms (+50%)"]
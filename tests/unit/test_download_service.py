@@ -3,8 +3,9 @@ from pathlib import Path
 
 import pytest
 
-from qqmusicdownloader.domain import SongRecord
-from qqmusicdownloader.services import DownloadService
+from qqmusicdownloader.domain import DownloadConfig, SongRecord
+from qqmusicdownloader.infrastructure import LibraryIndex, TokenBucket, metrics
+from qqmusicdownloader.services import DownloadHandle, DownloadService
 
 
 class StubDownloadAPI:
@@ -19,6 +20,9 @@ class StubDownloadAPI:
         self.raise_on_configure: Exception | None = None
         self.url_to_return: str | None = "https://example.com/song"
         self.raise_on_download: Exception | None = None
+        self.bandwidth_limit: int | None = None
+        self.fallback_calls: list[tuple[int, ...]] = []
+        self.available_quality = 1
 
     async def validate_cookie(self) -> bool:
         return True
@@ -33,7 +37,7 @@ class StubDownloadAPI:
                 "songmid": "mid123",
                 "media_mid": "media123",
                 "interval": 100,
-                "size": {"128": 1},
+                "size": {"96aac": 1},
             }
         ]
 
@@ -45,10 +49,25 @@ class StubDownloadAPI:
             raise self.raise_on_configure
         self.configured_dir = base_dir
 
+    def set_bandwidth_limit(self, bytes_per_second: int | None) -> None:
+        self.bandwidth_limit = bytes_per_second
+
     async def get_song_url(self, songmid: str, media_mid: str, quality: int) -> str | None:
         self.get_song_url_calls.append((songmid, media_mid, quality))
         return self.url_to_return
 
+    async def get_song_url_with_fallback(
+        self, songmid: str, media_mid: str, qualities: tuple[int, ...]
+    ) -> tuple[int, str] | None:
+        self.fallback_calls.append(tuple(qualities))
+        for quality in qualities:
+            if quality <= self.available_quality and self.url_to_return:
+                return quality, self.url_to_return
+        return None
+
+    async def get_lyrics(self, songmid: str) -> str | None:
+        return f"lyrics-{songmid}"
+
     async def download_with_lyrics(
         self,
         url: str,
@@ -59,6 +78,11 @@ class StubDownloadAPI:
         progress_bar: object | None = None,
         progress_label: object | None = None,
         pause_events: list[asyncio.Event] | None = None,
+        task_limiter: object | None = None,
+        expected_size: int = 0,
+        lyrics: str | None = None,
+        with_lyrics: bool = True,
+        on_progress: object | None = None,
     ) -> bool:
         if self.raise_on_download:
             raise self.raise_on_download
@@ -69,6 +93,10 @@ class StubDownloadAPI:
                 "quality": quality,
                 "songmid": songmid,
                 "pause_events": pause_events or [],
+                "task_limiter": task_limiter,
+                "expected_size": expected_size,
+                "lyrics": lyrics,
+                "with_lyrics": with_lyrics,
             }
         )
         return self.download_return
@@ -92,7 +120,151 @@ async def test_search_and_download_flow() -> None:
     assert api.get_song_url_calls == [("mid123", "media123", 2)]
     assert api.download_calls[0]["url"] == "https://example.com/song"
     pause_events = api.download_calls[0]["pause_events"]
-    assert service.global_pause_event in pause_events
+    assert len(pause_events) == 1  # 每个任务只有一个组合闸门
+    assert pause_events[0].is_set()
+    assert api.download_calls[0]["expected_size"] == 0  # 桩数据只提供 128 的大小
+
+
+class PagedSearchStubAPI(StubDownloadAPI):
+    def __init__(self, total: int) -> None:
+        super().__init__()
+        self.total = total
+        self.pages: list[int] = []
+
+    async def search_song(
+        self, keyword: str, *, page: int = 1, page_size: int = 20
+    ) -> list[SongRecord]:
+        self.pages.append(page)
+        # 每页首条与上一页末条重复，模拟接口分页边界的重复结果
+        start = max(0, (page - 1) * page_size - 1)
+        end = min(self.total, start + page_size)
+        return [{"name": f"歌曲{i}", "songmid": f"mid{i}"} for i in range(start, end)]
+
+
+@pytest.mark.asyncio
+async def test_iter_search_streams_deduplicated_pages() -> None:
+    api = PagedSearchStubAPI(total=45)
+    service = DownloadService(api)
+
+    pages = [page async for page in service.iter_search("晴天", page_size=20)]
+
+    assert api.pages == [1, 2, 3]
+    assert [len(page) for page in pages] == [20, 19, 6]
+    assert [song["songmid"] for song in service.current_songs] == [f"mid{i}" for i in range(45)]
+
+
+@pytest.mark.asyncio
+async def test_iter_search_stops_at_max_results() -> None:
+    api = PagedSearchStubAPI(total=1000)
+    service = DownloadService(api)
+
+    pages = [page async for page in service.iter_search("晴天", page_size=20, max_results=30)]
+
+    assert api.pages == [1, 2]
+    assert sum(len(page) for page in pages) == len(service.current_songs) == 30
+
+
+@pytest.mark.asyncio
+async def test_quality_fallback_downloads_best_available() -> None:
+    api = StubDownloadAPI()
+    service = DownloadService(api, config=DownloadConfig(quality_fallback=True))
+    songs = await service.search("周杰伦")
+
+    assert await service.download_song(songs[0], quality=3) is True
+    results = await service.download_many(songs, quality=3)
+
+    assert api.fallback_calls == [(3, 2, 1), (3, 2, 1)]
+    assert api.get_song_url_calls == []
+    assert [call["quality"] for call in api.download_calls] == [1, 1]
+    assert api.download_calls[0]["expected_size"] == 1
+    assert results[0].success is True
+
+
+@pytest.mark.asyncio
+async def test_quality_fallback_disabled_by_default() -> None:
+    api = StubDownloadAPI()
+    service = DownloadService(api)
+    songs = await service.search("周杰伦")
+
+    assert await service.download_song(songs[0], quality=3) is True
+    assert api.fallback_calls == []
+    assert api.get_song_url_calls == [("mid123", "media123", 3)]
+
+
+@pytest.mark.asyncio
+async def test_library_hit_skips_url_resolution(tmp_path: Path) -> None:
+    api = StubDownloadAPI()
+    service = DownloadService(api)
+    songs = await service.search("周杰伦")
+    music_dir = tmp_path / "Music"
+    music_dir.mkdir()
+    existing = music_dir / "renamed.m4a"
+    existing.write_bytes(b"audio")
+    library = LibraryIndex(
+        tmp_path / "library.sqlite3",
+        music_dir=music_dir,
+        manifest_path=tmp_path / "manifest.jsonl",
+    )
+    library.record("mid123", 1, existing)
+    service.library = library
+
+    assert await service.download_song(songs[0], quality=1) is True
+    results = await service.download_many(songs, quality=1)
+
+    assert results[0].success is True
+    assert results[0].skipped is True
+    assert api.get_song_url_calls == []
+    assert api.download_calls == []
+
+    # 其他音质不受影响
+    assert await service.download_song(songs[0], quality=2) is True
+    assert api.get_song_url_calls == [("mid123", "media123", 2)]
+
+
+@pytest.mark.asyncio
+async def test_library_hit_with_deleted_file_downloads_again(tmp_path: Path) -> None:
+    api = StubDownloadAPI()
+    service = DownloadService(api)
+    songs = await service.search("周杰伦")
+    existing = tmp_path / "Music" / "晴天.m4a"
+    existing.parent.mkdir()
+    existing.write_bytes(b"audio")
+    library = LibraryIndex(
+        tmp_path / "library.sqlite3",
+        music_dir=existing.parent,
+        manifest_path=tmp_path / "manifest.jsonl",
+    )
+    library.record("mid123", 1, existing)
+    service.library = library
+
+    existing.unlink()
+
+    assert await service.download_song(songs[0], quality=1) is True
+    assert api.get_song_url_calls == [("mid123", "media123", 1)]
+    assert library.lookup("mid123", 1) is None
+
+
+@pytest.mark.asyncio
+async def test_library_matches_files_outside_manifest_by_name(tmp_path: Path) -> None:
+    api = StubDownloadAPI()
+    service = DownloadService(api, config=DownloadConfig(quality_fallback=True))
+    songs = await service.search("周杰伦")
+    music_dir = tmp_path / "Music"
+    music_dir.mkdir()
+    (music_dir / "测试歌曲 - 测试歌手.mp3").write_bytes(b"audio")
+    library = LibraryIndex(
+        tmp_path / "library.sqlite3",
+        music_dir=music_dir,
+        manifest_path=tmp_path / "manifest.jsonl",
+    )
+    service.library = library
+    assert await service.scan_library() == 1
+
+    results = await service.download_many(songs, quality=3)
+
+    assert results[0].skipped is True
+    assert api.fallback_calls == []
+    assert api.download_calls == []
 
 
 @pytest.mark.asyncio
@@ -150,10 +322,426 @@ async def test_pause_event_chain() -> None:
     await service.download_song(song, quality=1, extra_pause_events=[extra_event])
 
     pause_events = api.download_calls[0]["pause_events"]
-    assert service.global_pause_event in pause_events
+    assert len(pause_events) == 2
     assert extra_event in pause_events
 
 
+@pytest.mark.asyncio
+async def test_bandwidth_limits_forwarded_to_api() -> None:
+    api = StubDownloadAPI()
+    service = DownloadService(api)
+
+    service.set_bandwidth_limit(1024 * 1024)
+    assert api.bandwidth_limit == 1024 * 1024
+
+    song = (await service.search("测试"))[0]
+    await service.download_song(song, quality=1, rate_limit=256 * 1024)
+
+    task_limiter = api.download_calls[0]["task_limiter"]
+    assert isinstance(task_limiter, TokenBucket)
+    assert task_limiter.rate == 256 * 1024
+
+
+class PipelineStubAPI(StubDownloadAPI):
+    """记录解析与下载事件顺序，用于验证流水线重叠。"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: list[str] = []
+        self.fail_songmids: set[str] = set()
+        self.active = 0
+        self.peak_active = 0
+        self.transfer_delay = 0.05
+
+    async def get_song_url(self, songmid: str, media_mid: str, quality: int) -> str | None:
+        self.events.append(f"resolve:{songmid}")
+        await asyncio.sleep(0.01)
+        if songmid in self.fail_songmids:
+            return None
+        return f"https://example.com/{songmid}"
+
+    async def download_with_lyrics(self, url: str, filename: str, quality: int, songmid: str, **kwargs: object) -> bool:
+        self.events.append(f"start:{songmid}")
+        self.active += 1
+        self.peak_active = max(self.peak_active, self.active)
+        try:
+            on_progress = kwargs.get("on_progress")
+            if callable(on_progress):
+                on_progress(100, 200)
+                on_progress(200, 200)
+            await asyncio.sleep(self.transfer_delay)
+        finally:
+            self.active -= 1
+        self.events.append(f"done:{songmid}")
+        self.download_calls.append({"songmid": songmid, **kwargs})
+        return True
+
+
+def _songs(count: int) -> list[SongRecord]:
+    return [
+        {"name": f"歌曲{i}", "singer": "歌手", "songmid": f"mid{i}", "media_mid": f"media{i}"}
+        for i in range(count)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_download_batch_resolves_ahead_of_download() -> None:
+    api = PipelineStubAPI()
+    service = DownloadService(api)
+
+    results = await service.download_batch(_songs(3), quality=1, lookahead=2)
+
+    assert results == [True, True, True]
+    # 第二首的地址在第一首下载结束前就已解析
+    assert api.events.index("resolve:mid1") < api.events.index("done:mid0")
+    assert api.download_calls[0]["lyrics"] == "lyrics-mid0"
+    assert api.download_calls[0]["with_lyrics"] is False
+
+
+@pytest.mark.asyncio
+async def test_download_batch_continues_after_failure() -> None:
+    api = PipelineStubAPI()
+    api.fail_songmids = {"mid1"}
+    service = DownloadService(api)
+    done: list[tuple[int, bool]] = []
+
+    results = await service.download_batch(
+        _songs(3),
+        quality=1,
+        on_song_done=lambda index, _song, ok: done.append((index, ok)),
+    )
+
+    assert results == [True, False, True]
+    assert done == [(0, True), (1, False), (2, True)]
+    assert "start:mid1" not in api.events
+
+
+@pytest.mark.asyncio
+async def test_lyrics_can_be_disabled_for_bulk_jobs() -> None:
+    api = PipelineStubAPI()
+    service = DownloadService(api, config=DownloadConfig(download_lyrics=False))
+
+    await service.download_batch(_songs(1), quality=1)
+    await service.download_song(_songs(1)[0], quality=1, with_lyrics=True)
+
+    assert api.download_calls[0]["lyrics"] is None
+    assert api.download_calls[0]["with_lyrics"] is False
+    assert api.download_calls[1]["with_lyrics"] is True
+
+
+@pytest.mark.asyncio
+async def test_download_many_honours_max_concurrent() -> None:
+    api = PipelineStubAPI()
+    service = DownloadService(api, config=DownloadConfig(max_concurrent=3, lookahead=4))
+    snapshots: list[tuple[int, int]] = []
+
+    results = await service.download_many(
+        _songs(8),
+        quality=1,
+        on_progress=lambda p: snapshots.append((p.finished, p.bytes_downloaded)),
+    )
+
+    assert all(result.success for result in results)
+    assert [result.song["songmid"] for result in results] == [f"mid{i}" for i in range(8)]
+    assert api.peak_active == 3
+    assert snapshots[-1] == (8, 8 * 200)
+
+
+class SlowResolveStubAPI(PipelineStubAPI):
+    """解析耗时远大于传输，用于验证解析阶段的并发。"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.transfer_delay = 0
+        self.resolving = 0
+        self.peak_resolving = 0
+
+    async def get_song_url(self, songmid: str, media_mid: str, quality: int) -> str | None:
+        self.resolving += 1
+        self.peak_resolving = max(self.peak_resolving, self.resolving)
+        try:
+            # 越靠前的歌曲解析越慢，检验派发顺序不受完成顺序影响
+            await asyncio.sleep(0.05 - int(songmid[3:]) * 0.005)
+            return await super().get_song_url(songmid, media_mid, quality)
+        finally:
+            self.resolving -= 1
+
+
+@pytest.mark.asyncio
+async def test_download_many_resolves_lookahead_concurrently() -> None:
+    api = SlowResolveStubAPI()
+    service = DownloadService(api, config=DownloadConfig(lookahead=4))
+
+    results = await service.download_many(_songs(8), quality=1, max_concurrent=1)
+
+    assert all(result.success for result in results)
+    assert api.peak_resolving == 4
+    starts = [event for event in api.events if event.startswith("start:")]
+    assert starts == [f"start:mid{i}" for i in range(8)]
+
+
+@pytest.mark.asyncio
+async def test_download_many_collects_failures() -> None:
+    api = PipelineStubAPI()
+    api.fail_songmids = {"mid2"}
+    service = DownloadService(api)
+
+    results = await service.download_many(_songs(4), quality=1, max_concurrent=2)
+
+    assert [result.success for result in results] == [True, True, False, True]
+    assert results[2].error == "未能获取下载地址"
+    assert not results[2].cancelled
+
+
+@pytest.mark.asyncio
+async def test_download_many_cancellation_marks_remaining() -> None:
+    api = PipelineStubAPI()
+    api.transfer_delay = 0.2
+    service = DownloadService(api)
+    cancel_event = asyncio.Event()
+    before = metrics.SONGS.value(result="cancelled")
+
+    async def cancel_soon() -> None:
+        await asyncio.sleep(0.05)
+        cancel_event.set()
+
+    canceller = asyncio.create_task(cancel_soon())
+    results = await asyncio.wait_for(
+        service.download_many(_songs(6), quality=1, max_concurrent=2, cancel_event=cancel_event),
+        timeout=1,
+    )
+    await canceller
+
+    assert all(result.cancelled for result in results)
+    assert api.active == 0
+    assert metrics.SONGS.value(result="cancelled") == before + 6
+
+
+@pytest.mark.asyncio
+async def test_run_jobs_persists_state_and_retries(tmp_path: Path) -> None:
+    api = PipelineStubAPI()
+    api.fail_songmids = {"mid1"}
+    service = DownloadService(api, config=DownloadConfig(max_attempts=2))
+    store = service.open_job_store(tmp_path / "jobs.sqlite3")
+
+    job_ids = service.enqueue_jobs(_songs(3), quality=2)
+    results = await service.run_jobs(job_ids)
+
+    assert [result.success for result in results] == [True, False, True]
+    failed = store.get(job_ids[1])
+    assert failed is not None
+    assert (failed.state, failed.attempts) == ("failed", 2)
+    assert failed.error == "未能获取下载地址"
+    done = store.get(job_ids[0])
+    assert done is not None and (done.state, done.bytes_done) == ("done", 200)
+    assert service.pending_job_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_completed_jobs_run_again_when_enqueued(tmp_path: Path) -> None:
+    api = PipelineStubAPI()
+    service = DownloadService(api)
+    service.open_job_store(tmp_path / "jobs.sqlite3")
+    first_ids = service.enqueue_jobs(_songs(2), quality=1)
+    await service.run_jobs(first_ids)
+
+    job_ids = service.enqueue_jobs(_songs(2), quality=1)
+
+    assert job_ids == first_ids
+    assert service.pending_job_count(job_ids) == 2
+    results = await service.run_jobs(job_ids)
+    assert [result.success for result in results] == [True, True]
+    assert len(api.download_calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_run_jobs_resumes_after_restart(tmp_path: Path) -> None:
+    path = tmp_path / "jobs.sqlite3"
+    first = DownloadService(PipelineStubAPI())
+    store = first.open_job_store(path)
+    job_ids = first.enqueue_jobs(_songs(2), quality=1)
+    store.mark_running(job_ids[0])
+    store.close()
+
+    api = PipelineStubAPI()
+    second = DownloadService(api)
+    second.open_job_store(path)
+    assert second.pending_job_count() == 2
+
+    results = await second.run_jobs()
+    assert all(result.success for result in results)
+    assert sorted(call["songmid"] for call in api.download_calls) == ["mid0", "mid1"]
+
+
+@pytest.mark.asyncio
+async def test_download_many_dispatches_by_policy() -> None:
+    api = PipelineStubAPI()
+    service = DownloadService(api)
+    songs = _songs(3)
+    for song, size in zip(songs, (300, 100, 200)):
+        song["size"] = {"320": size}
+
+    results = await service.download_many(songs, quality=2, max_concurrent=1, order="shortest")
+
+    assert [call["songmid"] for call in api.download_calls] == ["mid1", "mid2", "mid0"]
+    assert [result.song["songmid"] for result in results] == ["mid0", "mid1", "mid2"]
+
+
+class PlaylistStubAPI(PipelineStubAPI):
+    """分页产出歌单，每页之间有网络延迟。"""
+
+    def __init__(self, pages: int, page_size: int = 2, fail_after: int | None = None) -> None:
+        super().__init__()
+        self.pages = pages
+        self.page_size = page_size
+        self.fail_after = fail_after
+
+    async def iter_playlist(self, playlist: str, *, page_size: int = 100):
+        assert playlist == "https://y.qq.com/n/ryqq/playlist/42"
+        for page in range(self.pages):
+            if self.fail_after is not None and page >= self.fail_after:
+                raise RuntimeError("获取歌单失败")
+            await asyncio.sleep(0.1)
+            self.events.append(f"page:{page}")
+            start = page * self.page_size
+            yield [
+                {"name": f"歌曲{i}", "singer": "歌手", "songmid": f"mid{i}"}
+                for i in range(start, start + self.page_size)
+            ]
+
+
+@pytest.mark.asyncio
+async def test_playlist_pages_stream_into_scheduler() -> None:
+    api = PlaylistStubAPI(pages=3)
+    service = DownloadService(api)
+    totals: list[int] = []
+
+    results = await service.download_playlist(
+        "https://y.qq.com/n/ryqq/playlist/42",
+        quality=1,
+        max_concurrent=2,
+        on_progress=lambda progress: totals.append(progress.total),
+    )
+
+    assert [result.song["songmid"] for result in results] == [f"mid{i}" for i in range(6)]
+    assert all(result.success for result in results)
+    # 第一页的歌曲在后续分页到达前就已开始下载
+    assert api.events.index("start:mid0") < api.events.index("page:1")
+    assert max(totals) == 6
+
+
+@pytest.mark.asyncio
+async def test_playlist_source_error_keeps_arrived_songs() -> None:
+    api = PlaylistStubAPI(pages=3, fail_after=1)
+    service = DownloadService(api)
+
+    results = await service.download_playlist("https://y.qq.com/n/ryqq/playlist/42", quality=1)
+
+    assert [result.song["songmid"] for result in results] == ["mid0", "mid1"]
+    assert all(result.success for result in results)
+
+
+@pytest.mark.asyncio
+async def test_playlist_first_page_error_is_raised() -> None:
+    api = PlaylistStubAPI(pages=2, fail_after=0)
+    service = DownloadService(api)
+
+    with pytest.raises(RuntimeError):
+        await service.download_playlist("https://y.qq.com/n/ryqq/playlist/42", quality=1)
+    assert api.download_calls == []
+
+
+class GatedStubAPI(PipelineStubAPI):
+    """按数据块检查暂停闸门的下载桩，用于验证单任务控制。"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.chunks: dict[str, int] = {}
+
+    async def download_with_lyrics(self, url: str, filename: str, quality: int, songmid: str, **kwargs: object) -> bool:
+        gates = kwargs.get("pause_events") or []
+        for _ in range(10):
+            for gate in gates:  # type: ignore[attr-defined]
+                await gate.wait()
+            await asyncio.sleep(0.01)
+            self.chunks[songmid] = self.chunks.get(songmid, 0) + 1
+        return True
+
+
+@pytest.mark.asyncio
+async def test_handle_pause_only_stalls_its_own_task() -> None:
+    api = GatedStubAPI()
+    service = DownloadService(api)
+    songs = _songs(2)
+
+    big = service.start_download(songs[0], quality=3)
+    small = service.start_download(songs[1], quality=3)
+    big.pause()
+
+    small_result = await asyncio.wait_for(small.result(), timeout=1)
+    assert small_result.success
+    assert api.chunks.get("mid0", 0) < 10
+    assert not big.done()
+
+    big.resume()
+    assert (await asyncio.wait_for(big.result(), timeout=1)).success
+    assert service.active_handles() == []
+
+
+@pytest.mark.asyncio
+async def test_handle_cancel_and_global_pause() -> None:
+    api = GatedStubAPI()
+    service = DownloadService(api)
+    songs = _songs(2)
+
+    first = service.start_download(songs[0], quality=1)
+    second = service.start_download(songs[1], quality=1)
+    second.pause()
+    service.pause_all()
+    assert not first.gate.is_set()
+
+    first.cancel()
+    cancelled = await asyncio.wait_for(first.result(), timeout=1)
+    assert cancelled.cancelled and not cancelled.success
+
+    service.resume_all()
+    assert not second.gate.is_set()  # 单独暂停的任务保持暂停
+    second.resume()
+    assert (await asyncio.wait_for(second.result(), timeout=1)).success
+
+
+@pytest.mark.asyncio
+async def test_global_pause_event_drives_handle_gates() -> None:
+    api = GatedStubAPI()
+    service = DownloadService(api)
+    handle = service.start_download(_songs(1)[0], quality=1)
+
+    service.global_pause_event.clear()
+    assert service.is_paused and not handle.gate.is_set()
+
+    service.global_pause_event.set()
+    assert not service.is_paused and handle.gate.is_set()
+    handle.cancel()
+    await asyncio.wait_for(handle.result(), timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_batch_handle_cancel_skips_single_song() -> None:
+    api = GatedStubAPI()
+    service = DownloadService(api)
+
+    def cancel_second(handles: list[DownloadHandle]) -> None:
+        handles[1].cancel()
+
+    results = await service.download_many(
+        _songs(3), quality=1, max_concurrent=2, on_handles=cancel_second
+    )
+
+    assert [result.success for result in results] == [True, False, True]
+    assert results[1].cancelled
+    assert "mid1" not in api.chunks
+
+
 def test_set_download_path_propogates_error() -> None:
     api = StubDownloadAPI()
     api.raise_on_configure = RuntimeError("no permission")
@@ -161,3 +749,74 @@ def test_set_download_path_propogates_error() -> None:
 
     with pytest.raises(RuntimeError):
         service.set_download_path(Path("/tmp/unwritable"))
+
+
+class ProgressStubAPI(StubDownloadAPI):
+    async def download_with_lyrics(self, *args: object, on_progress=None, **kwargs: object) -> bool:
+        on_progress(512, 2048)
+        on_progress(2048, 2048)
+        return await super().download_with_lyrics(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_handles_record_transfer_progress_for_monitoring() -> None:
+    service = DownloadService(ProgressStubAPI())
+    captured: list[DownloadHandle] = []
+
+    await service.download_many(_songs(2), quality=1, on_handles=captured.extend)
+
+    assert service.batch_progress is not None
+    assert service.batch_progress.bytes_downloaded == 4096
+    assert all(handle.host == "example.com" for handle in captured)
+    assert all((handle.bytes_done, handle.bytes_total) == (2048, 2048) for handle in captured)
+    assert all(handle.started_at is not None for handle in captured)
+
+
+@pytest.mark.asyncio
+async def test_search_cache_reuses_pages_until_evicted() -> None:
+    api = PagedSearchStubAPI(total=45)
+    service = DownloadService(api, config=DownloadConfig(search_cache_size=3))
+
+    [page async for page in service.iter_search("晴天", page_size=20)]
+    [page async for page in service.iter_search(" 晴天 ", page_size=20)]
+
+    assert api.pages == [1, 2, 3]
+    assert (service.search_cache_hits, service.search_cache_misses) == (3, 3)
+    assert len(service.current_songs) == 45
+
+    await service.search("雨天")  # 容量为 3，最久未用的“晴天”第一页被淘汰
+    await service.search("晴天")
+    assert api.pages == [1, 2, 3, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_search_cache_skips_empty_results_and_expires(monkeypatch: pytest.MonkeyPatch) -> None:
+    api = StubDownloadAPI()
+    service = DownloadService(api, config=DownloadConfig(search_cache_ttl=10))
+    now = [1000.0]
+    monkeypatch.setattr("qqmusicdownloader.services.download_service.time.monotonic", lambda: now[0])
+
+    await service.search("周杰伦")
+    api.search_keyword = None
+    await service.search("周杰伦")
+    assert api.search_keyword is None  # 命中缓存
+
+    now[0] += 11
+    await service.search("周杰伦")
+    assert api.search_keyword == "周杰伦"  # 过期后重新请求
+
+
+@pytest.mark.asyncio
+async def test_diagnostics_report_cache_and_host_usage() -> None:
+    service = DownloadService(ProgressStubAPI())
+
+    await service.search("晴天")
+    await service.search("晴天")
+    await service.download_many(_songs(2), quality=1)
+    report = service.diagnostics()
+
+    assert report["search_cache"]["hits"] == 1 and report["search_cache"]["misses"] == 1
+    assert report["hosts"] == {"example.com": 4096}
+    assert report["library"] == {"hits": 0, "misses": 0, "entries": 0}
+    assert {"waiting", "latency", "wait"} <= set(report["bridge"])
+    assert report["accounts"] == []
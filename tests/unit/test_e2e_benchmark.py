@@ -0,0 +1,93 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import aiohttp
+import pytest
+
+BENCHMARKS = Path(__file__).resolve().parents[2] / "benchmarks"
+
+
+@pytest.fixture(scope="module")
+def e2e():
+    sys.path.insert(0, str(BENCHMARKS))  # e2e.py 按脚本方式导入同目录的模拟服务
+    spec = importlib.util.spec_from_file_location("e2e_benchmark", BENCHMARKS / "e2e.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # dataclass 需要能找到所在模块
+    spec.loader.exec_module(module)
+    yield module
+    sys.modules.pop(spec.name, None)
+    sys.path.remove(str(BENCHMARKS))
+
+
+@pytest.fixture(scope="module")
+def fake(e2e):
+    return sys.modules["fake_qqmusic"]
+
+
+@pytest.mark.asyncio
+async def test_suite_downloads_every_song_through_fake_server(e2e) -> None:
+    config = e2e.FakeServerConfig(catalog_size=3, file_size=64 * 1024, chunk_size=16 * 1024)
+
+    reports = await e2e.run_suite(config, searches=3, songs=3, concurrency=(2,))
+
+    search, download = reports
+    assert (search.name, search.operations, search.failures) == ("search x8", 3, 0)
+    assert (download.name, download.operations, download.failures) == ("download x2", 3, 0)
+    assert download.bytes == 3 * 64 * 1024
+    assert download.p99_ms >= download.p50_ms > 0
+    assert download.to_dict()["mb_per_second"] > 0
+
+
+@pytest.mark.asyncio
+async def test_download_writes_synthetic_content(e2e, fake, tmp_path: Path) -> None:
+    config = e2e.FakeServerConfig(catalog_size=1, file_size=1000, chunk_size=256)
+
+    async with e2e.FakeQQMusicServer(config) as server:
+        service = e2e.build_service(server, tmp_path, with_lyrics=True)
+        report = await e2e.run_download(service, songs=1, concurrency=1)
+
+        assert server.requests["vkey.GetVkeyServer.CgiGetVkey"] == 1
+        assert server.requests["cdn"] == 1
+
+    assert report.failures == 0
+    (audio,) = (tmp_path / "Music").glob("*.m4a")
+    assert audio.read_bytes() == fake.synthetic_bytes(0, 1000)
+    assert len(list((tmp_path / "Lyrics").iterdir())) == 1
+
+
+@pytest.mark.asyncio
+async def test_cdn_honours_range_requests(fake) -> None:
+    config = fake.FakeServerConfig(file_size=1000)
+
+    async with fake.FakeQQMusicServer(config) as server:
+        async with aiohttp.ClientSession() as session:
+            url = f"{server.cdn_url}C400bench000000.m4a"
+            async with session.get(url, headers={"Range": "bytes=300-309"}) as response:
+                assert response.status == 206
+                assert response.headers["Content-Range"] == "bytes 300-309/1000"
+                assert await response.read() == fake.synthetic_bytes(300, 10)
+            async with session.get(url, headers={"Range": "bytes=-4"}) as response:
+                assert await response.read() == fake.synthetic_bytes(996, 4)
+            async with session.get(url, headers={"Range": "bytes=2000-"}) as response:
+                assert response.status == 416
+
+
+@pytest.mark.asyncio
+async def test_download_updates_metrics(e2e, tmp_path: Path) -> None:
+    from qqmusicdownloader.infrastructure import metrics
+
+    vkey = {"module": "vkey.GetVkeyServer", "method": "CgiGetVkey", "code": "0"}
+    before_calls = metrics.API_REQUESTS.value(**vkey)
+    before_songs = metrics.SONGS.value(result="succeeded")
+    before_bytes = metrics.DOWNLOAD_BYTES.value(host="127.0.0.1")
+    config = e2e.FakeServerConfig(catalog_size=2, file_size=4096, chunk_size=1024)
+
+    async with e2e.FakeQQMusicServer(config) as server:
+        service = e2e.build_service(server, tmp_path, with_lyrics=False)
+        await e2e.run_download(service, songs=2, concurrency=2)
+
+    assert metrics.API_REQUESTS.value(**vkey) == before_calls + 2
+    assert metrics.SONGS.value(result="succeeded") == before_songs + 2
+    assert metrics.DOWNLOAD_BYTES.value(host="127.0.0.1") == before_bytes + 2 * 4096
+    assert metrics.ACTIVE_DOWNLOADS.value() == 0
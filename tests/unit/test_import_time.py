@@ -0,0 +1,42 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+BENCHMARK = Path(__file__).resolve().parents[2] / "benchmarks" / "import_time.py"
+
+
+@pytest.fixture(scope="module")
+def import_time():
+    spec = importlib.util.spec_from_file_location("import_time_benchmark", BENCHMARK)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # dataclass 需要能找到所在模块
+    spec.loader.exec_module(module)
+    yield module
+    sys.modules.pop(spec.name, None)
+
+
+def test_parse_importtime_output(import_time) -> None:
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |   json.decoder",
+            "import time:       300 |        420 | json",
+        ]
+    )
+
+    sample = import_time.parse_importtime(stderr, "json")
+
+    assert sample.total_us == 420
+    assert sample.self_us == {"json.decoder": 120, "json": 300}
+
+
+@pytest.mark.parametrize("module", sorted(["qqmusicdownloader.cli", "qqmusicdownloader.services"]))
+def test_entry_points_do_not_import_heavy_dependencies(import_time, module: str) -> None:
+    report = import_time.benchmark(
+        module, runs=1, forbidden=import_time.DEFAULT_FORBIDDEN[module]
+    )
+
+    assert report.forbidden_loaded == []
+    assert report.median_ms > 0
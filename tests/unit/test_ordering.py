@@ -0,0 +1,50 @@
+import pytest
+
+from qqmusicdownloader.domain import SongRecord
+from qqmusicdownloader.services.ordering import (
+    estimated_size,
+    largest_first,
+    mixed_packing,
+    resolve_ordering,
+    round_robin_by_artist,
+    shortest_first,
+)
+
+
+def _song(songmid: str, size: int, singer: str = "歌手", interval: int = 0) -> SongRecord:
+    return {"songmid": songmid, "singer": singer, "interval": interval, "size": {"320": size}}
+
+
+SONGS = [_song("a", 30), _song("b", 10), _song("c", 50), _song("d", 20)]
+
+
+def test_size_based_policies() -> None:
+    assert shortest_first(SONGS, 2) == [1, 3, 0, 2]
+    assert largest_first(SONGS, 2) == [2, 0, 3, 1]
+
+
+def test_mixed_packing_alternates_big_and_small() -> None:
+    assert mixed_packing(SONGS, 2) == [2, 1, 0, 3]
+    assert sorted(mixed_packing(SONGS[:3], 2)) == [0, 1, 2]
+
+
+def test_round_robin_by_artist() -> None:
+    songs = [
+        _song("a1", 1, "甲"),
+        _song("a2", 1, "甲"),
+        _song("a3", 1, "甲"),
+        _song("b1", 1, "乙"),
+        _song("c1", 1, "丙"),
+    ]
+    assert round_robin_by_artist(songs, 2) == [0, 3, 4, 1, 2]
+
+
+def test_estimated_size_falls_back_to_duration() -> None:
+    assert estimated_size(_song("x", 0, interval=100), 2) == 100 * 40_000
+    assert estimated_size(_song("x", 123), 2) == 123
+
+
+def test_resolve_ordering_rejects_unknown_policy() -> None:
+    assert resolve_ordering(None)(SONGS, 2) == [0, 1, 2, 3]
+    with pytest.raises(ValueError):
+        resolve_ordering("random")
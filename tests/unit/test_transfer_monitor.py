@@ -0,0 +1,97 @@
+from typing import Any
+
+import pytest
+
+from qqmusicdownloader.domain import BatchProgress
+from qqmusicdownloader.services import DownloadHandle, TransferMonitor
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class MonitoredService:
+    def __init__(self) -> None:
+        self.handles: list[DownloadHandle] = []
+        self.batch_progress: BatchProgress | None = None
+
+    def active_handles(self) -> list[DownloadHandle]:
+        return [handle for handle in self.handles if not handle.done()]
+
+
+def _start(handle: DownloadHandle, clock: FakeClock, *, host: str, total: int) -> None:
+    handle.host = host
+    handle.bytes_total = total
+    handle.started_at = clock.now
+
+
+def _song(name: str) -> dict[str, Any]:
+    return {"name": name, "singer": "歌手", "songmid": name}
+
+
+@pytest.mark.asyncio
+async def test_monitor_reports_rates_eta_and_queue() -> None:
+    clock = FakeClock()
+    service = MonitoredService()
+    fast, slow, waiting = (DownloadHandle(_song(name)) for name in ("快", "慢", "等"))
+    service.handles = [fast, slow, waiting]
+    monitor = TransferMonitor(service, smoothing=1.0, clock=clock)  # type: ignore[arg-type]
+    service.batch_progress = BatchProgress(total=3)
+    _start(fast, clock, host="cdn-a.example", total=4_000_000)
+    _start(slow, clock, host="cdn-b.example", total=4_000_000)
+
+    monitor.sample()
+    clock.now += 1
+    fast.bytes_done = 2_000_000
+    slow.bytes_done = 100_000
+    service.batch_progress.bytes_downloaded = 2_100_000
+    snapshot = monitor.sample()
+
+    stats = {stat.name: stat for stat in snapshot.transfers}
+    assert snapshot.queued == 1 and snapshot.active == 2
+    assert stats["快 - 歌手"].rate == pytest.approx(2_000_000)
+    assert stats["快 - 歌手"].eta == pytest.approx(1.0)
+    assert stats["慢 - 歌手"].host == "cdn-b.example"
+    assert snapshot.rate == pytest.approx(2_100_000)
+
+
+@pytest.mark.asyncio
+async def test_monitor_flags_stalled_but_not_paused_transfers() -> None:
+    clock = FakeClock()
+    service = MonitoredService()
+    stuck, paused = DownloadHandle(_song("卡住")), DownloadHandle(_song("暂停"))
+    service.handles = [stuck, paused]
+    monitor = TransferMonitor(service, stall_after=5, clock=clock)  # type: ignore[arg-type]
+    for handle in service.handles:
+        _start(handle, clock, host="cdn.example", total=1000)
+        handle.bytes_done = 10
+    paused.pause()
+
+    monitor.sample()
+    clock.now += 6
+    snapshot = monitor.sample()
+
+    stats = {stat.name: stat for stat in snapshot.transfers}
+    assert stats["卡住 - 歌手"].stalled is True
+    assert stats["暂停 - 歌手"].paused is True
+    assert stats["暂停 - 歌手"].stalled is False
+
+
+@pytest.mark.asyncio
+async def test_monitor_accumulates_batches_and_ignores_previous_run() -> None:
+    service = MonitoredService()
+    service.batch_progress = BatchProgress(total=5, succeeded=5)
+    monitor = TransferMonitor(service, clock=FakeClock())  # type: ignore[arg-type]
+
+    assert monitor.sample().succeeded == 0  # 重置前的批次不计入
+
+    service.batch_progress = BatchProgress(total=2, succeeded=1, failed=1)
+    monitor.sample()
+    service.batch_progress = BatchProgress(total=1, failed=1)
+    snapshot = monitor.sample()
+
+    assert (snapshot.succeeded, snapshot.failed) == (1, 2)